@@ -69,6 +69,8 @@ let videos = [];
 let currentVideo = null;
 let actions = [];
 let templatePath = "";
+let savedTemplateRevision = null;
+let savedTemplateActionIds = null;
 let apiBasePath = null;
 let previewMode = false;
 let previewSyncHandle = null;
@@ -187,11 +189,21 @@ const RELAY_PRESET_STORAGE_KEY = "dmxTemplateBuilder.relayPresets";
 
 const LIGHT_TEMPLATE_STORAGE_KEY = "dmxTemplateBuilder.lightTemplates";
 
+// Fade curves understood by the show engine; see FADE_CURVES in dmx.py.
+const FADE_CURVES = Object.freeze(["linear", "ease-in", "ease-out", "ease-in-out", "s-curve", "log"]);
+const DEFAULT_FADE_CURVE = "linear";
+
+function normalizeFadeCurve(value) {
+  const curve = typeof value === "string" ? value.trim().toLowerCase() : "";
+  return FADE_CURVES.includes(curve) ? curve : DEFAULT_FADE_CURVE;
+}
+
 const DEFAULT_ACTION = Object.freeze({
   time: "00:00:00",
   channel: 1,
   value: 0,
   fade: 0,
+  curve: DEFAULT_FADE_CURVE,
   stepTitle: "",
   channelPresetId: null,
   valuePresetId: null,
@@ -762,6 +774,9 @@ function expandMasterAction(action, master, seconds, fade) {
       channelPresetId: preset.id,
       channelMasterId: master.id,
     };
+    if (normalizeFadeCurve(action.curve) !== DEFAULT_FADE_CURVE) {
+      entry.curve = normalizeFadeCurve(action.curve);
+    }
     if (typeof action.stepTitle === "string" && action.stepTitle) {
       entry.stepTitle = action.stepTitle;
     }
@@ -938,6 +953,7 @@ function collapseMasterActions(list) {
         master,
         time: timeKey,
         fade: Number.parseFloat(action.fade) || 0,
+        curve: normalizeFadeCurve(action.curve),
         templateId: action.templateId || null,
         templateInstanceId: action.templateInstanceId || null,
         templateRowId: action.templateRowId || null,
@@ -958,6 +974,7 @@ function collapseMasterActions(list) {
     const masterAction = { ...DEFAULT_ACTION };
     masterAction.time = group.time;
     masterAction.fade = group.fade;
+    masterAction.curve = group.curve;
     masterAction.templateId = group.templateId;
     masterAction.templateInstanceId = group.templateInstanceId;
     masterAction.templateRowId = group.templateRowId;
@@ -1885,6 +1902,18 @@ function queuePreviewSync() {
   }, 150);
 }
 
+function queuePreviewSeek() {
+  if (!currentVideo) return;
+  if (!previewMode || previewSyncHandle) {
+    // A pending full sync already carries the current position.
+    queuePreviewSync();
+    return;
+  }
+  sendPreviewSeek().catch((error) => {
+    console.error(error);
+  });
+}
+
 function cancelPreviewSync() {
   if (previewSyncHandle) {
     clearTimeout(previewSyncHandle);
@@ -1973,6 +2002,7 @@ function prepareTemplatePreviewActions(templateId) {
         channel,
         value,
         fade: Number(normalizedFade.toFixed(3)),
+        curve: normalizeFadeCurve(row.curve),
         channelPresetId:
           masterId || typeof row.channelPresetId !== "string" || !row.channelPresetId
             ? null
@@ -2113,6 +2143,27 @@ async function sendPreview(preparedActions) {
   }
 }
 
+async function sendPreviewSeek() {
+  const hasVideo = videoEl && Number.isFinite(videoEl.currentTime);
+  const response = await fetchApi(`/dmx/preview`, {
+    method: "PATCH",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      start_time: hasVideo ? Math.max(0, videoEl.currentTime) : 0,
+      paused: videoEl ? Boolean(videoEl.paused) : true,
+    }),
+  });
+  if (response.status === 409) {
+    // The server has no preview loaded yet, so send the whole show.
+    await syncPreview({ showError: false });
+    return;
+  }
+  if (!response.ok) {
+    const payload = await response.json().catch(() => ({}));
+    throw new Error(payload.error || `Unable to update preview (${response.status})`);
+  }
+}
+
 async function stopPreviewLights(options = {}) {
   try {
     const response = await fetchApi(`/dmx/preview`, { method: "DELETE" });
@@ -2148,19 +2199,19 @@ function pauseVideoSilently() {
 
 function handleVideoPlay() {
   if (!previewMode) return;
-  queuePreviewSync();
+  queuePreviewSeek();
 }
 
 function handleVideoPause() {
   if (!previewMode) return;
   if (suppressPreviewPause) return;
-  queuePreviewSync();
+  queuePreviewSeek();
 }
 
 function handleVideoSeeked() {
   updateActiveActionHighlight();
   if (!previewMode) return;
-  queuePreviewSync();
+  queuePreviewSeek();
 }
 
 function handleVideoTimeUpdate() {
@@ -2279,6 +2330,8 @@ async function loadTemplate(videoId) {
       syncTemplateInstances(templateId, { render: false });
     });
     templatePath = data.video?.dmx_template || "";
+    savedTemplateRevision = Number.isInteger(data.revision) ? data.revision : null;
+    savedTemplateActionIds = null;
     const videoUrl = data.video?.video_url || currentVideo?.video_url || "";
 
     updateTemplateInfo(templatePath, data.template_exists);
@@ -5618,6 +5671,7 @@ function cloneActionForDuplicate(action) {
     channel: action.channel,
     value: action.value,
     fade: action.fade,
+    curve: normalizeFadeCurve(action.curve),
     channelPresetId: action.channelPresetId,
     valuePresetId: action.valuePresetId,
     channelMasterId: action.channelMasterId,
@@ -5819,15 +5873,38 @@ async function handleSaveTemplate() {
     return;
   }
   try {
+    const delta = buildTemplateDelta(payload.actions || []);
+    let request;
+    if (savedTemplateActionIds && savedTemplateRevision !== null) {
+      request = {
+        method: "PATCH",
+        body: {
+          base_revision: savedTemplateRevision,
+          ops: delta.ops,
+          relay_actions: payload.relay_actions,
+        },
+      };
+    } else {
+      request = {
+        method: "POST",
+        body: { ...payload, actions: delta.actions, base_revision: savedTemplateRevision },
+      };
+    }
     const response = await fetchApi(`/dmx/templates/${encodeURIComponent(currentVideo.id)}`, {
-      method: "POST",
+      method: request.method,
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(payload),
+      body: JSON.stringify(request.body),
     });
     if (!response.ok) {
       const payload = await response.json().catch(() => ({}));
+      if (response.status === 409) {
+        throw new Error("This template was changed elsewhere. Reload it before saving");
+      }
       throw new Error(payload.error || `Request failed (${response.status})`);
     }
+    const result = await response.json().catch(() => ({}));
+    savedTemplateRevision = Number.isInteger(result.revision) ? result.revision : null;
+    savedTemplateActionIds = savedTemplateRevision === null ? null : delta.ids;
     showStatus("Template saved successfully.", "success");
   } catch (error) {
     console.error(error);
@@ -5837,6 +5914,42 @@ async function handleSaveTemplate() {
   }
 }
 
+function templateActionKey(action) {
+  const { id, ...fields } = action;
+  return JSON.stringify(fields);
+}
+
+// Match the actions about to be saved against the last saved set so only
+// added and removed cues are sent.  Unchanged cues keep their server ids.
+function buildTemplateDelta(actionsPayload) {
+  const available = new Map();
+  if (savedTemplateActionIds) {
+    savedTemplateActionIds.forEach((ids, key) => available.set(key, ids.slice()));
+  }
+  const ops = [];
+  const ids = new Map();
+  const actionsWithIds = actionsPayload.map((action) => {
+    const key = templateActionKey(action);
+    const pool = available.get(key);
+    let id;
+    if (pool && pool.length) {
+      id = pool.shift();
+    } else {
+      id = generateId("action");
+      ops.push({ op: "insert", action: { ...action, id } });
+    }
+    if (!ids.has(key)) {
+      ids.set(key, []);
+    }
+    ids.get(key).push(id);
+    return { ...action, id };
+  });
+  available.forEach((pool) => {
+    pool.forEach((id) => ops.push({ op: "delete", id }));
+  });
+  return { ops, ids, actions: actionsWithIds };
+}
+
 function exportTemplate(preparedPayload, options = {}) {
   if (!currentVideo) return;
   let payload = preparedPayload;
@@ -7755,6 +7868,7 @@ function buildLightTemplatePayload() {
               channel: row.channel,
               value: row.value,
               fade: row.fade,
+              curve: normalizeFadeCurve(row.curve),
               channelPresetId: row.channelPresetId,
               valuePresetId: row.valuePresetId,
               channelMasterId: row.channelMasterId,
@@ -7871,6 +7985,7 @@ function createTemplateRowDefaults(overrides = {}) {
     channel: clamp(Number.parseInt(overrides.channel, 10) || 1, 1, 512),
     value: clamp(Number.parseInt(overrides.value, 10) || 0, 0, 255),
     fade: Math.max(0, Number.parseFloat(overrides.fade) || 0),
+    curve: normalizeFadeCurve(overrides.curve),
     channelPresetId:
       typeof overrides.channelPresetId === "string" && overrides.channelPresetId
         ? overrides.channelPresetId
@@ -8952,6 +9067,7 @@ function duplicateLightTemplate(templateId) {
       channel: row.channel,
       value: row.value,
       fade: row.fade,
+      curve: row.curve,
       channelPresetId: row.channelPresetId,
       valuePresetId: row.valuePresetId,
       channelMasterId: row.channelMasterId,
@@ -9140,6 +9256,7 @@ function duplicateTemplateRow(templateId, rowId) {
           channel: source.channel,
           value: source.value,
           fade: source.fade,
+          curve: source.curve,
           channelPresetId: source.channelPresetId,
           valuePresetId: source.valuePresetId,
           channelMasterId: source.channelMasterId,
@@ -9504,6 +9621,7 @@ function createActionsFromTemplate(template, stepId, time, instanceId, options =
       channel,
       value,
       fade,
+      curve: normalizeFadeCurve(row.curve),
       channelPresetId: channelMasterId ? null : channelPresetId,
       valuePresetId: channelMasterId ? null : valuePresetId,
       channelMasterId,
@@ -9881,6 +9999,9 @@ function prepareActionsForSave() {
       value,
       fade: Number(fade.toFixed(3)),
     };
+    if (normalizeFadeCurve(action.curve) !== DEFAULT_FADE_CURVE) {
+      entry.curve = normalizeFadeCurve(action.curve);
+    }
     const stepTitle = typeof action.stepTitle === "string" ? action.stepTitle.trim() : "";
     if (stepTitle) {
       entry.stepTitle = stepTitle;
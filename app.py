@@ -1,3 +1,5 @@
+import copy
+import hashlib
 import json
 import logging
 import math
@@ -7,7 +9,6 @@ import re
 import shlex
 import shutil
 import signal
-import socket
 import subprocess
 import sys
 import threading
@@ -28,7 +29,14 @@ from flask import (
     send_from_directory,
 )
 
-from dmx import DMXShowManager, create_manager
+from dmx import (
+    FADE_CURVE_LINEAR,
+    DMXShowManager,
+    TemplateConflictError,
+    create_manager,
+    get_fade_curve,
+)
+from mpv_ipc import MpvIpcClient
 from snow import SnowMachineController
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -218,6 +226,81 @@ class PlaybackSession:
             return self._owner_key is not None
 
 
+class StatusBroadcaster:
+    """Samples shared stage state on one thread and wakes event-stream clients.
+
+    Clients block in :meth:`wait` until the sampled state differs from the
+    version they last saw, so the cost of polling mpv, the queue and the
+    relays is paid once per interval no matter how many phones are
+    connected.  Sampling pauses while nobody is listening.
+    """
+
+    def __init__(self, sample: Callable[[], Dict[str, Any]], interval: float = 0.5) -> None:
+        self._sample = sample
+        self._interval = interval
+        self._condition = threading.Condition()
+        self._version = 0
+        self._state: Optional[Dict[str, Any]] = None
+        self._clients = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def connect(self) -> None:
+        with self._condition:
+            self._clients += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def disconnect(self) -> None:
+        with self._condition:
+            self._clients = max(0, self._clients - 1)
+
+    def notify(self) -> None:
+        """Sample immediately instead of waiting for the next interval."""
+
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._clients == 0:
+                    self._thread = None
+                    self._state = None
+                    return
+            self._wake.clear()
+            try:
+                state = self._sample()
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("Unable to sample stage state for event stream")
+                state = None
+            if state is not None:
+                with self._condition:
+                    if state != self._state:
+                        self._state = state
+                        self._version += 1
+                        self._condition.notify_all()
+            self._wake.wait(self._interval)
+
+    def wait(
+        self, seen_version: int, timeout: float
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Return ``(version, state)`` once newer than ``seen_version``.
+
+        ``state`` is ``None`` if nothing changed within ``timeout``.
+        """
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._version != seen_version and self._state is not None,
+                timeout,
+            )
+            if self._version == seen_version or self._state is None:
+                return seen_version, None
+            return self._version, self._state
+
+
 @dataclass
 class QueueEntry:
     id: str
@@ -494,6 +577,19 @@ class QueueManager:
                 payload["entry"] = None
             return payload
 
+    def change_token(self) -> Tuple[Any, ...]:
+        """Return a value that changes whenever any entry's queue status does."""
+
+        with self._lock:
+            return (
+                self._admin_playing,
+                self._active_entry_id,
+                tuple(
+                    (entry.id, entry.status, entry.performer_name)
+                    for entry in self._entries
+                ),
+            )
+
     def entry_for_user_key(self, user_key: Optional[str]) -> Optional[QueueEntry]:
         if not user_key:
             return None
@@ -687,6 +783,157 @@ def schedule_power_command(mode: str, delay: float = 1.0) -> Tuple[bool, str]:
     return True, ""
 
 
+def _file_version(path: Path) -> Tuple[Any, ...]:
+    """Identify the on-disk revision of ``path`` without reading it."""
+
+    try:
+        info = path.stat()
+    except OSError:
+        return (str(path), None)
+    return (str(path), info.st_ino, info.st_size, info.st_mtime_ns)
+
+
+class PresetStore:
+    """Sanitised, in-memory copy of one JSON preset file.
+
+    The file is parsed and sanitised once and then served from memory until
+    its stat changes, so hand edits on disk are still picked up.  Writes go
+    through :meth:`replace`, which updates the file atomically and the cache
+    in one step.  ``defaults`` supplies the entries served while the file is
+    missing, unreadable or empty.  :meth:`load` hands out copies, so callers
+    may modify what they get without touching the cache; GETs use
+    :meth:`encoded`, which serialises the cache once per revision instead.
+    """
+
+    def __init__(
+        self,
+        path: Callable[[], Path],
+        key: str,
+        sanitize: Callable[[Any], Optional[Dict[str, Any]]],
+        *,
+        label: str,
+        defaults: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+    ) -> None:
+        self._path = path
+        self.key = key
+        self.label = label
+        self._sanitize = sanitize
+        self._defaults = defaults
+        self._lock = threading.Lock()
+        self._items: List[Dict[str, Any]] = []
+        self._stamp: Optional[Tuple[Any, ...]] = None
+        self._version = 0
+        self._encoded: Optional[Tuple[Tuple[Any, ...], str]] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path()
+
+    @property
+    def version(self) -> int:
+        """Counter bumped every time the cached contents change."""
+
+        with self._lock:
+            return self._version
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Return the sanitised entries, re-reading the file only if it changed."""
+
+        path = self.path
+        stamp = _file_version(path)
+        with self._lock:
+            self._refresh_locked(path, stamp)
+            return copy.deepcopy(self._items)
+
+    def revision(self) -> Tuple[Any, ...]:
+        """Identify the current contents for an ETag without copying them.
+
+        The file is re-read only if it changed.  The cache version is part
+        of the result, so a :meth:`replace` is seen even when the file's
+        stat looks the same.
+        """
+
+        path = self.path
+        stamp = _file_version(path)
+        with self._lock:
+            self._refresh_locked(path, stamp)
+            return (self._stamp, self._version)
+
+    def encoded(self, encode: Callable[[Any], str]) -> Tuple[Tuple[Any, ...], str]:
+        """Return :meth:`revision` and ``{key: entries}`` passed through ``encode``.
+
+        The encoded text is kept until the contents change.
+        """
+
+        path = self.path
+        stamp = _file_version(path)
+        with self._lock:
+            self._refresh_locked(path, stamp)
+            revision = (self._stamp, self._version)
+            if self._encoded is None or self._encoded[0] != revision:
+                self._encoded = (revision, encode({self.key: self._items}))
+            return self._encoded
+
+    def _refresh_locked(self, path: Path, stamp: Tuple[Any, ...]) -> None:
+        if stamp == self._stamp:
+            return
+        items = self._read(path) if stamp[1] is not None else []
+        if not items and self._defaults is not None:
+            items = self._defaults()
+        self._items = items
+        self._stamp = stamp
+        self._version += 1
+
+    def _read(self, path: Path) -> List[Dict[str, Any]]:
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            LOGGER.exception("Unable to read %s file", self.label)
+            return []
+
+        if isinstance(data, dict):
+            raw_items = data.get(self.key, [])
+        else:
+            raw_items = data
+
+        if not isinstance(raw_items, list):
+            LOGGER.warning(
+                "%s file did not contain a list of %s", self.label.capitalize(), self.key
+            )
+            return []
+
+        sanitized: List[Dict[str, Any]] = []
+        for entry in raw_items:
+            item = self._sanitize(entry)
+            if item:
+                sanitized.append(item)
+        return sanitized
+
+    def replace(self, items: List[Dict[str, Any]]) -> None:
+        """Atomically write already-sanitised ``items`` and cache them."""
+
+        path = self.path
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with self._lock:
+            try:
+                with temp_path.open("w", encoding="utf-8") as fh:
+                    json.dump({self.key: items}, fh, indent=2)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(temp_path, path)
+            except OSError:
+                LOGGER.exception("Unable to write %s file", self.label)
+                try:
+                    temp_path.unlink()
+                except OSError:
+                    pass
+                raise
+            self._items = copy.deepcopy(items)
+            self._stamp = _file_version(path)
+            self._version += 1
+
+
 def _generate_channel_preset_id(prefix: str) -> str:
     return f"{prefix}_{uuid.uuid4().hex}"
 
@@ -939,30 +1186,29 @@ def sanitize_channel_preset(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
 
 def load_channel_presets_from_disk() -> List[Dict[str, Any]]:
-    if not CHANNEL_PRESETS_FILE.exists():
-        return []
-    try:
-        with CHANNEL_PRESETS_FILE.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-    except (OSError, json.JSONDecodeError):
-        LOGGER.exception("Unable to read channel presets file")
-        return []
-
-    if isinstance(data, dict):
-        raw_presets = data.get("presets", [])
-    else:
-        raw_presets = data
+    return channel_preset_store.load()
 
-    if not isinstance(raw_presets, list):
-        LOGGER.warning("Channel presets file did not contain a list of presets")
-        return []
 
-    sanitized: List[Dict[str, Any]] = []
-    for entry in raw_presets:
-        preset = sanitize_channel_preset(entry)
-        if preset:
-            sanitized.append(preset)
-    return sanitized
+def channel_master_groups(presets: Iterable[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """Map each fixture group named by the channel presets to its channels."""
+
+    groups: Dict[str, List[int]] = {}
+    for preset in presets:
+        group = preset.get("group")
+        channel = preset.get("channel")
+        if not isinstance(group, str) or not group.strip() or not isinstance(channel, int):
+            continue
+        channels = groups.setdefault(group.strip(), [])
+        if channel not in channels:
+            channels.append(channel)
+    return groups
+
+
+def _refresh_master_groups() -> None:
+    try:
+        dmx_manager.set_master_groups(channel_master_groups(load_channel_presets_from_disk()))
+    except Exception:  # pragma: no cover - defensive logging
+        LOGGER.exception("Unable to load fixture groups for DMX submasters")
 
 
 def save_channel_presets_to_disk(presets: Iterable[Dict[str, Any]]) -> None:
@@ -972,12 +1218,7 @@ def save_channel_presets_to_disk(presets: Iterable[Dict[str, Any]]) -> None:
         if preset:
             sanitized.append(preset)
 
-    try:
-        with CHANNEL_PRESETS_FILE.open("w", encoding="utf-8") as fh:
-            json.dump({"presets": sanitized}, fh, indent=2)
-    except OSError:
-        LOGGER.exception("Unable to write channel presets file")
-        raise
+    channel_preset_store.replace(sanitized)
 
 
 def sanitize_color_preset(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -1015,6 +1256,10 @@ def sanitize_color_preset(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     except (TypeError, ValueError):
         blue_value = 255
 
+    red_value = _clamp(red_value, 0, 255)
+    green_value = _clamp(green_value, 0, 255)
+    blue_value = _clamp(blue_value, 0, 255)
+
     fallback_hex = f"#{red_value:02x}{green_value:02x}{blue_value:02x}"
     icon_source = raw.get("iconColor") if isinstance(raw.get("iconColor"), str) else raw.get("color")
     icon_color = _normalize_hex_color(icon_source, fallback_hex)
@@ -1023,41 +1268,14 @@ def sanitize_color_preset(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         "id": preset_id,
         "name": name,
         "iconColor": icon_color,
-        "red": _clamp(red_value, 0, 255),
-        "green": _clamp(green_value, 0, 255),
-        "blue": _clamp(blue_value, 0, 255),
+        "red": red_value,
+        "green": green_value,
+        "blue": blue_value,
     }
 
 
 def load_color_presets_from_disk() -> List[Dict[str, Any]]:
-    if not COLOR_PRESETS_FILE.exists():
-        return [preset for preset in (sanitize_color_preset(entry) for entry in DEFAULT_COLOR_PRESETS) if preset]
-
-    try:
-        with COLOR_PRESETS_FILE.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-    except (OSError, json.JSONDecodeError):
-        LOGGER.exception("Unable to read color presets file")
-        return [preset for preset in (sanitize_color_preset(entry) for entry in DEFAULT_COLOR_PRESETS) if preset]
-
-    if isinstance(data, dict):
-        raw_presets = data.get("presets", [])
-    else:
-        raw_presets = data
-
-    if not isinstance(raw_presets, list):
-        LOGGER.warning("Color presets file did not contain a list of presets")
-        return [preset for preset in (sanitize_color_preset(entry) for entry in DEFAULT_COLOR_PRESETS) if preset]
-
-    sanitized: List[Dict[str, Any]] = []
-    for entry in raw_presets:
-        preset = sanitize_color_preset(entry)
-        if preset:
-            sanitized.append(preset)
-
-    if not sanitized:
-        return [preset for preset in (sanitize_color_preset(entry) for entry in DEFAULT_COLOR_PRESETS) if preset]
-    return sanitized
+    return color_preset_store.load()
 
 
 def save_color_presets_to_disk(presets: Iterable[Dict[str, Any]]) -> None:
@@ -1072,12 +1290,7 @@ def save_color_presets_to_disk(presets: Iterable[Dict[str, Any]]) -> None:
             preset for preset in (sanitize_color_preset(entry) for entry in DEFAULT_COLOR_PRESETS) if preset
         ]
 
-    try:
-        with COLOR_PRESETS_FILE.open("w", encoding="utf-8") as fh:
-            json.dump({"presets": sanitized}, fh, indent=2)
-    except OSError:
-        LOGGER.exception("Unable to write color presets file")
-        raise
+    color_preset_store.replace(sanitized)
 
 
 def sanitize_relay_preset(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -1136,31 +1349,7 @@ def sanitize_relay_preset(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
 
 def load_relay_presets_from_disk() -> List[Dict[str, Any]]:
-    if not RELAY_PRESETS_FILE.exists():
-        return []
-
-    try:
-        with RELAY_PRESETS_FILE.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-    except (OSError, json.JSONDecodeError):
-        LOGGER.exception("Unable to read relay presets file")
-        return []
-
-    if isinstance(data, dict):
-        raw_presets = data.get("presets", [])
-    else:
-        raw_presets = data
-
-    if not isinstance(raw_presets, list):
-        LOGGER.warning("Relay presets file did not contain a list of presets")
-        return []
-
-    sanitized: List[Dict[str, Any]] = []
-    for entry in raw_presets:
-        preset = sanitize_relay_preset(entry)
-        if preset:
-            sanitized.append(preset)
-    return sanitized
+    return relay_preset_store.load()
 
 
 def save_relay_presets_to_disk(presets: Iterable[Dict[str, Any]]) -> None:
@@ -1176,12 +1365,7 @@ def save_relay_presets_to_disk(presets: Iterable[Dict[str, Any]]) -> None:
     if items and not sanitized:
         raise ValueError("No valid relay presets were provided")
 
-    try:
-        with RELAY_PRESETS_FILE.open("w", encoding="utf-8") as fh:
-            json.dump({"presets": sanitized}, fh, indent=2)
-    except OSError:
-        LOGGER.exception("Unable to write relay presets file")
-        raise
+    relay_preset_store.replace(sanitized)
 
 
 def _generate_template_id(prefix: str) -> str:
@@ -1324,7 +1508,7 @@ def sanitize_template_row(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     else:
         master_state = sanitize_template_master_state(raw.get("master"), channel_master_id)
 
-    return {
+    row = {
         "id": row_id,
         "type": "action",
         "channel": channel,
@@ -1335,6 +1519,14 @@ def sanitize_template_row(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         "channelMasterId": channel_master_id,
         "master": master_state,
     }
+    # Linear is the default fade curve, so only other curves are stored.
+    try:
+        curve = get_fade_curve(str(raw.get("curve") or "")).name
+    except ValueError:
+        curve = FADE_CURVE_LINEAR
+    if curve != FADE_CURVE_LINEAR:
+        row["curve"] = curve
+    return row
 
 
 def sanitize_light_template(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -1358,30 +1550,7 @@ def sanitize_light_template(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
 
 def load_light_templates_from_disk() -> List[Dict[str, Any]]:
-    if not LIGHT_TEMPLATES_FILE.exists():
-        return []
-    try:
-        with LIGHT_TEMPLATES_FILE.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-    except (OSError, json.JSONDecodeError):
-        LOGGER.exception("Unable to read light templates file")
-        return []
-
-    if isinstance(data, dict):
-        raw_templates = data.get("templates", [])
-    else:
-        raw_templates = data
-
-    if not isinstance(raw_templates, list):
-        LOGGER.warning("Light templates file did not contain a list of templates")
-        return []
-
-    sanitized: List[Dict[str, Any]] = []
-    for entry in raw_templates:
-        template = sanitize_light_template(entry)
-        if template:
-            sanitized.append(template)
-    return sanitized
+    return light_template_store.load()
 
 
 def save_light_templates_to_disk(templates: Iterable[Dict[str, Any]]) -> None:
@@ -1391,12 +1560,27 @@ def save_light_templates_to_disk(templates: Iterable[Dict[str, Any]]) -> None:
         if template:
             sanitized.append(template)
 
-    try:
-        with LIGHT_TEMPLATES_FILE.open("w", encoding="utf-8") as fh:
-            json.dump({"templates": sanitized}, fh, indent=2)
-    except OSError:
-        LOGGER.exception("Unable to write light templates file")
-        raise
+    light_template_store.replace(sanitized)
+
+
+channel_preset_store = PresetStore(
+    lambda: CHANNEL_PRESETS_FILE, "presets", sanitize_channel_preset, label="channel presets"
+)
+color_preset_store = PresetStore(
+    lambda: COLOR_PRESETS_FILE,
+    "presets",
+    sanitize_color_preset,
+    label="color presets",
+    defaults=lambda: [
+        preset for preset in (sanitize_color_preset(entry) for entry in DEFAULT_COLOR_PRESETS) if preset
+    ],
+)
+relay_preset_store = PresetStore(
+    lambda: RELAY_PRESETS_FILE, "presets", sanitize_relay_preset, label="relay presets"
+)
+light_template_store = PresetStore(
+    lambda: LIGHT_TEMPLATES_FILE, "templates", sanitize_light_template, label="light templates"
+)
 
 
 def load_video_config(config_path: Path) -> Dict[str, Any]:
@@ -1448,7 +1632,44 @@ def _mpv_flag_is_true(value: Union[str, int, float, bool, None]) -> bool:
     return bool(value)
 
 
+@dataclass
+class _PlaybackWatch:
+    """Tracks one non-looping playback until it hands back to the default loop."""
+
+    stop_event: threading.Event
+    has_started_playing: bool = False
+    restore_requested: bool = False
+    grace_timer: Optional[threading.Timer] = None
+
+
 class PlaybackController:
+    # Properties mpv pushes to us as ``property-change`` events, keyed by the
+    # observer id passed to ``observe_property``.
+    _OBSERVED_PROPERTIES = (
+        "idle-active",
+        "eof-reached",
+        "playlist-pos",
+        "volume",
+        "time-pos",
+        "duration",
+        "pause",
+    )
+    # Observed properties mirrored into the playback state snapshot.
+    _STATE_PROPERTIES = {
+        "volume": "volume",
+        "time-pos": "position",
+        "duration": "duration",
+        "pause": "paused",
+    }
+    _EMPTY_PLAYER_STATE: Dict[str, Any] = {
+        "volume": None,
+        "position": None,
+        "duration": None,
+        "paused": None,
+    }
+    # How long a new playback may take to start before we give up on it.
+    _START_GRACE_SECONDS = 5.0
+
     def __init__(
         self,
         default_video: Path,
@@ -1457,16 +1678,27 @@ class PlaybackController:
         on_default_start: Optional[Callable[[Path], None]] = None,
         warning_video: Optional[Path] = None,
         welcome_video: Optional[Path] = None,
+        on_playback_time: Optional[Callable[[Optional[float], bool], None]] = None,
     ) -> None:
         self.default_video = default_video
         self._lock = threading.RLock()
         self._process: Optional[subprocess.Popen[bytes]] = None
         self._current: Optional[Path] = None
         self._ipc_path = str(BASE_DIR / "mpv-ipc.sock")
-        self._idle_monitor_thread: Optional[threading.Thread] = None
-        self._idle_monitor_stop: Optional[threading.Event] = None
+        self._ipc = MpvIpcClient(self._ipc_path)
+        self._ipc.subscribe(self._handle_mpv_event)
+        self._ipc.add_connect_listener(self._observe_properties)
+        self._playback_watch: Optional[_PlaybackWatch] = None
+        self._playlist_pos: Optional[int] = None
+        # Latest mpv property values, replaced wholesale on every update so
+        # query_state can read it without taking any lock.
+        self._player_state: Dict[str, Any] = dict(self._EMPTY_PLAYER_STATE)
+        self._player_state_lock = threading.Lock()
         self._on_video_start = on_video_start
         self._on_default_start = on_default_start
+        # Receives (time-pos, paused) from the IPC reader thread once the
+        # requested video is on screen, so it must not block.
+        self._on_playback_time = on_playback_time
         self._warning_video = warning_video
         self._welcome_video = welcome_video
         self._pending_video_start: Optional[Path] = None
@@ -1580,11 +1812,15 @@ class PlaybackController:
         self._ensure_player_running()
         if loop:
             self._clear_pending_video_start()
+            self._cancel_idle_monitor_locked()
         else:
             self._pending_video_start = video_path
             self._pending_requires_playlist_advance = bool(sequence)
             self._pending_playlist_offset = len(sequence) if sequence else 0
             self._start_callback_fired = False
+            # Start watching before loading so the first events for the new
+            # file cannot slip past us.
+            self._start_idle_monitor_locked()
         try:
             if sequence:
                 first = sequence[0]
@@ -1605,15 +1841,11 @@ class PlaybackController:
             raise RuntimeError("Unable to control mpv player") from exc
 
         self._current = video_path
-        if loop:
-            self._cancel_idle_monitor_locked()
-            if self._on_default_start:
-                try:
-                    self._on_default_start(video_path)
-                except Exception:  # pragma: no cover - defensive logging
-                    LOGGER.exception("Default start callback failed")
-        else:
-            self._start_idle_monitor_locked()
+        if loop and self._on_default_start:
+            try:
+                self._on_default_start(video_path)
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("Default start callback failed")
 
     def _update_default_loop_subtitle_locked(self, text: Optional[str]) -> None:
         path = self._stage_overlay_subtitle_path
@@ -1792,10 +2024,7 @@ class PlaybackController:
         except Exception:
             LOGGER.exception("Unexpected error reloading default loop subtitle")
 
-    def _maybe_fire_video_start(self, idle: bool) -> None:
-        if idle:
-            return
-
+    def _maybe_fire_video_start(self) -> None:
         with self._lock:
             pending = self._pending_video_start
             requires_advance = self._pending_requires_playlist_advance
@@ -1807,17 +2036,9 @@ class PlaybackController:
             return
 
         if requires_advance:
-            try:
-                response = self._send_ipc_command("get_property", "playlist-pos")
-            except OSError:
-                return
-            if response.get("error") != "success":
-                return
-            try:
-                position = int(response.get("data"))
-            except (TypeError, ValueError):
-                return
-            if position < playlist_offset:
+            # playlist-pos is observed, so the pre-roll check needs no IPC.
+            position = self._playlist_pos
+            if position is None or position < playlist_offset:
                 return
 
         with self._lock:
@@ -1846,6 +2067,10 @@ class PlaybackController:
                 "Video player command not found. Install mpv or configure VIDEO_PLAYER_CMD."
             )
 
+        # A previous mpv instance may have left the client attached to its
+        # socket; the new process listens on a fresh one.
+        self._ipc.close()
+        self._clear_player_state()
         ipc_path = Path(self._ipc_path)
         if ipc_path.exists():
             try:
@@ -1898,24 +2123,7 @@ class PlaybackController:
         raise RuntimeError("Timed out waiting for mpv IPC to become ready")
 
     def _send_ipc_command(self, *command: str) -> Dict[str, Any]:
-        payload = json.dumps({"command": list(command)}).encode("utf-8") + b"\n"
-
-        with socket.socket(socket.AF_UNIX) as sock:
-            sock.connect(self._ipc_path)
-            sock.sendall(payload)
-            data = b""
-            while not data.endswith(b"\n"):
-                chunk = sock.recv(4096)
-                if not chunk:
-                    break
-                data += chunk
-
-        if not data:
-            return {"error": "empty"}
-        try:
-            return json.loads(data.decode("utf-8"))
-        except json.JSONDecodeError:
-            return {"error": "invalid"}
+        return self._ipc.command(*command)
 
     def _get_property_locked(self, name: str) -> Any:
         try:
@@ -1938,38 +2146,37 @@ class PlaybackController:
                 return None
         return None
 
+    def _update_player_state(self, key: str, value: Any) -> None:
+        with self._player_state_lock:
+            if self._player_state.get(key) == value:
+                return
+            state = dict(self._player_state)
+            state[key] = value
+            self._player_state = state
+
+    def _clear_player_state(self) -> None:
+        with self._player_state_lock:
+            self._player_state = dict(self._EMPTY_PLAYER_STATE)
+
     def query_state(self) -> Dict[str, Any]:
-        with self._lock:
-            current = self._current
-            is_default = current is None or current == self.default_video
-            process_running = self._process is not None and self._process.poll() is None
-
-            volume_value: Optional[float] = None
-            position_value: Optional[float] = None
-            duration_value: Optional[float] = None
-            paused_value: Optional[bool] = None
-
-            if process_running:
-                volume_raw = self._get_property_locked("volume")
-                position_raw = self._get_property_locked("time-pos")
-                duration_raw = self._get_property_locked("duration")
-                pause_raw = self._get_property_locked("pause")
-
-                volume_value = self._coerce_float(volume_raw)
-                position_value = self._coerce_float(position_raw)
-                duration_value = self._coerce_float(duration_raw)
-                if pause_raw is not None:
-                    paused_value = _mpv_flag_is_true(pause_raw)
-
-            return {
-                "current": str(current) if current else None,
-                "is_default": is_default,
-                "is_running": process_running,
-                "volume": volume_value,
-                "position": position_value,
-                "duration": duration_value,
-                "paused": paused_value,
-            }
+        """Return the playback state from the event-fed snapshot.
+
+        Never blocks on the controller lock or on mpv.
+        """
+
+        current = self._current
+        process = self._process
+        process_running = process is not None and process.poll() is None
+        state = self._player_state if process_running else self._EMPTY_PLAYER_STATE
+        return {
+            "current": str(current) if current else None,
+            "is_default": current is None or current == self.default_video,
+            "is_running": process_running,
+            "volume": state["volume"],
+            "position": state["position"],
+            "duration": state["duration"],
+            "paused": state["paused"],
+        }
 
     def set_volume(self, volume: Union[int, float]) -> float:
         clamped = max(0.0, min(100.0, float(volume)))
@@ -1987,72 +2194,133 @@ class PlaybackController:
             current_volume = self._get_property_locked("volume")
 
         coerced = self._coerce_float(current_volume)
-        return clamped if coerced is None else coerced
+        result = clamped if coerced is None else coerced
+        self._update_player_state("volume", result)
+        return result
 
     def _cancel_idle_monitor_locked(self) -> None:
-        if self._idle_monitor_stop:
-            self._idle_monitor_stop.set()
-            self._idle_monitor_stop = None
-        self._idle_monitor_thread = None
+        watch = self._playback_watch
+        self._playback_watch = None
+        if watch is None:
+            return
+        watch.stop_event.set()
+        if watch.grace_timer is not None:
+            watch.grace_timer.cancel()
 
     def _start_idle_monitor_locked(self) -> None:
         self._cancel_idle_monitor_locked()
-        stop_event = threading.Event()
-        self._idle_monitor_stop = stop_event
-        thread = threading.Thread(
-            target=self._monitor_idle_and_restore_default,
-            args=(stop_event,),
-            daemon=True,
+        watch = _PlaybackWatch(stop_event=threading.Event())
+        timer = threading.Timer(
+            self._START_GRACE_SECONDS, self._handle_start_timeout, args=(watch,)
         )
-        self._idle_monitor_thread = thread
-        thread.start()
+        timer.daemon = True
+        watch.grace_timer = timer
+        self._playback_watch = watch
+        timer.start()
 
-    def _monitor_idle_and_restore_default(self, stop_event: threading.Event) -> None:
-        start_time = time.monotonic()
-        has_started_playing = False
+    def _observe_properties(self) -> None:
+        """Ask mpv to push the properties playback tracking relies on."""
 
-        while not stop_event.is_set():
-            time.sleep(0.5)
+        for observer_id, name in enumerate(self._OBSERVED_PROPERTIES, start=1):
             try:
-                idle_response = self._send_ipc_command("get_property", "idle-active")
+                self._ipc.command("observe_property", observer_id, name)
             except OSError:
+                LOGGER.warning("Unable to observe mpv property %s", name)
                 return
 
-            idle = idle_response.get("error") == "success" and _mpv_flag_is_true(
-                idle_response.get("data")
-            )
+    def _handle_mpv_event(self, event: Dict[str, Any]) -> None:
+        """React to an mpv event.
+
+        Runs on the IPC reader thread, so anything that takes the controller
+        lock or talks to mpv is handed to a worker thread.
+        """
+
+        name = event.get("event")
+        watch = self._playback_watch
+        if name == "property-change":
+            prop = event.get("name")
+            data = event.get("data")
+            state_key = self._STATE_PROPERTIES.get(str(prop))
+            if state_key is not None:
+                if state_key == "paused":
+                    value = None if data is None else _mpv_flag_is_true(data)
+                else:
+                    value = self._coerce_float(data)
+                self._update_player_state(state_key, value)
+                if state_key in ("position", "paused"):
+                    self._report_playback_time()
+                return
+            if prop == "playlist-pos":
+                try:
+                    self._playlist_pos = int(data)
+                except (TypeError, ValueError):
+                    self._playlist_pos = None
+                # mpv may deliver this after the main file's file-loaded, so
+                # a start waiting for the pre-roll to finish is retried here.
+                if (
+                    self._pending_video_start is not None
+                    and self._pending_requires_playlist_advance
+                ):
+                    self._spawn(self._maybe_fire_video_start)
+                return
+            if watch is None or watch.stop_event.is_set():
+                return
+            if prop == "idle-active":
+                if _mpv_flag_is_true(data):
+                    self._request_default_restore(watch)
+            elif prop == "eof-reached" and _mpv_flag_is_true(data):
+                self._request_default_restore(watch)
+            return
 
-            self._maybe_fire_video_start(idle)
+        if watch is None or watch.stop_event.is_set():
+            return
+        if name == "file-loaded":
+            # Only a loaded file counts as started; idle and eof reports that
+            # arrive before it may still belong to the previous file.
+            watch.has_started_playing = True
+            self._spawn(self._maybe_fire_video_start)
+        elif name == "end-file" and event.get("reason") == "error":
+            # A failed load leaves mpv idle when nothing else is queued, which
+            # the idle-active observer turns into a restore.
+            LOGGER.warning("mpv failed to play a file: %s", event.get("file_error"))
+
+    def _report_playback_time(self) -> None:
+        callback = self._on_playback_time
+        if callback is None or not self._start_callback_fired:
+            return
+        state = self._player_state
+        try:
+            callback(state.get("position"), bool(state.get("paused")))
+        except Exception:  # pragma: no cover - defensive logging
+            LOGGER.exception("Playback time callback failed")
 
-            if not has_started_playing:
-                # mpv reports eof-reached=True for a short window after a file ends,
-                # even immediately after loading a new file.  Ignore idle/eof until
-                # we've confirmed that playback actually started so we don't bounce
-                # straight back to the default loop when replaying a song.
-                if not idle:
-                    has_started_playing = True
-                elif time.monotonic() - start_time < 5.0:
-                    continue
-                else:
-                    with self._lock:
-                        if stop_event.is_set():
-                            return
-                        self._play_video_locked(self.default_video, loop=True)
-                    return
+    def _request_default_restore(self, watch: _PlaybackWatch) -> None:
+        # mpv can report a stale idle/eof state from the previous file right
+        # after a new one is loaded, so ignore it until playback has started.
+        if not watch.has_started_playing or watch.restore_requested:
+            return
+        watch.restore_requested = True
+        self._spawn(self._restore_default_after_playback, watch)
 
-            eof_reached = False
-            if not idle:
-                eof_response = self._send_ipc_command("get_property", "eof-reached")
-                eof_reached = _mpv_flag_is_true(eof_response.get("data")) if (
-                    eof_response.get("error") == "success"
-                ) else False
-
-            if idle or eof_reached:
-                with self._lock:
-                    if stop_event.is_set():
-                        return
-                    self._play_video_locked(self.default_video, loop=True)
+    def _handle_start_timeout(self, watch: _PlaybackWatch) -> None:
+        if watch.has_started_playing or watch.stop_event.is_set():
+            return
+        LOGGER.warning("Playback did not start in time; returning to default loop")
+        watch.restore_requested = True
+        self._restore_default_after_playback(watch)
+
+    def _restore_default_after_playback(self, watch: _PlaybackWatch) -> None:
+        with self._lock:
+            if watch.stop_event.is_set() or self._playback_watch is not watch:
                 return
+            try:
+                self._play_video_locked(self.default_video, loop=True)
+            except Exception:
+                LOGGER.exception("Unable to return to the default loop")
+
+    @staticmethod
+    def _spawn(target: Callable[..., None], *args: Any) -> None:
+        threading.Thread(target=target, args=args, daemon=True).start()
 
     def _reset_player_state(self) -> None:
         if self._process and self._process.poll() is None:
@@ -2064,6 +2332,7 @@ class PlaybackController:
 
         self._process = None
         self._current = None
+        self._ipc.close()
         self._cancel_idle_monitor_locked()
 
 
@@ -2076,17 +2345,23 @@ video_config = load_video_config(DATA_FILE)
 DEFAULT_VIDEO_PATH = resolve_media_path(video_config["default_video"])
 DMX_UNIVERSE = int(os.environ.get("DMX_UNIVERSE", "0"))
 
-dmx_manager: DMXShowManager = create_manager(DMX_TEMPLATE_DIR, universe=DMX_UNIVERSE)
+DMX_PATCH_FILE = BASE_DIR / "dmx_patch.json"
+
+dmx_manager: DMXShowManager = create_manager(
+    DMX_TEMPLATE_DIR, universe=DMX_UNIVERSE, patch_file=DMX_PATCH_FILE
+)
 user_registry = UserRegistry()
 playback_session = PlaybackSession()
 queue_manager = QueueManager(user_registry)
 
 snow_machine_controller = SnowMachineController(
-    load_relay_presets_from_disk,
+    relay_preset_store.load,
     preset_id=SNOW_MACHINE_PRESET_ID,
     request_timeout=SNOW_MACHINE_TIMEOUT,
+    health=dmx_manager.relay_health,
 )
 dmx_manager.set_relay_action_callback(snow_machine_controller.handle_relay_action)
+_refresh_master_groups()
 
 
 def _build_https_redirect_url() -> str:
@@ -2120,6 +2395,7 @@ if hasattr(app, "before_request"):
 def _handle_default_start(_: Path) -> None:
     playback_session.clear()
     queue_manager.finish_active()
+    status_broadcaster.notify()
     try:
         controller.set_stage_code_overlay(queue_manager.current_code())
     except Exception:
@@ -2139,6 +2415,7 @@ def _handle_default_start(_: Path) -> None:
 
 
 def _handle_video_start(video_path: Path) -> None:
+    status_broadcaster.notify()
     try:
         controller.set_stage_code_overlay(None)
     except Exception:
@@ -2148,16 +2425,21 @@ def _handle_video_start(video_path: Path) -> None:
         LOGGER.warning("Unable to locate video entry for %s", video_path)
         return
     try:
-        dmx_manager.start_show_for_video(video_entry)
+        dmx_manager.start_show_for_video(video_entry, follow_playback=True)
     except Exception:
         LOGGER.exception(
             "Unable to start DMX show for video %s", video_entry.get("name", video_entry.get("id"))
         )
 
 
+def _handle_playback_time(position: Optional[float], paused: bool) -> None:
+    dmx_manager.sync_show_clock(position, paused=paused)
+
+
 controller = PlaybackController(
     DEFAULT_VIDEO_PATH,
     on_video_start=_handle_video_start,
+    on_playback_time=_handle_playback_time,
     on_default_start=_handle_default_start,
     warning_video=WARNING_VIDEO_PATH,
     welcome_video=WELCOME_VIDEO_PATH,
@@ -2282,6 +2564,51 @@ def _request_queue_id(data: Optional[Dict[str, Any]] = None) -> Optional[str]:
     return None
 
 
+def _etag_for(value: Any) -> str:
+    """Return a strong entity tag for a JSON-serialisable ``value``."""
+
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _tag_response(response: Any, etag: str) -> Any:
+    response.set_etag(etag)
+    # Let browsers keep the body but always revalidate it with the ETag.
+    response.cache_control.no_cache = True
+    return response
+
+
+def _not_modified(etag: str) -> Optional[Any]:
+    """Return a 304 response when the client already holds ``etag``."""
+
+    if not request.if_none_match.contains(etag):
+        return None
+    return _tag_response(app.response_class(status=304), etag)
+
+
+def _json_with_etag(payload: Any, etag: Optional[str] = None) -> Any:
+    """``jsonify`` ``payload`` unless the client's cached copy is current."""
+
+    if etag is None:
+        etag = _etag_for(payload)
+    response = _not_modified(etag)
+    if response is None:
+        response = _tag_response(jsonify(payload), etag)
+    return response
+
+
+def _preset_response(store: PresetStore) -> Any:
+    # The store's revision identifies its contents, so a revalidation can be
+    # answered without copying or re-sanitising them, and a full GET reuses
+    # the body encoded for that revision.
+    revision, body = store.encoded(app.json.dumps)
+    etag = _etag_for([store.key, revision])
+    response = _not_modified(etag)
+    if response is not None:
+        return response
+    return _tag_response(app.response_class(f"{body}\n", mimetype=app.json.mimetype), etag)
+
+
 def _restart_default_loop_for_stage_code() -> Optional[str]:
     try:
         state = controller.query_state()
@@ -2430,7 +2757,7 @@ def api_queue_status() -> Any:
         is_playing=is_playing,
         active_remaining=remaining,
     )
-    response = jsonify(status_payload)
+    response = _json_with_etag(status_payload)
     if entry_id and not status_payload.get("entry"):
         response.delete_cookie("queue_id")
     return response
@@ -2465,8 +2792,7 @@ def api_queue_leave() -> Any:
 
 @app.route("/api/channel-presets", methods=["GET"])
 def api_get_channel_presets() -> Any:
-    presets = load_channel_presets_from_disk()
-    return jsonify({"presets": presets})
+    return _preset_response(channel_preset_store)
 
 
 @app.route("/api/channel-presets", methods=["PUT"])
@@ -2489,13 +2815,13 @@ def api_put_channel_presets() -> Any:
         return jsonify({"error": "Unable to save channel presets"}), 500
 
     presets = load_channel_presets_from_disk()
+    _refresh_master_groups()
     return jsonify({"presets": presets})
 
 
 @app.route("/api/color-presets", methods=["GET"])
 def api_get_color_presets() -> Any:
-    presets = load_color_presets_from_disk()
-    return jsonify({"presets": presets})
+    return _preset_response(color_preset_store)
 
 
 @app.route("/api/color-presets", methods=["PUT"])
@@ -2521,10 +2847,59 @@ def api_put_color_presets() -> Any:
     return jsonify({"presets": presets})
 
 
+def relay_preset_health(
+    presets: Iterable[Dict[str, Any]], host_status: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Summarise the relay host breakers behind each preset, keyed by preset id.
+
+    Hosts that have not been contacted yet count as online.
+    """
+
+    health: Dict[str, Dict[str, Any]] = {}
+    for preset in presets:
+        offline: Dict[str, Optional[str]] = {}
+        for command in preset.get("commands", []):
+            netloc = urlsplit(command.get("url", "")).netloc
+            status = host_status.get(netloc)
+            if status and not status.get("online", True):
+                offline[netloc] = status.get("reason")
+        health[str(preset.get("id"))] = {
+            "online": not offline,
+            "offline_hosts": offline,
+        }
+    return health
+
+
+def _relay_host_status() -> Dict[str, Dict[str, Any]]:
+    health = getattr(dmx_manager, "relay_health", None)
+    return health.get_status() if health is not None else {}
+
+
+def _relay_host_states(
+    status: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Tuple[str, bool, Optional[str]]]:
+    if status is None:
+        status = _relay_host_status()
+    return sorted(
+        (netloc, bool(entry["online"]), None if entry["online"] else entry["reason"])
+        for netloc, entry in status.items()
+    )
+
+
 @app.route("/api/relay-presets", methods=["GET"])
 def api_get_relay_presets() -> Any:
+    # Breakers change without the file changing, so their state is part of
+    # the tag.
+    host_status = _relay_host_status()
+    etag = _etag_for(
+        ["presets", relay_preset_store.revision(), _relay_host_states(host_status)]
+    )
+    response = _not_modified(etag)
+    if response is not None:
+        return response
     presets = load_relay_presets_from_disk()
-    return jsonify({"presets": presets})
+    payload = {"presets": presets, "health": relay_preset_health(presets, host_status)}
+    return _tag_response(jsonify(payload), etag)
 
 
 @app.route("/api/relay-presets", methods=["PUT"])
@@ -2554,10 +2929,48 @@ def api_put_relay_presets() -> Any:
     return jsonify({"presets": presets})
 
 
+def relay_preset_latency(
+    presets: Iterable[Dict[str, Any]], host_stats: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Attach the measured latency of each preset's relay boards to the preset.
+
+    A preset reports the slowest of its boards, since that is the one its
+    cues have to wait for.
+    """
+
+    report: List[Dict[str, Any]] = []
+    for preset in presets:
+        hosts: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        for command in preset.get("commands", []):
+            netloc = urlsplit(command.get("url", "")).netloc
+            if not netloc or netloc in seen:
+                continue
+            seen.add(netloc)
+            hosts.append({"host": netloc, **host_stats.get(netloc, {})})
+        measured = [host for host in hosts if host.get("latency_ms") is not None]
+        slowest = max(measured, key=lambda host: host["latency_ms"], default=None)
+        report.append(
+            {
+                "id": preset.get("id"),
+                "name": preset.get("name", ""),
+                "latency_ms": slowest["latency_ms"] if slowest else None,
+                "jitter_ms": slowest["jitter_ms"] if slowest else None,
+                "hosts": hosts,
+            }
+        )
+    return report
+
+
+@app.route("/api/relay-presets/latency", methods=["GET"])
+def api_get_relay_preset_latency() -> Any:
+    presets = load_relay_presets_from_disk()
+    return jsonify({"presets": relay_preset_latency(presets, dmx_manager.get_relay_stats())})
+
+
 @app.route("/api/light-templates", methods=["GET"])
 def api_get_light_templates() -> Any:
-    templates = load_light_templates_from_disk()
-    return jsonify({"templates": templates})
+    return _preset_response(light_template_store)
 
 
 @app.route("/api/light-templates", methods=["PUT"])
@@ -2643,7 +3056,7 @@ def api_videos() -> Any:
         if file_value:
             video["video_url"] = f"/media/{file_value}"
         videos.append(video)
-    return jsonify({"videos": videos})
+    return _json_with_etag({"videos": videos})
 
 
 @app.route("/api/play", methods=["POST"])
@@ -2777,15 +3190,21 @@ def api_stop() -> Any:
 @app.route("/api/status")
 def api_status() -> Any:
     request_key = request.args.get("key")
-    user = user_registry.get(request_key)
-    is_admin = bool(user.get("admin")) if user else False
-
     state = controller.query_state()
     if not isinstance(state, dict):
         state = {}
-    mode = "default_loop" if state.get("is_default") else "video"
+    queue_manager.expire_ready_if_needed(is_playing=not state.get("is_default"))
+    payload = _status_payload(state, request_key)
+    # Sub-second position changes would give every poll a new tag, so the
+    # tag uses whole seconds while the response keeps the precise position.
+    etag = _etag_for({**payload, "position": _whole_seconds(payload.get("position"))})
+    return _json_with_etag(payload, etag)
 
-    queue_manager.expire_ready_if_needed(is_playing=(mode == "video"))
+
+def _status_payload(state: Dict[str, Any], request_key: Optional[str]) -> Dict[str, Any]:
+    user = user_registry.get(request_key)
+    is_admin = bool(user.get("admin")) if user else False
+    mode = "default_loop" if state.get("is_default") else "video"
 
     video_info: Optional[Dict[str, Any]] = None
     current_value = state.get("current")
@@ -2816,6 +3235,10 @@ def api_status() -> Any:
     payload["smoke_available"] = dmx_manager.is_smoke_available()
     payload["snow_machine_active"] = snow_machine_controller.is_active()
     payload["snow_machine_available"] = snow_machine_controller.is_available()
+    payload["relay_hosts"] = {
+        netloc: {"online": online, "reason": reason}
+        for netloc, online, reason in _relay_host_states()
+    }
 
     if mode != "video":
         playback_session.clear()
@@ -2829,8 +3252,121 @@ def api_status() -> Any:
         "can_play": bool(is_admin or mode != "video"),
         "has_active_owner": bool(owner_key),
     }
+    return payload
+
+
+def _whole_seconds(position: Any) -> Any:
+    """Truncate a playback position to whole seconds, all the UI shows."""
+
+    if isinstance(position, (int, float)) and not isinstance(position, bool):
+        return float(int(position))
+    return position
+
+
+def _sample_stage_state() -> Dict[str, Any]:
+    """Collect everything the event stream reports, shared by all clients."""
+
+    state = controller.query_state()
+    if not isinstance(state, dict):
+        state = {}
+    is_playing = not state.get("is_default")
+    queue_manager.expire_ready_if_needed(is_playing=is_playing)
+    playback = dict(state)
+    playback["position"] = _whole_seconds(state.get("position"))
+    return {
+        "playback": playback,
+        "smoke": (dmx_manager.is_smoke_active(), dmx_manager.is_smoke_available()),
+        "snow": (
+            snow_machine_controller.is_active(),
+            snow_machine_controller.is_available(),
+        ),
+        "relays": _relay_host_states(),
+        "queue": queue_manager.change_token(),
+        "stage_code": queue_manager.current_code(),
+        "owner": playback_session.owner_key(),
+    }
+
 
-    return jsonify(payload)
+status_broadcaster = StatusBroadcaster(_sample_stage_state)
+
+EVENT_STREAM_KEEPALIVE_SECONDS = 15.0
+# Queue payloads carry wait estimates, so they are refreshed at least this
+# often even when the queue itself has not changed.
+EVENT_STREAM_QUEUE_REFRESH_SECONDS = 5.0
+
+
+def _format_sse(event: str, payload: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+def _event_stream(
+    request_key: Optional[str], entry_id: Optional[str], is_admin: bool
+) -> Iterable[str]:
+    last_status: Optional[Dict[str, Any]] = None
+    last_queue: Optional[Dict[str, Any]] = None
+    last_queue_token: Any = None
+    last_queue_at = 0.0
+    last_code: Optional[str] = None
+    version = 0
+    status_broadcaster.connect()
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            version, sample = status_broadcaster.wait(
+                version, EVENT_STREAM_KEEPALIVE_SECONDS
+            )
+            if sample is None:
+                yield ": keepalive\n\n"
+                continue
+
+            status = _status_payload(sample["playback"], request_key)
+            if status != last_status:
+                last_status = status
+                yield _format_sse("status", status)
+
+            if not is_admin:
+                now = time.monotonic()
+                if (
+                    sample["queue"] != last_queue_token
+                    or now - last_queue_at >= EVENT_STREAM_QUEUE_REFRESH_SECONDS
+                ):
+                    last_queue_token = sample["queue"]
+                    last_queue_at = now
+                    is_playing, remaining = _queue_playback_context()
+                    queue_payload = queue_manager.get_status(
+                        entry_id,
+                        is_playing=is_playing,
+                        active_remaining=remaining,
+                    )
+                    if queue_payload != last_queue:
+                        last_queue = queue_payload
+                        yield _format_sse("queue", queue_payload)
+
+            if is_admin and sample["stage_code"] != last_code:
+                last_code = sample["stage_code"]
+                yield _format_sse("stage_code", {"code": last_code})
+    finally:
+        status_broadcaster.disconnect()
+
+
+@app.route("/api/events")
+def api_events() -> Any:
+    """Server-Sent Events stream of status, queue and stage-code changes.
+
+    ``/api/status`` and ``/api/queue/status`` remain available for clients
+    without EventSource support.
+    """
+
+    request_key = request.args.get("key")
+    entry_id = _request_queue_id()
+    is_admin = user_registry.is_admin(request_key)
+    response = app.response_class(
+        _event_stream(request_key, entry_id, is_admin),
+        mimetype="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 @app.route("/api/volume", methods=["POST"])
@@ -2928,7 +3464,7 @@ def api_relay_snow_machine() -> Any:
     return jsonify({"status": status_text, "active": new_state, "message": message})
 
 
-@app.route("/api/dmx/templates/<video_id>", methods=["GET", "POST"])
+@app.route("/api/dmx/templates/<video_id>", methods=["GET", "POST", "PATCH"])
 def api_dmx_template(video_id: str) -> Any:
     video_entry = get_video_entry(video_id)
     if not video_entry:
@@ -2945,19 +3481,16 @@ def api_dmx_template(video_id: str) -> Any:
 
         stored_actions: List[Dict[str, Any]] = []
         stored_relay_actions: List[Dict[str, Any]] = []
+        revision = 0
         if template_path.exists():
             try:
-                with template_path.open("r", encoding="utf-8") as fh:
-                    payload = json.load(fh)
-            except (OSError, json.JSONDecodeError):
+                payload = dmx_manager.load_template_document(template_path)
+            except (OSError, ValueError):
                 LOGGER.exception("Unable to read DMX template %s", template_path)
             else:
-                raw_actions = payload.get("actions") if isinstance(payload, dict) else None
-                if isinstance(raw_actions, list):
-                    stored_actions = raw_actions
-                raw_relay = payload.get("relay_actions") if isinstance(payload, dict) else None
-                if isinstance(raw_relay, list):
-                    stored_relay_actions = raw_relay
+                stored_actions = payload["actions"]
+                stored_relay_actions = payload.get("relay_actions") or []
+                revision = payload["revision"]
 
         try:
             relative_path = template_path.relative_to(BASE_DIR)
@@ -2982,12 +3515,22 @@ def api_dmx_template(video_id: str) -> Any:
                 else None,
             },
             "template_exists": template_path.exists(),
+            "revision": revision,
             "actions": stored_actions,
             "relay_actions": stored_relay_actions,
         }
         return jsonify(response)
 
     data = request.get_json(force=True, silent=True) or {}
+    base_revision = data.get("base_revision")
+    if base_revision is not None and (
+        not isinstance(base_revision, int) or isinstance(base_revision, bool)
+    ):
+        return jsonify({"error": "base_revision must be an integer"}), 400
+
+    if request.method == "PATCH":
+        return _patch_dmx_template(template_path, data, base_revision)
+
     actions_payload = data.get("actions")
     if not isinstance(actions_payload, list):
         return jsonify({"error": "Request body must include an 'actions' list"}), 400
@@ -2999,23 +3542,75 @@ def api_dmx_template(video_id: str) -> Any:
         return jsonify({"error": "Relay actions must be provided as a list"}), 400
 
     try:
-        dmx_manager.save_template(template_path, actions=actions_payload, relay_actions=relay_payload)
+        revision = dmx_manager.save_template(
+            template_path,
+            actions=actions_payload,
+            relay_actions=relay_payload,
+            base_revision=base_revision,
+        )
+    except TemplateConflictError as exc:
+        return jsonify({"error": str(exc), "revision": exc.revision}), 409
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
     except Exception:
         LOGGER.exception("Unable to save DMX template %s", template_path)
         return jsonify({"error": "Unable to save DMX template"}), 500
 
-    return jsonify({"status": "saved"})
+    return jsonify({"status": "saved", "revision": revision})
+
+
+def _patch_dmx_template(
+    template_path: Path, data: Dict[str, Any], base_revision: Optional[int]
+) -> Any:
+    if base_revision is None:
+        return jsonify({"error": "Request body must include 'base_revision'"}), 400
+
+    operations = data.get("ops")
+    if not isinstance(operations, list):
+        return jsonify({"error": "Request body must include an 'ops' list"}), 400
+
+    relay_payload = data.get("relay_actions")
+    if relay_payload is not None and not isinstance(relay_payload, list):
+        return jsonify({"error": "Relay actions must be provided as a list"}), 400
+
+    try:
+        revision, inserted = dmx_manager.patch_template(
+            template_path,
+            base_revision=base_revision,
+            operations=operations,
+            relay_actions=relay_payload,
+        )
+    except TemplateConflictError as exc:
+        return jsonify({"error": str(exc), "revision": exc.revision}), 409
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception:
+        LOGGER.exception("Unable to update DMX template %s", template_path)
+        return jsonify({"error": "Unable to save DMX template"}), 500
 
+    return jsonify({"status": "saved", "revision": revision, "inserted": inserted})
 
-@app.route("/api/dmx/preview", methods=["POST", "DELETE"])
+
+@app.route("/api/dmx/preview", methods=["POST", "PATCH", "DELETE"])
 def api_dmx_preview() -> Any:
     if request.method == "DELETE":
         dmx_manager.stop_show()
         return jsonify({"status": "stopped"})
 
     data = request.get_json(force=True, silent=True) or {}
+    if request.method == "PATCH":
+        paused_raw = data.get("paused", False)
+        try:
+            moved = dmx_manager.seek_preview(
+                data.get("start_time", 0.0),
+                paused=paused_raw if isinstance(paused_raw, bool) else False,
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        if not moved:
+            return jsonify({"error": "No preview is loaded"}), 409
+        return jsonify({"status": "previewing"})
+
     actions_payload = data.get("actions")
     if not isinstance(actions_payload, list):
         return jsonify({"error": "Missing 'actions' list in request body"}), 400
@@ -3042,6 +3637,43 @@ def api_dmx_preview() -> Any:
     return jsonify({"status": "previewing"})
 
 
+@app.route("/api/dmx/masters", methods=["GET", "PUT"])
+def api_dmx_masters() -> Any:
+    if request.method == "GET":
+        return jsonify(dmx_manager.get_masters())
+
+    data = request.get_json(silent=True)  # type: ignore[no-untyped-call]
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    def _level(value: Any) -> float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("Master levels must be numbers between 0 and 1")
+        if not 0.0 <= float(value) <= 1.0:
+            raise ValueError("Master levels must be numbers between 0 and 1")
+        return float(value)
+
+    try:
+        fade = float(data.get("fade", 0.0) or 0.0)
+        levels: List[Tuple[Optional[str], float]] = []
+        if "grand" in data:
+            levels.append((None, _level(data["grand"])))
+        groups = data.get("groups") or {}
+        if not isinstance(groups, dict):
+            raise ValueError("'groups' must map fixture groups to levels")
+        known = dmx_manager.get_masters()["groups"]
+        for name, value in groups.items():
+            if name not in known:
+                raise ValueError(f"Unknown fixture group '{name}'")
+            levels.append((name, _level(value)))
+    except (TypeError, ValueError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    for group, level in levels:
+        dmx_manager.set_master(level, max(0.0, fade), group=group)
+    return jsonify(dmx_manager.get_masters())
+
+
 def _serve_app(port: int, *, ssl_context: Optional[Tuple[str, str]] = None) -> None:
     try:
         from werkzeug.serving import make_server
@@ -3060,9 +3692,22 @@ def _serve_app(port: int, *, ssl_context: Optional[Tuple[str, str]] = None) -> N
     server.serve_forever()
 
 
+def _warm_dmx_show_cache() -> None:
+    entries: List[Dict[str, Any]] = list(video_config["videos"])
+    entries.append({"id": "default_loop", "dmx_template": str(DEFAULT_LOOP_TEMPLATE_PATH)})
+    try:
+        dmx_manager.warm_show_cache(entries)
+    except Exception:
+        LOGGER.exception("Unable to precompile DMX templates")
+
+
 def main() -> None:
     ensure_display_powered_on()
 
+    # Compile every configured DMX template up front so the first cue of a
+    # song is not delayed by JSON parsing and loop expansion.
+    threading.Thread(target=_warm_dmx_show_cache, daemon=True).start()
+
     default_loop_started = False
 
     try:
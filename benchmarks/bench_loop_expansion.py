@@ -0,0 +1,86 @@
+"""Time template loop compilation on the shipped templates.
+
+Run from the repository root::
+
+    python benchmarks/bench_loop_expansion.py [--repeat N] [--instances N]
+
+Besides every template in ``dmx_templates`` a synthetic show is compiled in
+which many looping instances share the same channels, the case where the
+conflict search used to grow quadratically.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import dmx  # noqa: E402
+
+
+class _NullOutput:
+    channel_count = dmx.DEFAULT_CHANNELS
+
+
+def _synthetic_actions(instances: int) -> List[Dict[str, Any]]:
+    actions: List[Dict[str, Any]] = []
+    for instance in range(instances):
+        start = instance * 2.0
+        for step in range(4):
+            entry: Dict[str, Any] = {
+                "time": dmx.DMXShowManager.format_timecode(start + step * 0.25),
+                "channel": 1 + (instance + step) % 8,
+                "value": (instance * 31 + step * 64) % 256,
+                "fade": 0.2,
+                "templateInstanceId": f"loop-{instance}",
+            }
+            if step == 0:
+                entry["templateLoop"] = {
+                    "enabled": True,
+                    "count": 50,
+                    "mode": "pingpong" if instance % 2 else "forward",
+                    "duration": 1.0,
+                    "channels": list(range(1, 9)),
+                }
+            actions.append(entry)
+    return actions
+
+
+def _time(manager: dmx.DMXShowManager, actions: List[Dict[str, Any]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        manager._compile_loops(actions)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--instances", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = dmx.DMXShowManager(Path(directory), _NullOutput())  # type: ignore[arg-type]
+        cases: Dict[str, List[Dict[str, Any]]] = {}
+        for path in sorted((ROOT / "dmx_templates").glob("*.json")):
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            cases[path.name] = payload.get("actions", [])
+        cases[f"synthetic ({args.instances} loops)"] = _synthetic_actions(args.instances)
+
+        print(f"{'template':<32} {'actions':>8} {'best ms':>10}")
+        for name, actions in cases.items():
+            elapsed = _time(manager, actions, max(1, args.repeat))
+            print(f"{name:<32} {len(actions):>8} {elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
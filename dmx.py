@@ -11,18 +11,42 @@ Raspberry Pi when OLA is installed.
 from __future__ import annotations
 
 import array
+import ast
 import atexit
+import bisect
+import collections
+import functools
+import hashlib
+import http.client
+import heapq
+import itertools
 import json
 import logging
 import math
+import mmap
 import os
+import socket
 import threading
 import time
-import urllib.error
-import urllib.request
-from dataclasses import dataclass
+import urllib.parse
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 LOGGER = logging.getLogger("kpop_stage.dmx")
 
@@ -38,11 +62,39 @@ except ImportError:  # pragma: no-cover - optional dependency
 
 
 DEFAULT_CHANNELS = 512
-DMX_FPS = 30.0
+# DMX512 needs ~22.7 ms for a full 512-slot frame, which caps refresh at ~44 Hz.
+DMX_MAX_FPS = 44.0
 DMX_BREAK_DURATION = float(os.environ.get("DMX_BREAK_DURATION", "0.00012"))
 DMX_MARK_AFTER_BREAK = float(os.environ.get("DMX_MARK_AFTER_BREAK", "0.000012"))
+ARTNET_PORT = 6454
+SACN_PORT = 5568
+SACN_DEFAULT_PRIORITY = 100
+# Universes that have not changed are re-sent at this interval on outputs that
+# hold the last frame themselves (OLA, Art-Net, sACN).
+DMX_KEEPALIVE_INTERVAL = 1.0
 DEFAULT_STARTUP_LEVELS = ""
 DEFAULT_SMOKE_CHANNEL = 128
+# Mixer layers of a DMXOutput, from lowest to highest priority.  Every writer
+# owns one layer and the layers are merged once per frame: channels with the
+# LTP rule take the value of the highest layer holding them, channels with
+# the HTP rule the highest value among those layers.  The master layer
+# overrides both so a fade to black always wins.
+MIXER_SHOW = "show"
+MIXER_PREVIEW = "preview"
+MIXER_MANUAL = "manual"
+MIXER_SMOKE = "smoke"
+MIXER_MASTER = "master"
+MIXER_LAYERS = (MIXER_SHOW, MIXER_PREVIEW, MIXER_MANUAL, MIXER_SMOKE, MIXER_MASTER)
+MIXER_OVERRIDE_LAYERS = frozenset({MIXER_MASTER})
+MERGE_LTP = "ltp"
+MERGE_HTP = "htp"
+# Resolution of the grand master and group submasters (steps from 0 to 1).
+MASTER_STEPS = 1024
+# Fades follow a named curve sampled into a table of this many intervals.
+FADE_CURVE_LINEAR = "linear"
+FADE_CURVE_STEPS = 256
+# Brightness ratio spanned by the "log" dimmer curve.
+FADE_LOG_RANGE = 100.0
 
 
 def _parse_env_float(name: str, default: float, *, minimum: float = 0.0) -> float:
@@ -59,12 +111,47 @@ def _parse_env_float(name: str, default: float, *, minimum: float = 0.0) -> floa
     return max(minimum, value)
 
 
+DMX_FPS = min(DMX_MAX_FPS, _parse_env_float("DMX_FPS", 30.0, minimum=1.0))
+
+# Endless loops play forever, but are cut to this length when they have to be
+# expanded into plain actions (builder previews and the template API).
 TEMPLATE_LOOP_INFINITE_DURATION_SECONDS = _parse_env_float(
     "DMX_TEMPLATE_LOOP_INFINITE_DURATION",
     600.0,
     minimum=0.0,
 )
 TEMPLATE_LOOP_MAX_ITERATIONS = 9999
+# Reported playback positions further than this from the show clock are
+# treated as a seek or a late start and adopted at once; smaller errors are
+# slewed out by SHOW_CLOCK_GAIN per update so cue timing does not jitter.
+SHOW_CLOCK_SNAP_SECONDS = 0.15
+SHOW_CLOCK_GAIN = 0.1
+# Relay boards are small HTTP servers; requests to different boards are sent
+# in parallel by this many workers.
+RELAY_DISPATCH_WORKERS = 4
+RELAY_REQUEST_TIMEOUT = 3.0
+# Relay cues are sent early by the smoothed round-trip time of their board.
+# The estimate follows RFC 6298 (gains for the mean and for its deviation,
+# reported as jitter) and the lead is capped so a burst of slow answers cannot
+# pull cues far ahead of the music.
+RELAY_LATENCY_GAIN = 0.125
+RELAY_JITTER_GAIN = 0.25
+RELAY_MAX_LEAD_SECONDS = 0.5
+# A relay host is treated as offline after this many failed requests in a
+# row.  Its requests then fail at once, and a background probe checks every
+# RELAY_PROBE_INTERVAL seconds whether the board accepts connections again.
+RELAY_BREAKER_THRESHOLD = 3
+RELAY_PROBE_INTERVAL = 5.0
+RELAY_PROBE_TIMEOUT = 1.0
+# Upper bound on how long a show runner sleeps before re-reading its clock.
+SHOW_CLOCK_POLL_INTERVAL = 0.05
+# Number of actions between the state keyframes a ShowIndex keeps for seeking.
+SHOW_KEYFRAME_INTERVAL = 256
+TEMPLATE_JOURNAL_SUFFIX = ".journal"
+# Journalled template edits are folded back into the template file once edits
+# pause for this long, or straight away when the journal reaches the cap.
+TEMPLATE_COMPACT_DELAY = _parse_env_float("DMX_TEMPLATE_COMPACT_DELAY", 5.0)
+TEMPLATE_JOURNAL_MAX_ENTRIES = 200
 
 def _clamp(value: int, low: int, high: int) -> int:
     return max(low, min(high, value))
@@ -158,8 +245,16 @@ def _resolve_serial_port() -> Optional[str]:
     return resolved_port
 
 
-def _parse_startup_levels(raw: str) -> List[tuple[int, int]]:
-    """Parse DMX_STARTUP_LEVELS assignments into channel/value tuples."""
+def _parse_startup_levels(
+    raw: str,
+    channel_count: int = DEFAULT_CHANNELS,
+    patch: Optional["ChannelPatch"] = None,
+) -> List[tuple[int, int]]:
+    """Parse DMX_STARTUP_LEVELS assignments into channel/value tuples.
+
+    Channels are checked against ``channel_count``; with a ``patch`` they may
+    also be written as ``universe:slot`` (e.g. ``1:5=200``).
+    """
 
     assignments: List[tuple[int, int]] = []
     for entry in raw.split(","):
@@ -178,8 +273,11 @@ def _parse_startup_levels(raw: str) -> List[tuple[int, int]]:
             continue
 
         try:
-            channel = int(channel_text.strip())
             value = int(value_text.strip())
+            if patch is not None and ":" in channel_text:
+                channel = patch.resolve(channel_text.strip())
+            else:
+                channel = int(channel_text.strip())
         except ValueError:
             LOGGER.warning(
                 "Invalid DMX_STARTUP_LEVELS assignment '%s'. Channels and values must be integers.",
@@ -187,11 +285,11 @@ def _parse_startup_levels(raw: str) -> List[tuple[int, int]]:
             )
             continue
 
-        if channel < 1 or channel > DEFAULT_CHANNELS:
+        if channel < 1 or channel > channel_count:
             LOGGER.warning(
                 "Ignoring DMX_STARTUP_LEVELS assignment '%s'. Channel must be between 1 and %s.",
                 token,
-                DEFAULT_CHANNELS,
+                channel_count,
             )
             continue
 
@@ -200,6 +298,25 @@ def _parse_startup_levels(raw: str) -> List[tuple[int, int]]:
     return assignments
 
 
+def _parse_channel_list(raw: str) -> List[int]:
+    """Parse channel lists such as ``"1-12,40"`` (DMX_HTP_CHANNELS)."""
+
+    channels: List[int] = []
+    for entry in raw.split(","):
+        token = entry.strip()
+        if not token:
+            continue
+        first, _, last = token.partition("-")
+        try:
+            start = int(first.strip())
+            end = int(last.strip()) if last else start
+        except ValueError:
+            LOGGER.warning("Ignoring invalid DMX channel range '%s'", token)
+            continue
+        channels.extend(range(max(1, start), end + 1))
+    return channels
+
+
 def _apply_startup_levels(output: "DMXOutput", config: str) -> None:
     """Apply startup channel levels defined via DMX_STARTUP_LEVELS."""
 
@@ -211,7 +328,11 @@ def _apply_startup_levels(output: "DMXOutput", config: str) -> None:
         LOGGER.info("Skipping DMX startup levels (DMX_STARTUP_LEVELS=%s)", config)
         return
 
-    assignments = _parse_startup_levels(normalized)
+    assignments = _parse_startup_levels(
+        normalized,
+        getattr(output, "channel_count", DEFAULT_CHANNELS),
+        getattr(output, "patch", None),
+    )
     if not assignments:
         LOGGER.warning(
             "DMX_STARTUP_LEVELS did not contain any valid channel assignments: %s",
@@ -264,15 +385,248 @@ def parse_timecode(value: str) -> float:
         raise ValueError(f"Unable to parse timecode '{value}': {exc}") from exc
 
 
+class ChannelPatch:
+    """Routes logical DMX channels onto one or more physical universes.
+
+    Logical channels are numbered from 1 across all configured universes in
+    order, so with universes ``[0, 1]`` channel 513 is universe 1, slot 1.
+    ``routes`` moves individual logical channels elsewhere; the slot they
+    would otherwise occupy stays dark unless another channel is routed to
+    it.  Templates may also address a physical slot as ``"universe:slot"``.
+    """
+
+    def __init__(
+        self,
+        universes: Sequence[int],
+        routes: Optional[Dict[int, Tuple[int, int]]] = None,
+        *,
+        slots: int = DEFAULT_CHANNELS,
+    ) -> None:
+        if not universes:
+            raise ValueError("At least one DMX universe is required")
+        if len(set(universes)) != len(universes):
+            raise ValueError("DMX universes must be unique")
+        self.universes = [int(universe) for universe in universes]
+        self.slots = _clamp(int(slots), 1, DEFAULT_CHANNELS)
+        self.channel_count = self.slots * len(self.universes)
+        self._universe_index = {
+            universe: index for index, universe in enumerate(self.universes)
+        }
+        self.routes: Dict[int, Tuple[int, int]] = {}
+        # Logical index -> universe index whose payload it feeds.
+        self.universe_of = [idx // self.slots for idx in range(self.channel_count)]
+        self._cleared: List[List[int]] = [[] for _ in self.universes]
+        self._incoming: List[List[Tuple[int, int]]] = [[] for _ in self.universes]
+        self._physical: Dict[Tuple[int, int], int] = {}
+        for channel, (universe, slot) in sorted((routes or {}).items()):
+            self._add_route(channel, universe, slot)
+
+    def _add_route(self, channel: int, universe: int, slot: int) -> None:
+        idx = channel - 1
+        if idx < 0 or idx >= self.channel_count:
+            raise ValueError(f"Patched channel {channel} is outside the logical range")
+        target = self._universe_index.get(universe)
+        if target is None:
+            raise ValueError(f"Universe {universe} is not configured for DMX output")
+        if slot < 1 or slot > self.slots:
+            raise ValueError(f"Universe slot must be between 1 and {self.slots}")
+        self.routes[channel] = (universe, slot)
+        self.universe_of[idx] = target
+        self._cleared[idx // self.slots].append(idx % self.slots)
+        self._incoming[target].append((slot - 1, idx))
+        self._physical[(target, slot - 1)] = idx
+
+    @classmethod
+    def from_config(
+        cls,
+        universes: Sequence[int],
+        config: Optional[Dict[str, Any]] = None,
+    ) -> "ChannelPatch":
+        """Build a patch from a ``dmx_patch.json`` style mapping.
+
+        ``config["universes"]`` overrides ``universes`` and ``config["patch"]``
+        lists fixtures as ``{"channel": 600, "universe": 1, "address": 1,
+        "count": 16}``, routing ``count`` logical channels starting at
+        ``channel`` to consecutive slots starting at ``address``.
+        """
+
+        config = config or {}
+        configured = config.get("universes")
+        if isinstance(configured, list) and configured:
+            universes = [int(universe) for universe in configured]
+        routes: Dict[int, Tuple[int, int]] = {}
+        entries = config.get("patch") or []
+        if not isinstance(entries, list):
+            raise ValueError("DMX patch must be a list of fixtures")
+        for entry in entries:
+            if not isinstance(entry, dict):
+                raise ValueError("DMX patch entries must be objects")
+            channel = int(entry["channel"])
+            universe = int(entry["universe"])
+            address = int(entry.get("address", 1))
+            count = max(1, int(entry.get("count", 1)))
+            for offset in range(count):
+                routes[channel + offset] = (universe, address + offset)
+        return cls(universes, routes)
+
+    def resolve(self, address: Union[int, str]) -> int:
+        """Return the logical channel for ``address``.
+
+        ``address`` is either a logical channel number or ``"universe:slot"``.
+        """
+
+        if isinstance(address, str) and ":" in address:
+            universe_raw, _, slot_raw = address.partition(":")
+            try:
+                universe = int(universe_raw.strip())
+                slot = int(slot_raw.strip())
+            except ValueError as exc:
+                raise ValueError(f"Invalid DMX address '{address}'") from exc
+            target = self._universe_index.get(universe)
+            if target is None:
+                raise ValueError(f"Universe {universe} is not configured for DMX output")
+            if slot < 1 or slot > self.slots:
+                raise ValueError(f"Universe slot must be between 1 and {self.slots}")
+            idx = self._physical.get((target, slot - 1))
+            if idx is None:
+                idx = target * self.slots + slot - 1
+                if (idx + 1) in self.routes:
+                    raise ValueError(f"DMX address '{address}' is not patched")
+            return idx + 1
+        channel = int(address)
+        if channel < 1 or channel > self.channel_count:
+            raise ValueError(f"DMX channel must be between 1 and {self.channel_count}")
+        return channel
+
+    def render(self, levels: Sequence[int], index: int) -> bytearray:
+        """Build the payload for the universe at ``index`` from logical levels."""
+
+        start = index * self.slots
+        payload = bytearray(levels[start : start + self.slots])
+        for slot in self._cleared[index]:
+            payload[slot] = 0
+        for slot, idx in self._incoming[index]:
+            payload[slot] = levels[idx]
+        return payload
+
+
+def load_channel_patch(
+    universes: Sequence[int], path: Optional[Path] = None
+) -> ChannelPatch:
+    """Load the channel patch from ``path`` if it exists."""
+
+    if path is None or not path.exists():
+        return ChannelPatch(universes)
+    with path.open("r", encoding="utf-8") as fh:
+        config = json.load(fh)
+    if not isinstance(config, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    return ChannelPatch.from_config(universes, config)
+
+
+def _parse_universes(raw: str) -> List[int]:
+    universes: List[int] = []
+    for token in raw.replace(";", ",").split(","):
+        token = token.strip()
+        if not token:
+            continue
+        try:
+            universe = int(token)
+        except ValueError:
+            LOGGER.warning("Ignoring invalid DMX_UNIVERSES entry '%s'", token)
+            continue
+        if universe not in universes:
+            universes.append(universe)
+    return universes
+
+
+class FadeCurve:
+    """A fade shape sampled into lookup tables once, when the module loads.
+
+    ``shape`` maps fade progress (0..1) to eased progress.  Curves that should
+    look the same in both directions, like the log dimmer, pass a separate
+    ``falling`` shape for fades towards a lower level.  :meth:`level` only
+    reads the tables, so the sender loop and the timeline baker can evaluate
+    it every frame.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        shape: Callable[[float], float],
+        falling: Optional[Callable[[float], float]] = None,
+    ) -> None:
+        self.name = name
+        self.linear = name == FADE_CURVE_LINEAR
+        self.rising = self._sample(shape)
+        self.falling = self.rising if falling is None else self._sample(falling)
+
+    @staticmethod
+    def _sample(shape: Callable[[float], float]) -> Tuple[float, ...]:
+        table = [shape(step / FADE_CURVE_STEPS) for step in range(FADE_CURVE_STEPS + 1)]
+        table[0], table[-1] = 0.0, 1.0
+        return tuple(table)
+
+    def level(self, start_value: int, target: int, ratio: float) -> int:
+        """Level ``ratio`` of the way through a fade from ``start_value``."""
+
+        if ratio >= 1.0:
+            return target
+        if ratio <= 0.0:
+            return start_value
+        if not self.linear:
+            table = self.rising if target >= start_value else self.falling
+            position = ratio * FADE_CURVE_STEPS
+            step = int(position)
+            low = table[step]
+            ratio = low + (table[step + 1] - low) * (position - step)
+        return round(start_value + (target - start_value) * ratio)
+
+
+def _log_dimmer(ratio: float) -> float:
+    # Even steps in perceived brightness: the level grows exponentially.
+    return (FADE_LOG_RANGE**ratio - 1.0) / (FADE_LOG_RANGE - 1.0)
+
+
+FADE_CURVES: Dict[str, FadeCurve] = {
+    curve.name: curve
+    for curve in (
+        FadeCurve(FADE_CURVE_LINEAR, lambda ratio: ratio),
+        FadeCurve("ease-in", lambda ratio: ratio * ratio),
+        FadeCurve("ease-out", lambda ratio: 1.0 - (1.0 - ratio) ** 2),
+        FadeCurve(
+            "ease-in-out",
+            lambda ratio: 2 * ratio * ratio if ratio < 0.5 else 1.0 - 2 * (1.0 - ratio) ** 2,
+        ),
+        FadeCurve("s-curve", lambda ratio: ratio * ratio * (3.0 - 2.0 * ratio)),
+        FadeCurve("log", _log_dimmer, lambda ratio: 1.0 - _log_dimmer(1.0 - ratio)),
+    )
+}
+
+
+def get_fade_curve(name: Optional[str]) -> FadeCurve:
+    """Return the curve called ``name`` (linear when empty)."""
+
+    key = (name or FADE_CURVE_LINEAR).strip().lower()
+    try:
+        return FADE_CURVES[key]
+    except KeyError:
+        options = ", ".join(FADE_CURVES)
+        raise ValueError(f"Unknown fade curve {name!r}; expected one of {options}") from None
+
+
 @dataclass
 class DMXAction:
     time_seconds: float
     channel: int
     value: int
     fade: float
+    curve: str = FADE_CURVE_LINEAR
 
     @classmethod
-    def from_dict(cls, data: Dict[str, object]) -> "DMXAction":
+    def from_dict(
+        cls, data: Dict[str, object], *, patch: Optional[ChannelPatch] = None
+    ) -> "DMXAction":
         if "time" not in data:
             raise ValueError("Action is missing required 'time' field")
         if "channel" not in data:
@@ -281,18 +635,29 @@ class DMXAction:
             raise ValueError("Action is missing required 'value' field")
 
         time_seconds = parse_timecode(str(data["time"]))
-        channel = int(data["channel"])
+        raw_channel = data["channel"]
+        if patch is not None:
+            address = raw_channel if isinstance(raw_channel, str) else int(raw_channel)  # type: ignore[arg-type]
+            channel = patch.resolve(address)
+        else:
+            if isinstance(raw_channel, str) and ":" in raw_channel:
+                raise ValueError("Universe-qualified DMX addresses need a channel patch")
+            channel = int(raw_channel)  # type: ignore[arg-type]
         value = int(data["value"])
         fade = float(data.get("fade", 0.0))
+        curve = get_fade_curve(str(data.get("curve") or "")).name
 
-        if channel < 1 or channel > DEFAULT_CHANNELS:
-            raise ValueError("DMX channel must be between 1 and 512")
+        max_channel = patch.channel_count if patch is not None else DEFAULT_CHANNELS
+        if channel < 1 or channel > max_channel:
+            raise ValueError(f"DMX channel must be between 1 and {max_channel}")
         if value < 0 or value > 255:
             raise ValueError("DMX value must be between 0 and 255")
         if fade < 0:
             raise ValueError("Fade duration must be zero or positive")
 
-        return cls(time_seconds=time_seconds, channel=channel, value=value, fade=fade)
+        return cls(
+            time_seconds=time_seconds, channel=channel, value=value, fade=fade, curve=curve
+        )
 
 
 @dataclass
@@ -379,7 +744,7 @@ def _normalize_template_loop_settings(raw: object) -> Optional[TemplateLoopSetti
                 channel_value = int(entry)
             except (TypeError, ValueError):
                 continue
-            if 1 <= channel_value <= DEFAULT_CHANNELS:
+            if channel_value >= 1:
                 channels.append(channel_value)
     unique_channels = sorted({value for value in channels})
 
@@ -406,407 +771,2822 @@ def _serialize_template_loop_settings(loop: TemplateLoopSettings) -> Dict[str, o
     return payload
 
 
-class DMXOutput:
-    """Continuously pushes the latest DMX universe state to the hardware."""
+_NPY_MAGIC = b"\x93NUMPY"
+TIMELINE_SUFFIX = ".timeline.npy"
 
-    def __init__(self, universe: int = 0, channel_count: int = DEFAULT_CHANNELS) -> None:
-        self.universe = universe
-        self.channel_count = channel_count
-        self._levels = [0] * self.channel_count
-        self._lock = threading.Lock()
-        self._dirty = False
-        self._stop_event = threading.Event()
-        self._transition_lock = threading.Lock()
-        self._channel_transitions: Dict[int, threading.Event] = {}
-        self._sender, self._sender_cleanup = self._build_sender(universe)
-        self._thread = threading.Thread(target=self._run_sender, daemon=True)
-        self._thread.start()
-        atexit.register(self.shutdown)
 
-    def _build_sender(
-        self, universe: int
-    ) -> tuple[Callable[[bytearray], None], Optional[Callable[[], None]]]:
-        serial_port = _resolve_serial_port()
-        if serial_port:
-            try:
-                sender = self._build_serial_sender(serial_port)
-            except Exception:  # pragma: no cover - depends on hardware
-                LOGGER.exception(
-                    "Unable to initialise DMX serial port %s. Falling back to OLA/dry-run output.",
-                    serial_port,
-                )
-            else:
-                if sender:
-                    return sender
+class FrameTimeline:
+    """A show pre-rendered into one DMX frame per ``1 / fps`` seconds.
 
-        if ClientWrapper is None:
-            LOGGER.warning(
-                "python-ola not available. DMX output will run in dry-run mode. "
-                "Install the python-ola bindings (e.g. 'sudo apt install ola-python' "
-                "or 'pip install python-ola') alongside the OLA daemon to control "
-                "real fixtures."
-            )
+    Frames are stored as a ``frames x channels`` uint8 matrix using the
+    ``.npy`` layout so the file can be inspected with numpy, but reading it
+    only needs the standard library: the file is memory-mapped and a frame is
+    a slice of the mapping.
+    """
 
-            def log_sender(data: bytearray) -> None:
-                LOGGER.debug("DMX dry-run universe %s: %s", universe, list(data[:16]))
+    def __init__(
+        self,
+        data: Any,
+        *,
+        frame_count: int,
+        channel_count: int,
+        fps: float,
+        offset: int = 0,
+        path: Optional[Path] = None,
+    ) -> None:
+        self._data = data
+        self._offset = offset
+        self.frame_count = frame_count
+        self.channel_count = channel_count
+        self.fps = fps
+        self.path = path
 
-            return log_sender, None
+    @property
+    def duration(self) -> float:
+        return max(0, self.frame_count - 1) / self.fps
 
-        thread_local = threading.local()
+    def row(self, index: int) -> bytes:
+        index = max(0, min(self.frame_count - 1, index))
+        start = self._offset + index * self.channel_count
+        return bytes(self._data[start : start + self.channel_count])
 
-        def _get_thread_resources() -> tuple[Any, Any, threading.Lock]:
-            resources = getattr(thread_local, "resources", None)
-            if resources is None:
-                wrapper = ClientWrapper()
-                client = wrapper.Client()
-                lock = threading.Lock()
-                resources = (wrapper, client, lock)
-                thread_local.resources = resources
-            return cast(tuple[Any, Any, threading.Lock], resources)
+    def row_at(self, seconds: float) -> bytes:
+        return self.row(int(max(0.0, seconds) * self.fps))
 
-        def send(data: bytearray) -> None:
-            wrapper, client, lock = _get_thread_resources()
-            done = threading.Event()
+    def close(self) -> None:
+        close = getattr(self._data, "close", None)
+        if close:
+            try:
+                close()
+            except Exception:  # pragma: no cover - defensive
+                LOGGER.debug("Error while closing DMX timeline", exc_info=True)
+
+
+def bake_frame_timeline(
+    actions: Iterable[DMXAction],
+    baseline: Iterable[int],
+    *,
+    fps: float = DMX_FPS,
+) -> FrameTimeline:
+    """Render actions into a dense frame timeline with fades baked in.
+
+    The rendering follows the live output semantics: every action replaces
+    any fade that is still running on its channel, and a fade starts from the
+    level the channel has at the moment the action fires and follows the
+    action's curve.
+    """
+
+    levels = [_clamp(int(value), 0, 255) for value in baseline]
+    channel_count = len(levels)
+    ordered = sorted(actions, key=lambda action: action.time_seconds)
+    end_time = 0.0
+    for action in ordered:
+        end_time = max(end_time, action.time_seconds + max(0.0, action.fade))
+    frame_count = int(math.ceil(end_time * fps)) + 1
+
+    frames = bytearray(frame_count * channel_count)
+    fades: Dict[int, Tuple[float, float, int, int, FadeCurve]] = {}
+    epsilon = 1e-6
+    cursor = 0
+
+    for frame in range(frame_count):
+        now = frame / fps
+        while cursor < len(ordered) and ordered[cursor].time_seconds <= now + epsilon:
+            action = ordered[cursor]
+            cursor += 1
+            idx = action.channel - 1
+            if idx < 0 or idx >= channel_count:
+                continue
+            value = _clamp(action.value, 0, 255)
+            running = fades.pop(idx, None)
+            if running is not None:
+                # Start from where the replaced fade is at the action's own
+                # timestamp rather than at the previous frame.
+                start_time, duration, start_value, target, curve = running
+                ratio = (action.time_seconds - start_time) / duration
+                levels[idx] = curve.level(start_value, target, ratio)
+            if action.fade <= 0:
+                levels[idx] = value
+            else:
+                fades[idx] = (
+                    action.time_seconds,
+                    action.fade,
+                    levels[idx],
+                    value,
+                    get_fade_curve(action.curve),
+                )
 
-            def _callback(status: bool) -> None:  # pragma: no cover - depends on hardware
-                if not status:
-                    LOGGER.error("Failed to send DMX frame via OLA")
-                done.set()
-                wrapper.Stop()
+        finished: List[int] = []
+        for idx, (start_time, duration, start_value, target, curve) in fades.items():
+            ratio = (now - start_time) / duration
+            if ratio >= 1.0:
+                finished.append(idx)
+            levels[idx] = curve.level(start_value, target, ratio)
+        for idx in finished:
+            fades.pop(idx, None)
 
-            with lock:
-                # python-ola expects an ``array('B')`` or similar object that
-                # provides a ``tobytes`` method.  ``bytearray`` does not, so we
-                # wrap the data to match the library expectations before
-                # sending.
-                payload = array.array("B", data)
-                client.SendDmx(universe, payload, _callback)
-                wrapper.Run()  # Blocks until wrapper.Stop() called in callback
-            if not done.wait(timeout=1.0):
-                LOGGER.warning("Timed out waiting for DMX send confirmation")
-
-        return send, None
+        offset = frame * channel_count
+        frames[offset : offset + channel_count] = bytes(levels)
 
-    def _build_serial_sender(
-        self, port: str
-    ) -> Optional[tuple[Callable[[bytearray], None], Optional[Callable[[], None]]]]:
-        if serial is None:
-            LOGGER.error(
-                "DMX_SERIAL_PORT is set to %s but pyserial is not installed. "
-                "Install pyserial to enable direct USB DMX output.",
-                port,
-            )
-            return None
+    return FrameTimeline(
+        frames, frame_count=frame_count, channel_count=channel_count, fps=fps
+    )
 
-        serial_config: Dict[str, Any] = {
-            "port": port,
-            "baudrate": 250000,
-            "bytesize": serial.EIGHTBITS,
-            "parity": serial.PARITY_NONE,
-            "stopbits": serial.STOPBITS_TWO,
-            "timeout": 1,
-            "write_timeout": 1,
-        }
 
-        try:
-            # Attempt to open the serial port once during initialisation so we
-            # can gracefully fall back to a dry-run sender when the hardware is
-            # not available (e.g. on development machines).
-            test_serial = serial.Serial(**serial_config)
-        except Exception as exc:  # pragma: no cover - depends on hardware
-            LOGGER.error(
-                "Unable to open DMX serial port %s (%s). "
-                "Falling back to OLA/dry-run output. Clear DMX_SERIAL_PORT to use "
-                "OLA exclusively or verify the adapter path before restarting.",
-                port,
-                exc,
-            )
-            return None
-        else:  # pragma: no cover - depends on hardware
-            try:
-                test_serial.close()
-            except Exception:
-                LOGGER.debug(
-                    "Error while closing test connection to DMX serial port %s",
-                    port,
-                    exc_info=True,
-                )
-        LOGGER.info("Using DMX serial port %s for DMX output", port)
+def write_frame_timeline(timeline: FrameTimeline, path: Path) -> None:
+    """Persist a timeline as a ``.npy`` uint8 matrix."""
 
-        thread_local = threading.local()
-        lock = threading.Lock()
+    header = (
+        "{'descr': '|u1', 'fortran_order': False, "
+        f"'shape': ({timeline.frame_count}, {timeline.channel_count}), }}"
+    )
+    # The .npy v1.0 preamble is 10 bytes; pad the header so the data starts
+    # on a 64-byte boundary as the format requires.
+    padding = -(10 + len(header) + 1) % 64
+    header_bytes = (header + " " * padding + "\n").encode("latin1")
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as fh:
+        fh.write(_NPY_MAGIC + bytes([1, 0]))
+        fh.write(len(header_bytes).to_bytes(2, "little"))
+        fh.write(header_bytes)
+        for index in range(timeline.frame_count):
+            fh.write(timeline.row(index))
+    tmp_path.replace(path)
+
+
+def open_frame_timeline(path: Path, *, fps: float = DMX_FPS) -> FrameTimeline:
+    """Memory-map a timeline written by :func:`write_frame_timeline`."""
+
+    with path.open("rb") as fh:
+        preamble = fh.read(10)
+        if len(preamble) != 10 or not preamble.startswith(_NPY_MAGIC):
+            raise ValueError(f"{path} is not a .npy file")
+        if preamble[6] != 1:
+            raise ValueError(f"Unsupported .npy version in {path}")
+        header_length = int.from_bytes(preamble[8:10], "little")
+        header = ast.literal_eval(fh.read(header_length).decode("latin1"))
+        if not isinstance(header, dict) or header.get("descr") != "|u1":
+            raise ValueError(f"{path} does not contain uint8 DMX frames")
+        shape = header.get("shape")
+        if (
+            header.get("fortran_order")
+            or not isinstance(shape, tuple)
+            or len(shape) != 2
+        ):
+            raise ValueError(f"{path} does not contain a 2D frame matrix")
+        frame_count, channel_count = int(shape[0]), int(shape[1])
+        offset = 10 + header_length
+        mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapping) < offset + frame_count * channel_count:
+        mapping.close()
+        raise ValueError(f"{path} is truncated")
+    return FrameTimeline(
+        mapping,
+        frame_count=frame_count,
+        channel_count=channel_count,
+        fps=fps,
+        offset=offset,
+        path=path,
+    )
 
-        def _get_serial() -> Any:
-            ser = getattr(thread_local, "serial", None)
-            if ser is None or not getattr(ser, "is_open", False):
-                try:
-                    ser = serial.Serial(**serial_config)
-                except Exception:  # pragma: no cover - depends on hardware
-                    LOGGER.exception("Unable to open DMX serial port %s", port)
-                    raise
-                thread_local.serial = ser
-            return ser
 
-        def _close_serial() -> None:
-            ser = getattr(thread_local, "serial", None)
-            if ser is not None:
-                try:
-                    ser.close()
-                except Exception:  # pragma: no cover - depends on hardware
-                    LOGGER.exception("Error while closing DMX serial port %s", port)
-                finally:
-                    thread_local.serial = None
+@dataclass
+class LoopSegment:
+    """The repeats of a looped template instance, generated on demand.
+
+    Iteration 0 is the instance as written in the template; the segment
+    yields iterations 1 and up, each ``period`` seconds after the previous
+    one, with pingpong loops mirroring every odd iteration.  Repeats stop at
+    ``cutoff`` (the next action outside the instance on one of the loop's
+    channels) and after ``iterations`` repeats, or never when ``iterations``
+    is ``None``.
+    """
+
+    base_start: float
+    period: float
+    offsets: List[Tuple[float, DMXAction]]
+    reverse_offsets: Optional[List[Tuple[float, DMXAction]]] = None
+    iterations: Optional[int] = None
+    cutoff: Optional[float] = None
+    # Repeats rendered by materialize() when the loop never ends.
+    fallback_iterations: int = 1
+
+    @property
+    def end_time(self) -> Optional[float]:
+        ends: List[float] = []
+        if self.iterations is not None:
+            ends.append(self.base_start + self.period * (self.iterations + 1))
+        if self.cutoff is not None:
+            ends.append(self.cutoff)
+        return min(ends) if ends else None
+
+    def iter_actions(self, since: float = 0.0) -> Iterator[DMXAction]:
+        """Yield the repeats starting at or after ``since`` in time order."""
 
-        def send(data: bytearray) -> None:
-            try:
-                ser = _get_serial()
-            except Exception:
+        epsilon = 1e-6
+        iteration = 1
+        if since > self.base_start:
+            # Start one iteration early: mirrored offsets can reach into the
+            # next iteration's first instant.
+            iteration = max(1, int((since - self.base_start) // self.period))
+        while self.iterations is None or iteration <= self.iterations:
+            iteration_start = self.base_start + self.period * iteration
+            if self.cutoff is not None and iteration_start >= self.cutoff - epsilon:
                 return
+            offsets = self.offsets
+            if self.reverse_offsets is not None and iteration % 2 == 1:
+                offsets = self.reverse_offsets
+            for offset, base_action in offsets:
+                new_time = iteration_start + offset
+                if self.cutoff is not None and new_time >= self.cutoff - epsilon:
+                    return
+                if new_time < since:
+                    continue
+                yield DMXAction(
+                    time_seconds=new_time,
+                    channel=base_action.channel,
+                    value=base_action.value,
+                    fade=base_action.fade,
+                    curve=base_action.curve,
+                )
+            iteration += 1
 
-            frame = bytes([0]) + bytes(data[: self.channel_count])
-            with lock:
-                try:
-                    ser.break_condition = True
-                    time.sleep(DMX_BREAK_DURATION)
-                    ser.break_condition = False
-                    time.sleep(DMX_MARK_AFTER_BREAK)
-                    ser.write(frame)
-                    ser.flush()
-                except Exception:  # pragma: no cover - depends on hardware
-                    LOGGER.exception("Error while sending DMX data over %s", port)
-                    _close_serial()
+    def materialize(self) -> List[DMXAction]:
+        bounded = self
+        if self.iterations is None:
+            bounded = replace(self, iterations=self.fallback_iterations)
+        return list(bounded.iter_actions())
 
-        return send, _close_serial
 
-    def _run_sender(self) -> None:
-        cached_levels = bytearray(self._levels)
-        while not self._stop_event.is_set():
-            with self._lock:
-                if self._dirty:
-                    cached_levels = bytearray(self._levels)
-                    self._dirty = False
-            try:
-                self._sender(bytearray(cached_levels))
-            except Exception:  # pragma: no cover - defensive logging
-                LOGGER.exception("Error while sending DMX data")
-            self._stop_event.wait(1.0 / DMX_FPS)
+class ShowProgram:
+    """Show actions with template loops kept as :class:`LoopSegment` objects.
 
-    def _cancel_channel_transition_locked(self, channel: int) -> None:
-        cancel = self._channel_transitions.pop(channel, None)
-        if cancel:
-            cancel.set()
+    Memory does not grow with the number of loop iterations: the runner
+    merges the repeats into the plain actions lazily, so loops without an
+    end really play forever.
+    """
 
-    def _cancel_channel_transition(self, channel: int) -> None:
-        with self._transition_lock:
-            self._cancel_channel_transition_locked(channel)
+    def __init__(
+        self, actions: Iterable[DMXAction], segments: Iterable[LoopSegment] = ()
+    ) -> None:
+        self.actions: List[DMXAction] = sorted(actions, key=lambda act: act.time_seconds)
+        self.segments: List[LoopSegment] = list(segments)
+        self._times = [action.time_seconds for action in self.actions]
 
-    def _cancel_all_transitions(self) -> None:
-        with self._transition_lock:
-            events = list(self._channel_transitions.values())
-            self._channel_transitions.clear()
-        for cancel in events:
-            cancel.set()
+    @property
+    def infinite(self) -> bool:
+        return any(segment.end_time is None for segment in self.segments)
 
-    def set_channel(self, channel: int, value: int, *, _cancel_transition: bool = True) -> None:
-        idx = channel - 1
-        if idx < 0 or idx >= self.channel_count:
-            raise ValueError("Channel out of range")
-        if _cancel_transition:
-            self._cancel_channel_transition(channel)
-        with self._lock:
-            self._levels[idx] = _clamp(value, 0, 255)
-            self._dirty = True
+    def with_actions(self, actions: Iterable[DMXAction]) -> "ShowProgram":
+        return ShowProgram(self.actions + list(actions), self.segments)
 
-    def get_channel(self, channel: int) -> int:
-        idx = channel - 1
-        if idx < 0 or idx >= self.channel_count:
-            raise ValueError("Channel out of range")
-        with self._lock:
-            return self._levels[idx]
+    def iter_actions(self, since: float = 0.0) -> Iterator[DMXAction]:
+        """Yield every action at or after ``since`` in time order."""
 
-    def get_levels(self) -> List[int]:
-        """Return a snapshot of the current DMX universe levels."""
+        start = bisect.bisect_left(self._times, since)
+        streams: List[Iterable[DMXAction]] = [itertools.islice(self.actions, start, None)]
+        streams.extend(segment.iter_actions(since) for segment in self.segments)
+        return heapq.merge(*streams, key=lambda act: act.time_seconds)
 
-        with self._lock:
-            return list(self._levels)
+    def materialize(self) -> List[DMXAction]:
+        """Expand every loop into plain actions.
 
-    def set_levels(self, levels: Iterable[int]) -> None:
-        values = list(levels)
-        if len(values) != self.channel_count:
-            raise ValueError("Levels iterable must contain exactly 512 values")
-        self._cancel_all_transitions()
-        with self._lock:
-            self._levels[:] = [_clamp(v, 0, 255) for v in values]
-            self._dirty = True
+        Endless loops are cut after their ``fallback_iterations``.
+        """
 
-    def blackout(self) -> None:
-        self._cancel_all_transitions()
-        with self._lock:
-            if any(self._levels):
-                self._levels = [0] * self.channel_count
-                self._dirty = True
+        expanded = list(self.actions)
+        for segment in self.segments:
+            expanded.extend(segment.materialize())
+        expanded.sort(key=lambda action: action.time_seconds)
+        return expanded
 
-    def transition_channel(
-        self,
-        channel: int,
-        value: int,
-        duration: float,
-        stop_event: Optional[threading.Event] = None,
-    ) -> None:
-        value = _clamp(value, 0, 255)
-        if duration <= 0:
-            self.set_channel(channel, value)
-            return
 
-        cancel_event = threading.Event()
-        with self._transition_lock:
-            self._cancel_channel_transition_locked(channel)
-            start_value = self.get_channel(channel)
-            self._channel_transitions[channel] = cancel_event
+@dataclass(eq=False)
+class _ParsedAction:
+    """A template action with the builder metadata that loop expansion uses."""
 
-        steps = max(int(duration * DMX_FPS), 1)
-        step_duration = duration / steps
+    action: DMXAction
+    channel_master_id: Optional[str]
+    template_row_id: Optional[str]
 
-        def _worker() -> None:
-            try:
-                for step in range(1, steps + 1):
-                    if cancel_event.is_set():
-                        return
-                    if stop_event and stop_event.is_set():
-                        return
-                    ratio = step / steps
-                    current = round(start_value + (value - start_value) * ratio)
-                    self.set_channel(channel, current, _cancel_transition=False)
-                    if stop_event:
-                        if stop_event.wait(step_duration):
-                            return
-                    else:
-                        time.sleep(step_duration)
-            finally:
-                with self._transition_lock:
-                    existing = self._channel_transitions.get(channel)
-                    if existing is cancel_event:
-                        self._channel_transitions.pop(channel, None)
 
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
+@dataclass
+class CompiledShow:
+    """Parsed contents of a DMX template file with its loops kept lazy."""
 
-    def shutdown(self) -> None:
-        self._cancel_all_transitions()
-        self._stop_event.set()
-        if self._thread.is_alive():
-            self._thread.join(timeout=1.0)
-        cleanup = getattr(self, "_sender_cleanup", None)
-        if cleanup:
-            try:
-                cleanup()
-            except Exception:  # pragma: no cover - defensive
-                LOGGER.exception("Error while cleaning up DMX sender")
+    program: ShowProgram
+    relay_actions: List[RelayAction]
 
+    def materialize(self) -> List[DMXAction]:
+        """Expand the show's loops into a new list of plain actions.
 
-class DMXShowRunner:
-    def __init__(self, output: DMXOutput) -> None:
-        self.output = output
-        self._thread: Optional[threading.Thread] = None
-        self._stop_event: Optional[threading.Event] = None
-        self._lock = threading.Lock()
+        This walks every loop iteration, so it is only meant for callers
+        that need a finite list; playback streams ``program`` instead.
+        """
 
-    def start(self, actions: Iterable[DMXAction]) -> None:
-        ordered_actions = sorted(actions, key=lambda act: act.time_seconds)
-        if not ordered_actions:
-            LOGGER.info("No DMX actions to execute for this show")
-            return
+        return self.program.materialize()
 
-        # Ensure any existing show is fully stopped before starting a new one.
-        self.stop()
 
-        stop_event = threading.Event()
-        thread = threading.Thread(
-            target=self._run_show,
-            args=(ordered_actions, stop_event),
-            daemon=True,
-        )
+class TemplateConflictError(RuntimeError):
+    """Raised when a template edit was made against an outdated revision."""
 
-        with self._lock:
-            self._stop_event = stop_event
-            self._thread = thread
+    def __init__(self, revision: int) -> None:
+        super().__init__(f"Template was changed elsewhere (now at revision {revision})")
+        self.revision = revision
 
-        thread.start()
-        LOGGER.info("Started DMX show with %s actions", len(ordered_actions))
 
-    def _run_show(self, actions: List[DMXAction], stop_event: threading.Event) -> None:
-        start_time = time.monotonic()
-        for action in actions:
-            if stop_event.is_set():
-                break
+def _template_entry_time(entry: Dict[str, object]) -> float:
+    if "time" not in entry:
+        raise ValueError("Action is missing required 'time' field")
+    return parse_timecode(str(entry["time"]))
+
+
+@dataclass
+class TemplateDocument:
+    """Editable, id-addressed form of a template file and its journal.
+
+    ``actions`` stays in playback order with ``times`` holding each entry's
+    parsed time, so edits are placed with bisect instead of re-sorting and
+    re-parsing the whole template.  Ids are looked up in a map holding each
+    entry with its time, and an entry is found in ``actions`` by bisecting
+    that time.
+    """
+
+    revision: int
+    actions: List[Dict[str, object]]
+    times: List[float]
+    relay_actions: Optional[List[Dict[str, object]]] = None
+    signature: Tuple[int, ...] = ()
+    journal_entries: int = 0
+    _by_id: Dict[str, Tuple[float, Dict[str, object]]] = field(
+        init=False, repr=False, default_factory=dict
+    )
+
+    def __post_init__(self) -> None:
+        self._by_id = {
+            str(entry.get("id")): (time_value, entry)
+            for time_value, entry in zip(self.times, self.actions)
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "TemplateDocument":
+        raw_actions = payload.get("actions", [])
+        if not isinstance(raw_actions, list):
+            raise ValueError("Template actions must be provided as a list")
+        relay_raw = payload.get("relay_actions")
+        if relay_raw == "":
+            relay_raw = None
+        if relay_raw is not None and not isinstance(relay_raw, list):
+            raise ValueError("Relay actions must be provided as a list")
+        revision = payload.get("revision")
+        if not isinstance(revision, int) or isinstance(revision, bool) or revision < 0:
+            revision = 0
+
+        entries: List[Tuple[float, Dict[str, object]]] = []
+        seen: Set[str] = set()
+        for index, raw in enumerate(raw_actions):
+            if not isinstance(raw, dict):
+                raise ValueError("Template actions must be objects")
+            entry = dict(raw)
+            action_id = entry.get("id")
+            if not isinstance(action_id, str) or not action_id or action_id in seen:
+                # Positional ids stay stable for as long as the file does.
+                action_id = f"action_{revision}_{index}"
+                entry["id"] = action_id
+            seen.add(action_id)
+            entries.append((_template_entry_time(entry), entry))
+        entries.sort(key=lambda item: item[0])
+        return cls(
+            revision=revision,
+            actions=[entry for _, entry in entries],
+            times=[time_value for time_value, _ in entries],
+            relay_actions=list(relay_raw) if relay_raw is not None else None,
+        )
+
+    def copy(self) -> "TemplateDocument":
+        return TemplateDocument(
+            revision=self.revision,
+            actions=list(self.actions),
+            times=list(self.times),
+            relay_actions=self.relay_actions,
+            signature=self.signature,
+            journal_entries=self.journal_entries,
+        )
+
+    def payload(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"revision": self.revision, "actions": list(self.actions)}
+        if self.relay_actions is not None:
+            payload["relay_actions"] = list(self.relay_actions)
+        return payload
+
+    def _index_of(self, action_id: str) -> int:
+        found = self._by_id.get(action_id)
+        if found is None:
+            raise ValueError(f"Unknown action id '{action_id}'")
+        time_value, entry = found
+        index = bisect.bisect_left(self.times, time_value)
+        while self.actions[index] is not entry:
+            index += 1
+        return index
+
+    def contains(self, action_id: str) -> bool:
+        return action_id in self._by_id
+
+    def get(self, action_id: str) -> Dict[str, object]:
+        found = self._by_id.get(action_id)
+        if found is None:
+            raise ValueError(f"Unknown action id '{action_id}'")
+        return found[1]
+
+    def insert(self, entry: Dict[str, object]) -> None:
+        time_value = _template_entry_time(entry)
+        index = bisect.bisect_right(self.times, time_value)
+        self.times.insert(index, time_value)
+        self.actions.insert(index, entry)
+        self._by_id[str(entry.get("id"))] = (time_value, entry)
+
+    def remove(self, action_id: str) -> Dict[str, object]:
+        index = self._index_of(action_id)
+        del self._by_id[action_id]
+        del self.times[index]
+        return self.actions.pop(index)
+
+    def apply(self, operations: Iterable[Dict[str, Any]]) -> None:
+        """Apply normalised journal operations in order."""
+
+        for operation in operations:
+            kind = operation.get("op")
+            if kind == "insert":
+                self.insert(dict(operation["action"]))
+            elif kind == "update":
+                entry = dict(operation["action"])
+                self.remove(str(entry["id"]))
+                self.insert(entry)
+            elif kind == "delete":
+                self.remove(str(operation["id"]))
+            else:
+                raise ValueError(f"Unknown template operation '{kind}'")
+
+
+class ShowClock:
+    """Show position that can follow the video player's playback time.
+
+    The clock free-runs on ``time.monotonic()`` from ``position`` until
+    :meth:`sync` reports where the video actually is.  The first report locks
+    the clock onto the video; later ones correct drift gradually, or at once
+    when the difference is larger than ``SHOW_CLOCK_SNAP_SECONDS``.  Small
+    corrections never move the clock backwards, so cues are not repeated.
+    """
+
+    def __init__(self, position: float = 0.0) -> None:
+        self._lock = threading.Lock()
+        self._anchor_time = time.monotonic()
+        self._anchor_position = float(position)
+        self._floor = float(position)
+        self._paused = False
+        self._locked = False
+
+    @property
+    def locked(self) -> bool:
+        """True once the clock has received a playback position."""
+
+        with self._lock:
+            return self._locked
+
+    def _position_locked(self, now: float) -> float:
+        if self._paused:
+            return self._anchor_position
+        return self._anchor_position + (now - self._anchor_time)
+
+    def position(self, now: Optional[float] = None) -> float:
+        if now is None:
             now = time.monotonic()
-            wait_time = action.time_seconds - (now - start_time)
-            if wait_time > 0:
-                if stop_event.wait(wait_time):
-                    break
-            self.output.transition_channel(
-                action.channel,
-                action.value,
-                action.fade,
+        with self._lock:
+            value = max(self._position_locked(now), self._floor)
+            self._floor = value
+            return value
+
+    def sync(self, position: float, *, sampled_at: Optional[float] = None) -> bool:
+        """Steer the clock towards a playback ``position`` seen at ``sampled_at``.
+
+        Returns True when the clock snapped backwards, as after a seek back in
+        the player: cues behind the old position must then be replayed.
+        """
+
+        if sampled_at is None:
+            sampled_at = time.monotonic()
+        with self._lock:
+            predicted = self._position_locked(sampled_at)
+            error = float(position) - predicted
+            snapped_back = False
+            if not self._locked or abs(error) > SHOW_CLOCK_SNAP_SECONDS:
+                snapped_back = self._locked and error < 0
+                self._anchor_position = float(position)
+                self._floor = min(self._floor, self._anchor_position)
+                self._locked = True
+            else:
+                self._anchor_position = predicted + error * SHOW_CLOCK_GAIN
+            self._anchor_time = sampled_at
+            return snapped_back
+
+    def set_paused(self, paused: bool) -> None:
+        with self._lock:
+            if paused == self._paused:
+                return
+            now = time.monotonic()
+            self._anchor_position = self._position_locked(now)
+            self._anchor_time = now
+            self._paused = paused
+
+    @property
+    def paused(self) -> bool:
+        with self._lock:
+            return self._paused
+
+    def seek(self, position: float) -> None:
+        """Jump to ``position``, forwards or backwards."""
+
+        with self._lock:
+            self._anchor_position = max(0.0, float(position))
+            self._anchor_time = time.monotonic()
+            self._floor = self._anchor_position
+
+
+# Last action seen on a channel: (level faded from, target, start time, fade,
+# curve).
+_ChannelRecord = Tuple[int, int, float, float, str]
+
+
+@dataclass
+class ShowState:
+    """Channel state of a show at one position, rebuilt by :class:`ShowIndex`."""
+
+    levels: List[int]
+    cursor: int
+    # Fades still running at the position: (channel, target, seconds left).
+    fades: List[Tuple[int, int, float]]
+    # Where each running fade started, for resuming it along its curve:
+    # (level faded from, seconds already elapsed, curve), in ``fades`` order.
+    fade_origins: List[Tuple[int, float, str]] = field(default_factory=list)
+
+
+class ShowIndex:
+    """Sorted show actions with periodic state keyframes for seeking.
+
+    Every ``interval`` actions a keyframe records the last action applied to
+    each channel.  Rebuilding the state at a position bisects the action
+    times, copies the keyframe before it and replays at most ``interval``
+    actions, so a seek does not depend on how long the show is.  Levels
+    follow :func:`bake_frame_timeline`: a fade starts from the level its
+    channel has at the fade's own start time.
+    """
+
+    def __init__(
+        self,
+        actions: Iterable[DMXAction],
+        baseline: Sequence[int],
+        *,
+        interval: int = SHOW_KEYFRAME_INTERVAL,
+    ) -> None:
+        self.actions: List[DMXAction] = sorted(actions, key=lambda act: act.time_seconds)
+        self.times: List[float] = [action.time_seconds for action in self.actions]
+        self.baseline: List[int] = [_clamp(int(value), 0, 255) for value in baseline]
+        self.interval = max(1, int(interval))
+        self._keyframes: List[List[Optional[_ChannelRecord]]] = []
+        records: List[Optional[_ChannelRecord]] = [None] * len(self.baseline)
+        for position, action in enumerate(self.actions):
+            if position % self.interval == 0:
+                self._keyframes.append(list(records))
+            self._apply(records, action)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def _level(self, records: List[Optional[_ChannelRecord]], idx: int, seconds: float) -> int:
+        record = records[idx]
+        if record is None:
+            return self.baseline[idx]
+        start_value, target, start_time, duration, curve = record
+        if duration <= 0 or seconds >= start_time + duration:
+            return target
+        ratio = (seconds - start_time) / duration
+        return get_fade_curve(curve).level(start_value, target, ratio)
+
+    def _apply(self, records: List[Optional[_ChannelRecord]], action: DMXAction) -> None:
+        idx = action.channel - 1
+        if idx < 0 or idx >= len(records):
+            return
+        start_value = self._level(records, idx, action.time_seconds)
+        records[idx] = (
+            start_value,
+            _clamp(action.value, 0, 255),
+            action.time_seconds,
+            max(0.0, action.fade),
+            action.curve,
+        )
+
+    def cursor_at(self, seconds: float) -> int:
+        """Index of the first action that fires after ``seconds``."""
+
+        # A millisecond of tolerance keeps actions at exactly ``seconds``
+        # from being replayed because of floating point rounding.
+        return bisect.bisect_right(self.times, seconds + 0.001)
+
+    def state_at(self, seconds: float) -> ShowState:
+        seconds = max(0.0, float(seconds))
+        cursor = self.cursor_at(seconds)
+        if self._keyframes:
+            keyframe = min(cursor // self.interval, len(self._keyframes) - 1)
+            records = list(self._keyframes[keyframe])
+            replay_from = keyframe * self.interval
+        else:
+            records = [None] * len(self.baseline)
+            replay_from = 0
+        for action in self.actions[replay_from:cursor]:
+            self._apply(records, action)
+
+        levels = [self._level(records, idx, seconds) for idx in range(len(records))]
+        fades: List[Tuple[int, int, float]] = []
+        origins: List[Tuple[int, float, str]] = []
+        for idx, record in enumerate(records):
+            if record is None:
+                continue
+            start_value, target, start_time, duration, curve = record
+            remaining = start_time + duration - seconds
+            if duration > 0 and remaining > 0:
+                fades.append((idx + 1, target, remaining))
+                origins.append((start_value, duration - remaining, curve))
+        return ShowState(levels=levels, cursor=cursor, fades=fades, fade_origins=origins)
+
+
+@dataclass
+class _ChannelFade:
+    """An in-flight fade interpolated by the DMX sender loop."""
+
+    start_value: int
+    target: int
+    start_time: float
+    duration: float
+    stop_event: Optional[threading.Event] = None
+    curve: FadeCurve = FADE_CURVES[FADE_CURVE_LINEAR]
+
+
+@dataclass
+class _TimelinePlayback:
+    """A frame timeline being copied into the output by the sender loop."""
+
+    timeline: FrameTimeline
+    clock: ShowClock
+    stop_event: threading.Event
+    previous_row: Optional[bytes] = None
+    layer: str = MIXER_SHOW
+
+
+@dataclass
+class _MasterFade:
+    """An in-flight grand master or submaster fade, advanced per frame."""
+
+    start_level: float
+    target: float
+    start_time: float
+    duration: float
+
+
+def _bytewise_max(first: int, second: int, high: int) -> int:
+    """Per-byte maximum of two byte strings of equal length held as ints.
+
+    ``high`` holds 0x80 in every byte.  The low seven bits of each byte are
+    compared by a subtraction that cannot borrow into the next byte, and
+    the top bits decide wherever they differ.
+    """
+
+    low_ge = (first | high) - (second & ~high)
+    ge = ((first & ~second) | (~(first ^ second) & low_ge)) & high
+    select = (ge >> 7) * 0xFF
+    return (first & select) | (second & ~select)
+
+
+@functools.lru_cache(maxsize=128)
+def _master_table(step: int) -> bytes:
+    """Translation table that scales DMX levels by ``step / MASTER_STEPS``."""
+
+    return bytes(round(value * step / MASTER_STEPS) for value in range(256))
+
+
+@dataclass
+class _MixerLayer:
+    """Levels written by one source, and which channels it currently holds."""
+
+    levels: bytearray
+    # 0xFF for every channel the layer holds, so it can be used as a bit mask.
+    mask: bytearray
+    # ``mask`` as an int, rebuilt by the merge after ``mask`` changes.
+    mask_bits: Optional[int] = None
+
+
+class ArtNetSender:
+    """Send DMX frames as Art-Net ``ArtDmx`` packets over UDP.
+
+    The packet is allocated once; each frame only rewrites the sequence byte
+    and the channel data in place before the datagram is sent.
+    """
+
+    HEADER_SIZE = 18
+
+    def __init__(
+        self,
+        universe: int,
+        target: str = "255.255.255.255",
+        *,
+        port: int = ARTNET_PORT,
+        channel_count: int = DEFAULT_CHANNELS,
+    ) -> None:
+        # ArtDmx requires an even data length between 2 and 512.
+        length = min(DEFAULT_CHANNELS, max(2, channel_count + (channel_count % 2)))
+        self.universe = universe
+        self.address = (target, port)
+        self._length = length
+        self._sequence = 0
+        self._packet = bytearray(self.HEADER_SIZE + length)
+        packet = self._packet
+        packet[0:8] = b"Art-Net\x00"
+        packet[8:10] = (0x5000).to_bytes(2, "little")  # OpDmx
+        packet[10:12] = (14).to_bytes(2, "big")  # protocol version
+        packet[14] = universe & 0xFF  # SubUni
+        packet[15] = (universe >> 8) & 0x7F  # Net
+        packet[16:18] = length.to_bytes(2, "big")
+        self._data = memoryview(self._packet)[self.HEADER_SIZE :]
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+    def send(self, data: bytearray) -> None:
+        count = min(len(data), self._length)
+        self._data[:count] = data[:count]
+        # Sequence 0 disables reordering on the receiver, so cycle 1..255.
+        self._sequence = self._sequence % 255 + 1
+        self._packet[12] = self._sequence
+        try:
+            self._socket.sendto(self._packet, self.address)
+        except OSError:
+            LOGGER.exception("Failed to send Art-Net frame to %s:%s", *self.address)
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+class SACNSender:
+    """Send DMX frames as sACN (ANSI E1.31) data packets over UDP.
+
+    Without an explicit target the universe's multicast group
+    (``239.255.<hi>.<lo>``) is used.  As with :class:`ArtNetSender` the
+    packet buffer is built once and updated in place for every frame.
+    """
+
+    HEADER_SIZE = 126
+    SOURCE_NAME = "kpop_stage"
+
+    def __init__(
+        self,
+        universe: int,
+        target: Optional[str] = None,
+        *,
+        port: int = SACN_PORT,
+        priority: int = SACN_DEFAULT_PRIORITY,
+        channel_count: int = DEFAULT_CHANNELS,
+        cid: Optional[bytes] = None,
+    ) -> None:
+        # sACN universes are numbered from 1.
+        self.universe = _clamp(universe, 1, 63999)
+        self.priority = _clamp(priority, 0, 200)
+        if not target:
+            target = f"239.255.{self.universe >> 8}.{self.universe & 0xFF}"
+        self.address = (target, port)
+        slots = _clamp(channel_count, 1, DEFAULT_CHANNELS)
+        self._slots = slots
+        self._sequence = 0
+        total = self.HEADER_SIZE + slots
+        packet = bytearray(total)
+        # Root layer
+        packet[0:2] = (0x0010).to_bytes(2, "big")
+        packet[4:16] = b"ASC-E1.17\x00\x00\x00"
+        packet[16:18] = (0x7000 | (total - 16)).to_bytes(2, "big")
+        packet[18:22] = (0x00000004).to_bytes(4, "big")
+        packet[22:38] = (cid or uuid.uuid4().bytes)[:16]
+        # Framing layer
+        packet[38:40] = (0x7000 | (total - 38)).to_bytes(2, "big")
+        packet[40:44] = (0x00000002).to_bytes(4, "big")
+        name = self.SOURCE_NAME.encode("utf-8")[:63]
+        packet[44 : 44 + len(name)] = name
+        packet[108] = self.priority
+        packet[113:115] = self.universe.to_bytes(2, "big")
+        # DMP layer
+        packet[115:117] = (0x7000 | (total - 115)).to_bytes(2, "big")
+        packet[117] = 0x02
+        packet[118] = 0xA1
+        packet[121:123] = (0x0001).to_bytes(2, "big")
+        packet[123:125] = (slots + 1).to_bytes(2, "big")
+        packet[125] = 0  # DMX start code
+        self._packet = packet
+        self._data = memoryview(packet)[self.HEADER_SIZE :]
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 8)
+
+    def send(self, data: bytearray) -> None:
+        count = min(len(data), self._slots)
+        self._data[:count] = data[:count]
+        self._sequence = (self._sequence + 1) & 0xFF
+        self._packet[111] = self._sequence
+        try:
+            self._socket.sendto(self._packet, self.address)
+        except OSError:
+            LOGGER.exception("Failed to send sACN frame to %s:%s", *self.address)
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+def _build_network_sender(
+    protocol: str, universe: int, channel_count: int
+) -> Optional[tuple[Callable[[bytearray], None], Optional[Callable[[], None]]]]:
+    """Create an Art-Net or sACN sender from ``DMX_*`` environment settings."""
+
+    target = os.environ.get("DMX_TARGET", "").strip() or None
+    raw_port = os.environ.get("DMX_NETWORK_PORT", "").strip()
+    try:
+        port = int(raw_port) if raw_port else None
+    except ValueError:
+        LOGGER.warning("Invalid DMX_NETWORK_PORT '%s'. Using the default.", raw_port)
+        port = None
+
+    try:
+        if protocol == "artnet":
+            sender: Any = ArtNetSender(
+                universe,
+                target or "255.255.255.255",
+                port=port or ARTNET_PORT,
+                channel_count=channel_count,
+            )
+        elif protocol == "sacn":
+            priority = int(
+                _parse_env_float("DMX_SACN_PRIORITY", SACN_DEFAULT_PRIORITY)
+            )
+            sender = SACNSender(
+                universe,
+                target,
+                port=port or SACN_PORT,
+                priority=priority,
+                channel_count=channel_count,
+            )
+        else:
+            LOGGER.error(
+                "Unknown DMX_PROTOCOL '%s'. Expected 'artnet' or 'sacn'.", protocol
+            )
+            return None
+    except OSError:
+        LOGGER.exception("Unable to open %s socket for DMX output", protocol)
+        return None
+
+    LOGGER.info(
+        "Using %s DMX output to %s:%s", protocol, sender.address[0], sender.address[1]
+    )
+    return sender.send, sender.close
+
+
+class OLAStreamClient:
+    """Long-lived OLA connection that pipelines frames to olad.
+
+    A dedicated thread owns the ``ClientWrapper`` and runs its event loop for
+    the lifetime of the output.  ``submit`` never waits for olad: frames are
+    handed to the loop and up to ``max_in_flight`` ``SendDmx`` requests may be
+    awaiting an acknowledgement at once.  When olad falls behind only the
+    newest pending frame is kept; older ones are dropped.  If the connection
+    is lost the thread reconnects with a short back-off.
+    """
+
+    def __init__(
+        self,
+        universe: int,
+        *,
+        wrapper_factory: Optional[Callable[[], Any]] = None,
+        max_in_flight: int = 2,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self.universe = universe
+        self._wrapper_factory = wrapper_factory or ClientWrapper
+        self._max_in_flight = max(1, int(max_in_flight))
+        self._reconnect_delay = max(0.0, reconnect_delay)
+        self._lock = threading.Lock()
+        self._pending: Optional[array.array] = None
+        self._in_flight = 0
+        self._wrapper: Any = None
+        self._client: Any = None
+        self._connected = threading.Event()
+        self._stop_event = threading.Event()
+        self._frames_sent = 0
+        self._frames_acked = 0
+        self._frames_failed = 0
+        self._frames_dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name="ola-stream", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                wrapper = self._wrapper_factory()
+                client = wrapper.Client()
+            except Exception as exc:  # pragma: no cover - depends on olad
+                LOGGER.warning("Unable to connect to OLA daemon (%s); retrying", exc)
+                self._stop_event.wait(self._reconnect_delay)
+                continue
+            with self._lock:
+                self._wrapper = wrapper
+                self._client = client
+                self._in_flight = 0
+                resend = self._pending is not None
+            self._connected.set()
+            if resend:
+                wrapper.Execute(self._pump)
+            try:
+                wrapper.Run()
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("OLA client event loop failed")
+            finally:
+                self._connected.clear()
+                with self._lock:
+                    self._wrapper = None
+                    self._client = None
+                    self._in_flight = 0
+            if not self._stop_event.is_set():
+                LOGGER.warning("Lost connection to OLA daemon; reconnecting")
+                self._stop_event.wait(self._reconnect_delay)
+
+    def _pump(self) -> None:
+        """Send the pending frame if the in-flight window allows it.
+
+        Runs on the OLA event loop thread.
+        """
+
+        with self._lock:
+            client = self._client
+            if client is None or self._pending is None:
+                return
+            if self._in_flight >= self._max_in_flight:
+                return
+            payload = self._pending
+            self._pending = None
+            self._in_flight += 1
+            self._frames_sent += 1
+        try:
+            client.SendDmx(self.universe, payload, self._on_ack)
+        except Exception:
+            LOGGER.exception("Failed to queue DMX frame for OLA")
+            with self._lock:
+                self._in_flight = max(0, self._in_flight - 1)
+                self._frames_failed += 1
+                wrapper = self._wrapper
+            # A send error usually means the socket is gone; leave the loop so
+            # the connection is re-established.
+            if wrapper is not None:
+                wrapper.Stop()
+
+    def _on_ack(self, status: Any) -> None:
+        succeeded = getattr(status, "Succeeded", None)
+        ok = succeeded() if callable(succeeded) else bool(status)
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if ok:
+                self._frames_acked += 1
+            else:
+                self._frames_failed += 1
+        if not ok:
+            LOGGER.error("Failed to send DMX frame via OLA")
+        self._pump()
+
+    def submit(self, data: bytearray) -> None:
+        """Queue ``data`` as the next frame without waiting for olad."""
+
+        # python-ola expects an ``array('B')`` or similar object that provides
+        # a ``tobytes`` method.  ``bytearray`` does not, so we wrap the data to
+        # match the library expectations before sending.
+        payload = array.array("B", data)
+        with self._lock:
+            if self._pending is not None:
+                self._frames_dropped += 1
+            self._pending = payload
+            wrapper = self._wrapper
+        if wrapper is not None:
+            wrapper.Execute(self._pump)
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        return self._connected.wait(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "frames_sent": self._frames_sent,
+                "frames_acked": self._frames_acked,
+                "frames_failed": self._frames_failed,
+                "frames_dropped": self._frames_dropped,
+                "in_flight": self._in_flight,
+            }
+
+    def close(self) -> None:
+        self._stop_event.set()
+        with self._lock:
+            wrapper = self._wrapper
+        if wrapper is not None:
+            try:
+                # Execute wakes the event loop so Stop takes effect promptly.
+                wrapper.Execute(wrapper.Stop)
+            except Exception:  # pragma: no cover - defensive
+                LOGGER.debug("Error while stopping OLA client", exc_info=True)
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+
+class DMXOutput:
+    """Continuously pushes the latest DMX universe state to the hardware.
+
+    Writers do not share one level buffer: each writes into a named mixer
+    layer (see ``MIXER_LAYERS``), and the sender thread merges the layers
+    into the output once per frame.  A layer only takes part in the merge for
+    the channels it holds, so releasing a layer lets the layers below it
+    show through again.  Methods without a ``layer`` act on the show layer.
+    """
+
+    def __init__(
+        self,
+        universe: int = 0,
+        channel_count: int = DEFAULT_CHANNELS,
+        *,
+        fps: Optional[float] = None,
+        patch: Optional[ChannelPatch] = None,
+    ) -> None:
+        if patch is None:
+            patch = ChannelPatch([universe], slots=channel_count)
+        self.patch = patch
+        self.universes = list(patch.universes)
+        self.universe = self.universes[0]
+        self.channel_count = patch.channel_count
+        self._universe_of = patch.universe_of
+        target_fps = DMX_FPS if fps is None else float(fps)
+        self.fps = max(1.0, min(DMX_MAX_FPS, target_fps))
+        self._stats_lock = threading.Lock()
+        self._frames_sent = 0
+        self._late_frames = 0
+        self._skipped_frames = 0
+        self._achieved_fps = 0.0
+        # The merged output levels, rebuilt from the layers when they change.
+        self._levels = bytearray(self.channel_count)
+        self._layers: Dict[str, _MixerLayer] = {
+            name: _MixerLayer(bytearray(self.channel_count), bytearray(self.channel_count))
+            for name in MIXER_LAYERS
+        }
+        self._handles: Dict[str, OutputLayer] = {}
+        # 0xFF for every channel merged highest-takes-precedence, as an int
+        # so the merge can select channels with bitwise operations.
+        self._htp_mask = 0
+        self._byte_high = int.from_bytes(b"\x80" * self.channel_count, "big")
+        self._mix_pending = False
+        # The grand master and group submasters scale the mixed levels into
+        # ``_frame`` when a frame is rendered; setting one only marks the
+        # universes dirty.
+        self._frame = bytearray(self.channel_count)
+        self._grand_master = 1.0
+        self._submasters: Dict[str, float] = {}
+        self._group_masks: Dict[str, int] = {}
+        # Channels split by the exact set of groups they belong to, so a
+        # channel in several groups is scaled by all of their submasters.
+        self._master_regions: List[Tuple[Tuple[str, ...], int]] = [
+            ((), (1 << (8 * self.channel_count)) - 1)
+        ]
+        self._master_fades: Dict[Optional[str], _MasterFade] = {}
+        self._lock = threading.Lock()
+        # Indexes into ``universes`` whose payload must be rebuilt and sent.
+        self._dirty: Set[int] = set()
+        self._stop_event = threading.Event()
+        # Active fades keyed by layer and channel.  They are advanced once per
+        # frame by the sender thread instead of running a worker thread per
+        # fade.
+        self._fades: Dict[Tuple[str, int], _ChannelFade] = {}
+        htp_channels = _parse_channel_list(os.environ.get("DMX_HTP_CHANNELS", ""))
+        if htp_channels:
+            self.set_merge_rule(
+                [channel for channel in htp_channels if channel <= self.channel_count],
+                MERGE_HTP,
+            )
+        self._timeline: Optional[_TimelinePlayback] = None
+        # Unchanged universes are refreshed every frame unless their backend
+        # holds the last frame itself (see DMX_KEEPALIVE_INTERVAL), so each
+        # universe keeps the refresh interval of the sender built for it.
+        self._senders: List[tuple[Callable[[bytearray], None], Optional[Callable[[], None]]]] = []
+        self._refresh_intervals: List[float] = []
+        for number in self.universes:
+            sender, cleanup, refresh_interval = self._build_sender(number)
+            self._senders.append((sender, cleanup))
+            self._refresh_intervals.append(refresh_interval)
+        self._thread = threading.Thread(target=self._run_sender, daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _build_sender(
+        self, universe: int
+    ) -> tuple[Callable[[bytearray], None], Optional[Callable[[], None]], float]:
+        """Return the sender, its cleanup and its idle refresh interval."""
+
+        protocol = os.environ.get("DMX_PROTOCOL", "").strip().lower()
+        if protocol in {"artnet", "art-net", "sacn", "e1.31"}:
+            protocol = "artnet" if protocol.startswith("art") else "sacn"
+            network_sender = _build_network_sender(protocol, universe, self.patch.slots)
+            if network_sender:
+                return (*network_sender, DMX_KEEPALIVE_INTERVAL)
+            LOGGER.error(
+                "Falling back to serial/OLA output after %s setup failed.", protocol
+            )
+        elif protocol:
+            LOGGER.warning("Ignoring unknown DMX_PROTOCOL '%s'.", protocol)
+
+        serial_port = _resolve_serial_port()
+        if serial_port and universe != self.universe:
+            LOGGER.warning(
+                "DMX serial output only carries universe %s; universe %s will use "
+                "OLA/dry-run output.",
+                self.universe,
+                universe,
+            )
+        elif serial_port:
+            try:
+                sender = self._build_serial_sender(serial_port)
+            except Exception:  # pragma: no cover - depends on hardware
+                LOGGER.exception(
+                    "Unable to initialise DMX serial port %s. Falling back to OLA/dry-run output.",
+                    serial_port,
+                )
+            else:
+                if sender:
+                    return (*sender, 0.0)
+
+        if ClientWrapper is None:
+            LOGGER.warning(
+                "python-ola not available. DMX output will run in dry-run mode. "
+                "Install the python-ola bindings (e.g. 'sudo apt install ola-python' "
+                "or 'pip install python-ola') alongside the OLA daemon to control "
+                "real fixtures."
+            )
+
+            def log_sender(data: bytearray) -> None:
+                LOGGER.debug("DMX dry-run universe %s: %s", universe, list(data[:16]))
+
+            return log_sender, None, 0.0
+
+        stream = OLAStreamClient(universe)
+        return stream.submit, stream.close, DMX_KEEPALIVE_INTERVAL
+
+    def _build_serial_sender(
+        self, port: str
+    ) -> Optional[tuple[Callable[[bytearray], None], Optional[Callable[[], None]]]]:
+        if serial is None:
+            LOGGER.error(
+                "DMX_SERIAL_PORT is set to %s but pyserial is not installed. "
+                "Install pyserial to enable direct USB DMX output.",
+                port,
+            )
+            return None
+
+        serial_config: Dict[str, Any] = {
+            "port": port,
+            "baudrate": 250000,
+            "bytesize": serial.EIGHTBITS,
+            "parity": serial.PARITY_NONE,
+            "stopbits": serial.STOPBITS_TWO,
+            "timeout": 1,
+            "write_timeout": 1,
+        }
+
+        try:
+            # Attempt to open the serial port once during initialisation so we
+            # can gracefully fall back to a dry-run sender when the hardware is
+            # not available (e.g. on development machines).
+            test_serial = serial.Serial(**serial_config)
+        except Exception as exc:  # pragma: no cover - depends on hardware
+            LOGGER.error(
+                "Unable to open DMX serial port %s (%s). "
+                "Falling back to OLA/dry-run output. Clear DMX_SERIAL_PORT to use "
+                "OLA exclusively or verify the adapter path before restarting.",
+                port,
+                exc,
+            )
+            return None
+        else:  # pragma: no cover - depends on hardware
+            try:
+                test_serial.close()
+            except Exception:
+                LOGGER.debug(
+                    "Error while closing test connection to DMX serial port %s",
+                    port,
+                    exc_info=True,
+                )
+        LOGGER.info("Using DMX serial port %s for DMX output", port)
+
+        thread_local = threading.local()
+        lock = threading.Lock()
+
+        def _get_serial() -> Any:
+            ser = getattr(thread_local, "serial", None)
+            if ser is None or not getattr(ser, "is_open", False):
+                try:
+                    ser = serial.Serial(**serial_config)
+                except Exception:  # pragma: no cover - depends on hardware
+                    LOGGER.exception("Unable to open DMX serial port %s", port)
+                    raise
+                thread_local.serial = ser
+            return ser
+
+        def _close_serial() -> None:
+            ser = getattr(thread_local, "serial", None)
+            if ser is not None:
+                try:
+                    ser.close()
+                except Exception:  # pragma: no cover - depends on hardware
+                    LOGGER.exception("Error while closing DMX serial port %s", port)
+                finally:
+                    thread_local.serial = None
+
+        def send(data: bytearray) -> None:
+            try:
+                ser = _get_serial()
+            except Exception:
+                return
+
+            frame = bytes([0]) + bytes(data[: self.channel_count])
+            with lock:
+                try:
+                    ser.break_condition = True
+                    time.sleep(DMX_BREAK_DURATION)
+                    ser.break_condition = False
+                    time.sleep(DMX_MARK_AFTER_BREAK)
+                    ser.write(frame)
+                    ser.flush()
+                except Exception:  # pragma: no cover - depends on hardware
+                    LOGGER.exception("Error while sending DMX data over %s", port)
+                    _close_serial()
+
+        return send, _close_serial
+
+    def _run_sender(self) -> None:
+        universe_count = len(self._senders)
+        payloads = [self.patch.render(self._frame, index) for index in range(universe_count)]
+        last_sent = [float("-inf")] * universe_count
+        refresh_intervals = self._refresh_intervals
+        period = 1.0 / self.fps
+        deadline = time.monotonic()
+        window_start = deadline
+        window_frames = 0
+        while not self._stop_event.is_set():
+            with self._lock:
+                now = time.monotonic()
+                self._advance_frame_locked(now)
+                dirty = self._dirty
+                if dirty:
+                    self._dirty = set()
+                    try:
+                        self._render_frame_locked()
+                        for index in dirty:
+                            payloads[index] = self.patch.render(self._frame, index)
+                    except Exception:  # pragma: no cover - defensive logging
+                        LOGGER.exception("Error while rendering DMX frame")
+            # Payloads are rebuilt rather than mutated, so senders may keep a
+            # reference to the bytearray they were given.
+            for index, (sender, _cleanup) in enumerate(self._senders):
+                if index not in dirty and now - last_sent[index] < refresh_intervals[index]:
+                    continue
+                last_sent[index] = now
+                try:
+                    sender(payloads[index])
+                except Exception:  # pragma: no cover - defensive logging
+                    LOGGER.exception(
+                        "Error while sending DMX data for universe %s",
+                        self.universes[index],
+                    )
+
+            # Pace frames against absolute deadlines so send time does not
+            # stretch the period.  A frame that finishes late is followed
+            # immediately by the next one; if a whole period or more was
+            # lost, the missed slots are skipped instead of sent in a burst.
+            deadline += period
+            now = time.monotonic()
+            late = now > deadline
+            skipped = 0
+            if late:
+                skipped = int((now - deadline) / period)
+                deadline += skipped * period
+
+            window_frames += 1
+            elapsed = now - window_start
+            with self._stats_lock:
+                self._frames_sent += 1
+                if late:
+                    self._late_frames += 1
+                    self._skipped_frames += skipped
+                if elapsed >= 1.0:
+                    self._achieved_fps = window_frames / elapsed
+            if elapsed >= 1.0:
+                window_start = now
+                window_frames = 0
+
+            if not late:
+                self._stop_event.wait(deadline - now)
+
+    def _advance_frame_locked(self, now: float) -> None:
+        """Run the per-frame playback steps for the sender loop.
+
+        A step that raises is logged and dropped (its playback or fades are
+        abandoned) so one bad frame cannot stop the sender thread.
+        """
+
+        if self._timeline is not None:
+            try:
+                self._advance_timeline_locked(now)
+            except Exception:
+                LOGGER.exception("DMX timeline playback failed; stopping it")
+                self._timeline = None
+        if self._fades:
+            try:
+                self._advance_fades_locked(now)
+            except Exception:
+                LOGGER.exception("DMX fades failed; holding their current levels")
+                self._fades.clear()
+        if self._master_fades:
+            try:
+                self._advance_master_fades_locked(now)
+            except Exception:
+                LOGGER.exception("DMX master fades failed; holding their current levels")
+                self._master_fades.clear()
+        if self._mix_pending:
+            try:
+                self._mix_locked()
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("Error while mixing DMX layers")
+                self._mix_pending = False
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return sender timing counters."""
+
+        with self._stats_lock:
+            return {
+                "target_fps": self.fps,
+                "achieved_fps": round(self._achieved_fps, 2),
+                "frames_sent": self._frames_sent,
+                "late_frames": self._late_frames,
+                "skipped_frames": self._skipped_frames,
+            }
+
+    def layer(self, name: str) -> "OutputLayer":
+        """Return a handle that writes into the mixer layer ``name``."""
+
+        if name not in self._layers:
+            raise ValueError(f"Unknown mixer layer '{name}'")
+        handle = self._handles.get(name)
+        if handle is None:
+            handle = self._handles[name] = OutputLayer(self, name)
+        return handle
+
+    def set_merge_rule(self, channels: Iterable[int], rule: str) -> None:
+        """Merge ``channels`` by ``MERGE_HTP`` or ``MERGE_LTP``."""
+
+        if rule not in (MERGE_HTP, MERGE_LTP):
+            raise ValueError(f"Unknown merge rule '{rule}'")
+        mask = bytearray(self._htp_mask.to_bytes(self.channel_count, "big"))
+        value = 0xFF if rule == MERGE_HTP else 0
+        with self._lock:
+            for channel in channels:
+                idx = channel - 1
+                if idx < 0 or idx >= self.channel_count:
+                    raise ValueError("Channel out of range")
+                mask[idx] = value
+                self._dirty.add(self._universe_of[idx])
+            self._htp_mask = int.from_bytes(mask, "big")
+            self._mix_pending = True
+
+    def _layer_locked(self, name: str) -> _MixerLayer:
+        layer = self._layers.get(name)
+        if layer is None:
+            raise ValueError(f"Unknown mixer layer '{name}'")
+        return layer
+
+    def _write_locked(self, layer: _MixerLayer, idx: int, value: int) -> None:
+        if layer.levels[idx] == value and layer.mask[idx]:
+            return
+        layer.levels[idx] = value
+        if not layer.mask[idx]:
+            layer.mask[idx] = 0xFF
+            layer.mask_bits = None
+        self._dirty.add(self._universe_of[idx])
+        self._mix_pending = True
+
+    def _mix_locked(self) -> None:
+        """Merge the layers into ``_levels`` with whole-buffer integer operations.
+
+        Each layer costs one conversion of its levels to an int; its mask is
+        only converted again after it changed.  HTP channels are merged with
+        :func:`_bytewise_max`.
+        """
+
+        size = self.channel_count
+        htp_mask = self._htp_mask
+        ltp = 0
+        htp = 0
+        overrides: List[Tuple[int, int]] = []
+        for name, layer in self._layers.items():
+            mask = layer.mask_bits
+            if mask is None:
+                mask = layer.mask_bits = int.from_bytes(layer.mask, "big")
+            if not mask:
+                continue
+            values = int.from_bytes(layer.levels, "big") & mask
+            if name in MIXER_OVERRIDE_LAYERS:
+                overrides.append((mask, values))
+                continue
+            ltp = (ltp & ~mask) | values
+            if mask & htp_mask:
+                htp = _bytewise_max(htp, values & htp_mask, self._byte_high)
+        merged = (ltp & ~htp_mask) | htp
+        for mask, values in overrides:
+            merged = (merged & ~mask) | values
+        self._levels[:] = merged.to_bytes(size, "big")
+        self._mix_pending = False
+
+    def _render_frame_locked(self) -> None:
+        """Scale the mixed levels by their masters into ``_frame``.
+
+        Each region of channels sharing the same groups is scaled by the
+        product of the grand master and those groups' submasters, at once by
+        translating the whole buffer through a lookup table.
+        """
+
+        levels = self._levels
+        grand = self._grand_master
+        passes: List[Tuple[float, int]] = []
+        for names, mask in self._master_regions:
+            factor = grand
+            for name in names:
+                factor *= self._submasters.get(name, 1.0)
+            if factor < 1.0:
+                passes.append((factor, mask))
+        if not passes:
+            self._frame[:] = levels
+            return
+        value = int.from_bytes(levels, "big")
+        for factor, mask in passes:
+            scaled = levels.translate(_master_table(round(factor * MASTER_STEPS)))
+            value = (value & ~mask) | (int.from_bytes(scaled, "big") & mask)
+        self._frame[:] = value.to_bytes(self.channel_count, "big")
+
+    def _store_master_locked(self, group: Optional[str], level: float) -> None:
+        if group is None:
+            self._grand_master = level
+        else:
+            self._submasters[group] = level
+        self._dirty.update(range(len(self.universes)))
+
+    def _advance_master_fades_locked(self, now: float) -> None:
+        finished: List[Optional[str]] = []
+        for group, fade in self._master_fades.items():
+            elapsed = now - fade.start_time
+            if elapsed >= fade.duration:
+                level = fade.target
+                finished.append(group)
+            else:
+                ratio = max(0.0, elapsed / fade.duration)
+                level = fade.start_level + (fade.target - fade.start_level) * ratio
+            self._store_master_locked(group, level)
+        for group in finished:
+            self._master_fades.pop(group, None)
+
+    def set_master_groups(self, groups: Dict[str, Iterable[int]]) -> None:
+        """Replace the fixture groups that have submasters.
+
+        Submasters of groups that remain keep their level; new groups start
+        at full.  Groups may overlap: a channel in several groups is scaled
+        by the product of their submasters.  Channels outside the output are
+        ignored.
+        """
+
+        masks: Dict[str, int] = {}
+        for name, channels in groups.items():
+            mask = bytearray(self.channel_count)
+            for channel in channels:
+                if 1 <= channel <= self.channel_count:
+                    mask[channel - 1] = 0xFF
+            if any(mask):
+                masks[name] = int.from_bytes(mask, "big")
+        regions: Dict[Tuple[str, ...], int] = {(): (1 << (8 * self.channel_count)) - 1}
+        for name, mask in masks.items():
+            split: Dict[Tuple[str, ...], int] = {}
+            for names, region in regions.items():
+                if region & mask:
+                    split[names + (name,)] = region & mask
+                if region & ~mask:
+                    split[names] = region & ~mask
+            regions = split
+        with self._lock:
+            self._group_masks = masks
+            self._master_regions = list(regions.items())
+            self._submasters = {name: self._submasters.get(name, 1.0) for name in masks}
+            for group in [group for group in self._master_fades if group not in (None, *masks)]:
+                del self._master_fades[group]
+            self._dirty.update(range(len(self.universes)))
+
+    def set_master(
+        self, level: float, duration: float = 0.0, *, group: Optional[str] = None
+    ) -> None:
+        """Set the grand master, or the submaster of ``group``, to ``level`` (0-1)."""
+
+        level = min(1.0, max(0.0, float(level)))
+        with self._lock:
+            if group is not None and group not in self._group_masks:
+                raise ValueError(f"Unknown fixture group '{group}'")
+            if duration <= 0:
+                self._master_fades.pop(group, None)
+                self._store_master_locked(group, level)
+                return
+            current = self._grand_master if group is None else self._submasters[group]
+            self._master_fades[group] = _MasterFade(
+                start_level=current,
+                target=level,
+                start_time=time.monotonic(),
+                duration=float(duration),
+            )
+
+    def get_masters(self) -> Dict[str, Any]:
+        """Return the grand master and submaster levels."""
+
+        with self._lock:
+            return {
+                "grand": round(self._grand_master, 4),
+                "groups": {
+                    name: round(level, 4) for name, level in self._submasters.items()
+                },
+            }
+
+    def get_output_levels(self) -> List[int]:
+        """Return the levels as sent, after the masters are applied."""
+
+        with self._lock:
+            if self._mix_pending:
+                self._mix_locked()
+            self._render_frame_locked()
+            return list(self._frame)
+
+    def _advance_fades_locked(self, now: float) -> None:
+        finished: List[Tuple[str, int]] = []
+        for key, fade in self._fades.items():
+            if fade.stop_event is not None and fade.stop_event.is_set():
+                finished.append(key)
+                continue
+            ratio = (now - fade.start_time) / fade.duration
+            if ratio >= 1.0:
+                finished.append(key)
+            current = fade.curve.level(fade.start_value, fade.target, ratio)
+            name, channel = key
+            self._write_locked(self._layers[name], channel - 1, current)
+        for key in finished:
+            self._fades.pop(key, None)
+
+    def _advance_timeline_locked(self, now: float) -> None:
+        playback = self._timeline
+        if playback is None:
+            return
+        if playback.stop_event.is_set():
+            self._timeline = None
+            return
+
+        timeline = playback.timeline
+        layer = self._layers[playback.layer]
+        index = int(playback.clock.position(now) * timeline.fps)
+        finished = index >= timeline.frame_count - 1
+        row = timeline.row(index)
+        previous = playback.previous_row
+        count = min(len(row), self.channel_count)
+        if previous is None:
+            layer.levels[:count] = row[:count]
+            layer.mask[:count] = b"\xff" * count
+            layer.mask_bits = None
+            self._dirty.update(range(len(self.universes)))
+            self._mix_pending = True
+        elif row != previous:
+            # Only channels the show changes in this frame are written so
+            # that manual levels (e.g. smoke) persist until the next cue.
+            for idx in range(count):
+                value = row[idx]
+                if value != previous[idx]:
+                    self._write_locked(layer, idx, value)
+                    self._fades.pop((playback.layer, idx + 1), None)
+        playback.previous_row = row
+        if finished:
+            self._timeline = None
+
+    def play_timeline(
+        self,
+        timeline: FrameTimeline,
+        stop_event: threading.Event,
+        *,
+        offset: float = 0.0,
+        clock: Optional[ShowClock] = None,
+        layer: str = MIXER_SHOW,
+    ) -> None:
+        """Play a pre-rendered timeline until it ends or ``stop_event`` is set.
+
+        Frames are picked by ``clock``, which defaults to one free-running
+        from ``offset``.
+        """
+
+        with self._lock:
+            self._layer_locked(layer)
+            self._timeline = _TimelinePlayback(
+                timeline=timeline,
+                clock=clock or ShowClock(max(0.0, offset)),
                 stop_event=stop_event,
+                layer=layer,
+            )
+
+    def _cancel_channel_transition(self, channel: int, layer: str = MIXER_SHOW) -> None:
+        with self._lock:
+            self._fades.pop((layer, channel), None)
+
+    def _cancel_all_transitions(self) -> None:
+        with self._lock:
+            self._fades.clear()
+
+    def set_channel(
+        self,
+        channel: int,
+        value: int,
+        *,
+        layer: str = MIXER_SHOW,
+        _cancel_transition: bool = True,
+    ) -> None:
+        idx = channel - 1
+        if idx < 0 or idx >= self.channel_count:
+            raise ValueError("Channel out of range")
+        with self._lock:
+            target = self._layer_locked(layer)
+            if _cancel_transition:
+                self._fades.pop((layer, channel), None)
+            self._write_locked(target, idx, _clamp(value, 0, 255))
+
+    def get_channel(self, channel: int) -> int:
+        """Return the merged output level of ``channel``."""
+
+        idx = channel - 1
+        if idx < 0 or idx >= self.channel_count:
+            raise ValueError("Channel out of range")
+        with self._lock:
+            if self._mix_pending:
+                self._mix_locked()
+            return self._levels[idx]
+
+    def get_levels(self) -> List[int]:
+        """Return a snapshot of the mixed levels, before the masters scale them."""
+
+        with self._lock:
+            if self._mix_pending:
+                self._mix_locked()
+            return list(self._levels)
+
+    def get_layer_levels(self, layer: str) -> List[Optional[int]]:
+        """Return the levels of ``layer``, with None for channels it does not hold."""
+
+        with self._lock:
+            target = self._layer_locked(layer)
+            return [
+                value if held else None for value, held in zip(target.levels, target.mask)
+            ]
+
+    def set_levels(self, levels: Iterable[int], *, layer: str = MIXER_SHOW) -> None:
+        """Replace every channel of ``layer``, cancelling only that layer's fades."""
+
+        values = list(levels)
+        if len(values) != self.channel_count:
+            raise ValueError(
+                f"Levels iterable must contain exactly {self.channel_count} values"
+            )
+        with self._lock:
+            target = self._layer_locked(layer)
+            for key in [key for key in self._fades if key[0] == layer]:
+                del self._fades[key]
+            target.levels[:] = bytes(_clamp(v, 0, 255) for v in values)
+            target.mask[:] = b"\xff" * self.channel_count
+            target.mask_bits = None
+            self._dirty.update(range(len(self.universes)))
+            self._mix_pending = True
+
+    def release(self, layer: str, channels: Optional[Iterable[int]] = None) -> None:
+        """Stop ``layer`` holding ``channels`` (all by default), with their fades."""
+
+        with self._lock:
+            target = self._layer_locked(layer)
+            if channels is None:
+                for key in [key for key in self._fades if key[0] == layer]:
+                    del self._fades[key]
+                if not any(target.mask):
+                    return
+                target.levels[:] = bytes(self.channel_count)
+                target.mask[:] = bytes(self.channel_count)
+                target.mask_bits = None
+                self._dirty.update(range(len(self.universes)))
+                self._mix_pending = True
+                return
+            for idx in [channel - 1 for channel in channels]:
+                if idx < 0 or idx >= self.channel_count:
+                    raise ValueError("Channel out of range")
+                self._fades.pop((layer, idx + 1), None)
+                if target.mask[idx]:
+                    target.levels[idx] = 0
+                    target.mask[idx] = 0
+                    target.mask_bits = None
+                    self._dirty.add(self._universe_of[idx])
+                    self._mix_pending = True
+
+    def blackout(self) -> None:
+        """Release every layer, which leaves all channels at zero."""
+
+        with self._lock:
+            self._fades.clear()
+            for layer in self._layers.values():
+                layer.levels[:] = bytes(self.channel_count)
+                layer.mask[:] = bytes(self.channel_count)
+                layer.mask_bits = None
+            if any(self._levels):
+                self._dirty.update(range(len(self.universes)))
+            self._mix_pending = True
+
+    def has_active_transitions(self) -> bool:
+        with self._lock:
+            return bool(self._fades)
+
+    def transition_channel(
+        self,
+        channel: int,
+        value: int,
+        duration: float,
+        stop_event: Optional[threading.Event] = None,
+        *,
+        layer: str = MIXER_SHOW,
+        curve: str = FADE_CURVE_LINEAR,
+        origin: Optional[Tuple[int, float]] = None,
+    ) -> None:
+        """Fade ``channel`` to ``value`` over ``duration`` seconds along ``curve``.
+
+        ``origin`` resumes a fade part way through, as ``(level it started
+        from, seconds already elapsed)``, so a curved fade carries on along
+        the same path instead of restarting its curve from the current level.
+        """
+
+        value = _clamp(value, 0, 255)
+        if duration <= 0:
+            self.set_channel(channel, value, layer=layer)
+            return
+
+        idx = channel - 1
+        if idx < 0 or idx >= self.channel_count:
+            raise ValueError("Channel out of range")
+        shape = get_fade_curve(curve)
+
+        with self._lock:
+            self._start_fade_locked(
+                layer, idx, value, float(duration), stop_event, shape, origin
+            )
+
+    def transition_levels(
+        self, levels: Iterable[int], duration: float, *, layer: str = MIXER_SHOW
+    ) -> None:
+        """Fade every channel of ``layer`` to ``levels`` over ``duration``."""
+
+        values = [_clamp(value, 0, 255) for value in levels]
+        if len(values) != self.channel_count:
+            raise ValueError(
+                f"Levels iterable must contain exactly {self.channel_count} values"
+            )
+        if duration <= 0:
+            self.set_levels(values, layer=layer)
+            return
+        with self._lock:
+            for idx, value in enumerate(values):
+                self._start_fade_locked(layer, idx, value, float(duration), None)
+
+    def _start_fade_locked(
+        self,
+        layer: str,
+        idx: int,
+        value: int,
+        duration: float,
+        stop_event: Optional[threading.Event],
+        curve: FadeCurve = FADE_CURVES[FADE_CURVE_LINEAR],
+        origin: Optional[Tuple[int, float]] = None,
+    ) -> None:
+        # The fade starts from whatever level the channel currently has,
+        # including a partially completed fade that it replaces.  A layer
+        # that does not hold the channel yet fades from the merged output.
+        target = self._layer_locked(layer)
+        if target.mask[idx]:
+            start_value = target.levels[idx]
+        else:
+            if self._mix_pending:
+                self._mix_locked()
+            start_value = self._levels[idx]
+            self._write_locked(target, idx, start_value)
+        start_time = time.monotonic()
+        if origin is not None:
+            start_value = _clamp(int(origin[0]), 0, 255)
+            elapsed = max(0.0, float(origin[1]))
+            start_time -= elapsed
+            duration += elapsed
+        self._fades[(layer, idx + 1)] = _ChannelFade(
+            start_value=start_value,
+            target=value,
+            start_time=start_time,
+            duration=duration,
+            stop_event=stop_event,
+            curve=curve,
+        )
+
+    def shutdown(self) -> None:
+        self._cancel_all_transitions()
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        for _sender, cleanup in getattr(self, "_senders", []):
+            if not cleanup:
+                continue
+            try:
+                cleanup()
+            except Exception:  # pragma: no cover - defensive
+                LOGGER.exception("Error while cleaning up DMX sender")
+
+
+class OutputLayer:
+    """One mixer layer of a :class:`DMXOutput`, with the output's write API.
+
+    Anything that drives an output (such as :class:`DMXShowRunner`) can be
+    pointed at a layer instead, and its writes stay in that layer.
+    """
+
+    def __init__(self, output: DMXOutput, name: str) -> None:
+        self.output = output
+        self.name = name
+
+    @property
+    def channel_count(self) -> int:
+        return self.output.channel_count
+
+    def set_channel(self, channel: int, value: int) -> None:
+        self.output.set_channel(channel, value, layer=self.name)
+
+    def set_levels(self, levels: Iterable[int]) -> None:
+        self.output.set_levels(levels, layer=self.name)
+
+    def get_levels(self) -> List[int]:
+        return [value or 0 for value in self.output.get_layer_levels(self.name)]
+
+    def transition_channel(
+        self,
+        channel: int,
+        value: int,
+        duration: float,
+        stop_event: Optional[threading.Event] = None,
+        *,
+        curve: str = FADE_CURVE_LINEAR,
+        origin: Optional[Tuple[int, float]] = None,
+    ) -> None:
+        self.output.transition_channel(
+            channel,
+            value,
+            duration,
+            stop_event=stop_event,
+            layer=self.name,
+            curve=curve,
+            origin=origin,
+        )
+
+    def transition_levels(self, levels: Iterable[int], duration: float) -> None:
+        self.output.transition_levels(levels, duration, layer=self.name)
+
+    def play_timeline(
+        self,
+        timeline: FrameTimeline,
+        stop_event: threading.Event,
+        *,
+        offset: float = 0.0,
+        clock: Optional[ShowClock] = None,
+    ) -> None:
+        self.output.play_timeline(
+            timeline, stop_event, offset=offset, clock=clock, layer=self.name
+        )
+
+    def release(self, channels: Optional[Iterable[int]] = None) -> None:
+        self.output.release(self.name, channels)
+
+
+# A scheduled callback and the show time it is due at.
+Cue = Tuple[float, Callable[[], None]]
+# Returns a lane's cues, in time order, from a show position onwards.
+CueSource = Callable[[float], Iterator[Cue]]
+# Cues this close before a lane's start position still fire, so a show that
+# starts at 0 does not skip cues at 0 because its clock has already ticked.
+CUE_START_TOLERANCE = 0.001
+
+
+@dataclass
+class _CueLane:
+    """One lane of a :class:`CueScheduler`: its source, clock and next cue."""
+
+    source: CueSource
+    clock: ShowClock
+    cues: Iterator[Cue]
+    pending: Optional[Cue] = None
+    # Orders lanes whose next cues are equally late.
+    sequence: int = 0
+
+
+class CueScheduler:
+    """Fires show cues and timers from one thread.
+
+    Cues are grouped in named lanes, such as DMX actions and relay requests.
+    A lane is added with a source that lists its cues from a show position
+    onwards and the :class:`ShowClock` it follows; only the next cue of each
+    lane is held, so a lane may be endless.  Lanes keep the clock they were
+    added with, so starting a show on a new clock never retargets the lanes
+    of another show.  :meth:`seek` moves one clock and restarts the lanes
+    that follow it.  :meth:`call_later` queues one-off timers on the
+    monotonic clock instead, for effects such as smoke that are not part of
+    a show.
+
+    Callbacks run on the scheduler thread and must return quickly.
+    """
+
+    def __init__(self, name: str = "dmx-cues") -> None:
+        self._name = name
+        self._condition = threading.Condition()
+        # Held while a cue fires so that seek() and clear_lane() never
+        # interleave with a cue of a lane they replace.
+        self._fire_lock = threading.RLock()
+        # Clock of lanes added without one: the most recently given clock.
+        self._clock = ShowClock()
+        self._lanes: Dict[str, _CueLane] = {}
+        self._timers: List[Tuple[float, int, Callable[[], None]]] = []
+        self._cancelled: Set[int] = set()
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def clock(self) -> ShowClock:
+        with self._condition:
+            return self._clock
+
+    def has_lane(self, lane: str) -> bool:
+        with self._condition:
+            return lane in self._lanes
+
+    def set_lane(
+        self,
+        lane: str,
+        source: CueSource,
+        *,
+        clock: Optional[ShowClock] = None,
+        position: Optional[float] = None,
+    ) -> None:
+        """Replace ``lane`` with the cues of ``source``, following ``clock``.
+
+        Without a ``clock`` the lane follows the clock most recently given
+        to this method.  The lane starts at ``position``, by default where
+        its clock is now.
+        """
+
+        with self._fire_lock:
+            with self._condition:
+                if clock is None:
+                    clock = self._clock
+                else:
+                    self._clock = clock
+            if position is None:
+                position = clock.position()
+            self._prime(lane, source, clock, position)
+
+    def clear_lane(self, lane: str) -> None:
+        with self._fire_lock:
+            with self._condition:
+                self._lanes.pop(lane, None)
+
+    def seek(self, position: float, *, clock: Optional[ShowClock] = None) -> None:
+        """Move ``clock`` to ``position`` and restart every lane following it.
+
+        ``clock`` defaults to the clock most recently given to :meth:`set_lane`.
+        """
+
+        position = max(0.0, float(position))
+        with self._fire_lock:
+            with self._condition:
+                if clock is None:
+                    clock = self._clock
+                lanes = [
+                    (lane, entry.source)
+                    for lane, entry in self._lanes.items()
+                    if entry.clock is clock
+                ]
+            clock.seek(position)
+            for lane, source in lanes:
+                self._prime(lane, source, clock, position)
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> int:
+        """Run ``callback`` after ``delay`` seconds; returns a handle for :meth:`cancel`."""
+
+        with self._condition:
+            handle = next(self._sequence)
+            heapq.heappush(
+                self._timers, (time.monotonic() + max(0.0, delay), handle, callback)
+            )
+            self._wake_locked()
+        return handle
+
+    def cancel(self, handle: int) -> None:
+        with self._condition:
+            if any(entry[1] == handle for entry in self._timers):
+                self._cancelled.add(handle)
+
+    def _prime(
+        self, lane: str, source: CueSource, clock: ShowClock, position: float
+    ) -> None:
+        entry = _CueLane(source=source, clock=clock, cues=source(position))
+        entry.pending = next(entry.cues, None)
+        entry.sequence = next(self._sequence)
+        with self._condition:
+            self._lanes[lane] = entry
+            self._wake_locked()
+
+    def _wake_locked(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+        self._condition.notify()
+
+    def _drop_cancelled_locked(self) -> None:
+        while self._timers and self._timers[0][1] in self._cancelled:
+            self._cancelled.discard(heapq.heappop(self._timers)[1])
+
+    def _next_lane_locked(self) -> Optional[Tuple[float, _CueLane]]:
+        """The lane whose next cue is most overdue, and how far off it is."""
+
+        best: Optional[Tuple[float, int, _CueLane]] = None
+        for entry in self._lanes.values():
+            if entry.pending is None:
+                continue
+            remaining = entry.pending[0] - entry.clock.position()
+            if best is None or (remaining, entry.sequence) < best[:2]:
+                best = (remaining, entry.sequence, entry)
+        return None if best is None else (best[0], best[2])
+
+    def _delay_locked(self) -> Optional[float]:
+        self._drop_cancelled_locked()
+        delays: List[float] = []
+        lane = self._next_lane_locked()
+        if lane is not None:
+            # Capped so that clock corrections take effect promptly.
+            delays.append(min(lane[0], SHOW_CLOCK_POLL_INTERVAL))
+        if self._timers:
+            delays.append(self._timers[0][0] - time.monotonic())
+        return min(delays) if delays else None
+
+    def _pop_due_locked(self) -> Optional[Callable[[], None]]:
+        self._drop_cancelled_locked()
+        lane = self._next_lane_locked()
+        if lane is not None and lane[0] <= 0:
+            entry = lane[1]
+            assert entry.pending is not None
+            callback = entry.pending[1]
+            entry.pending = next(entry.cues, None)
+            return callback
+        if self._timers and self._timers[0][0] <= time.monotonic():
+            return heapq.heappop(self._timers)[2]
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                delay = self._delay_locked()
+                if delay is None:
+                    self._condition.wait()
+                    continue
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+            with self._fire_lock:
+                with self._condition:
+                    callback = self._pop_due_locked()
+                if callback is None:
+                    continue
+                try:
+                    callback()
+                except Exception:  # pragma: no cover - defensive logging
+                    LOGGER.exception("Scheduled cue raised an exception")
+
+
+class DMXShowRunner:
+    """Plays DMX actions against an output, with pause, resume and seek.
+
+    Shows with a pre-rendered timeline are handed to the output and follow
+    their clock directly.  Other shows are fired by the ``dmx`` lane of a
+    :class:`CueScheduler` from a time-ordered stream: a slice of the sorted
+    actions, or a :class:`ShowProgram` generating its loops on the fly.
+    Seeking rebuilds the channel levels from a :class:`ShowIndex` and moves
+    the stream by binary search; programs only move their stream.
+    """
+
+    LANE = "dmx"
+
+    def __init__(self, output: DMXOutput, scheduler: Optional[CueScheduler] = None) -> None:
+        self.output = output
+        # Where the running show writes: the output, or one of its layers.
+        self._target: Any = output
+        self.scheduler = scheduler or CueScheduler()
+        self._stop_event: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+        self._clock: Optional[ShowClock] = None
+        self._actions: List[DMXAction] = []
+        self._times: List[float] = []
+        self._program: Optional[ShowProgram] = None
+        self._index: Optional[ShowIndex] = None
+        self._baseline: Optional[List[int]] = None
+        self._timeline: Optional[FrameTimeline] = None
+
+    @property
+    def index(self) -> Optional[ShowIndex]:
+        """The index of the running show, if it was started with one."""
+
+        with self._lock:
+            return self._index
+
+    def start(
+        self,
+        actions: Iterable[DMXAction],
+        timeline: Optional[FrameTimeline] = None,
+        *,
+        clock: Optional[ShowClock] = None,
+        index: Optional[ShowIndex] = None,
+        program: Optional[ShowProgram] = None,
+        layer: Optional[str] = None,
+    ) -> None:
+        """Start a show, replacing any running one.
+
+        When ``index`` is given its actions are played from the clock's
+        position, and the levels and fades at that position are restored
+        first.  A ``program`` replaces ``actions`` and is played from the
+        clock's position with its loops generated as they come due.  The
+        show writes into the output's mixer ``layer`` if given.
+        """
+
+        if clock is None:
+            clock = ShowClock()
+        if program is not None:
+            ordered_actions = program.actions
+        elif index is not None:
+            ordered_actions = index.actions
+        else:
+            ordered_actions = sorted(actions, key=lambda act: act.time_seconds)
+        if not ordered_actions:
+            LOGGER.info("No DMX actions to execute for this show")
+            return
+
+        # Ensure any existing show is fully stopped before starting a new one.
+        self.stop()
+
+        stop_event = threading.Event()
+        target = self.output
+        if layer is not None and hasattr(self.output, "layer"):
+            target = self.output.layer(layer)
+        get_levels = getattr(target, "get_levels", None)
+        timeline_mode = timeline is not None and hasattr(target, "play_timeline")
+        with self._lock:
+            self._target = target
+            self._stop_event = stop_event
+            self._clock = clock
+            self._actions = ordered_actions
+            self._times = [action.time_seconds for action in ordered_actions]
+            self._program = program
+            self._index = index
+            # Captured so that an index can be built on the first seek.
+            self._baseline = (
+                get_levels()
+                if index is None and program is None and get_levels and not timeline_mode
+                else None
+            )
+            self._timeline = timeline if timeline_mode else None
+
+        if timeline_mode:
+            # Pre-rendered shows are copied frame by frame by the output's
+            # sender thread; the scheduler only shares their clock.
+            self.scheduler.set_lane(self.LANE, lambda _position: iter(()), clock=clock)
+            target.play_timeline(timeline, stop_event, clock=clock)
+            LOGGER.info(
+                "Started DMX show timeline with %s frames (%s actions)",
+                timeline.frame_count,
+                len(ordered_actions),
+            )
+            return
+
+        self.scheduler.set_lane(self.LANE, self._cues_from, clock=clock)
+        if program is not None and program.segments:
+            LOGGER.info(
+                "Started DMX show with %s actions and %s loops",
+                len(ordered_actions),
+                len(program.segments),
             )
+        else:
+            LOGGER.info("Started DMX show with %s actions", len(ordered_actions))
+
+    def _cues_from(self, position: float) -> Iterator[Cue]:
+        with self._lock:
+            stop_event = self._stop_event
+            if stop_event is None or self._timeline is not None:
+                return iter(())
+            index = self._index
+            program = self._program
+            actions = self._actions
+            times = self._times
+            clock = self._clock
+            output = self._target
+
+        if index is not None:
+            state = index.state_at(position)
+            output.set_levels(state.levels)
+            if clock is None or not clock.paused:
+                for (channel, target, remaining), (start_value, elapsed, curve) in zip(
+                    state.fades, state.fade_origins
+                ):
+                    # Curved fades carry on from where they started; a linear
+                    # fade from the current level already follows its path.
+                    extra: Dict[str, Any] = {}
+                    if curve != FADE_CURVE_LINEAR:
+                        extra = {"curve": curve, "origin": (start_value, elapsed)}
+                    output.transition_channel(
+                        channel, target, remaining, stop_event=stop_event, **extra
+                    )
+            stream: Iterable[DMXAction] = itertools.islice(index.actions, state.cursor, None)
+        elif program is not None:
+            stream = program.iter_actions(position - CUE_START_TOLERANCE)
+        else:
+            start = bisect.bisect_left(times, position - CUE_START_TOLERANCE)
+            stream = itertools.islice(actions, start, None)
+        return (
+            (action.time_seconds, functools.partial(self._fire, action, stop_event))
+            for action in stream
+        )
+
+    def _fire(self, action: DMXAction, stop_event: threading.Event) -> None:
+        if stop_event.is_set():
+            return
+        # Only curved fades pass a curve, so outputs without curve support
+        # still play linear shows.
+        extra: Dict[str, Any] = {}
+        if action.curve != FADE_CURVE_LINEAR:
+            extra["curve"] = action.curve
+        self._target.transition_channel(
+            action.channel,
+            action.value,
+            action.fade,
+            stop_event=stop_event,
+            **extra,
+        )
+
+    def position(self) -> Optional[float]:
+        """Current show position, or ``None`` when nothing is running."""
+
+        with self._lock:
+            clock = self._clock
+        return clock.position() if clock is not None else None
+
+    def seek(self, position: float) -> bool:
+        """Move the running show, and every lane sharing its clock, to ``position``.
+
+        A timeline show is handed back to the output, which drops it once
+        its last frame has played.  Returns False when there is no show to
+        seek.
+        """
+
+        with self._lock:
+            stop_event = self._stop_event
+            clock = self._clock
+            timeline = self._timeline
+            target = self._target
+            if clock is None or stop_event is None or stop_event.is_set():
+                return False
+            if self._index is None and self._baseline is not None:
+                self._index = ShowIndex(self._actions, self._baseline)
+        self.scheduler.seek(position, clock=clock)
+        if timeline is not None:
+            target.play_timeline(timeline, stop_event, clock=clock)
+        return True
+
+    def pause(self) -> None:
+        """Freeze the show, holding fades at their current level."""
+
+        with self._lock:
+            clock = self._clock
+        if clock is None or clock.paused:
+            return
+        clock.set_paused(True)
+        # Re-seeking while paused writes the frozen levels and drops the
+        # output's running fades.
+        self.seek(clock.position())
+
+    def resume(self) -> None:
+        """Continue a paused show, restarting the fades it interrupted."""
+
+        with self._lock:
+            clock = self._clock
+        if clock is None or not clock.paused:
+            return
+        clock.set_paused(False)
+        self.seek(clock.position())
 
     def stop(self) -> None:
-        thread: Optional[threading.Thread]
         with self._lock:
-            if self._stop_event:
-                self._stop_event.set()
-            thread = self._thread
-            self._thread = None
+            stop_event = self._stop_event
             self._stop_event = None
-        if thread and thread.is_alive():
-            thread.join(timeout=1.0)
-            LOGGER.info("Stopped DMX show")
+            self._clock = None
+            self._index = None
+            self._baseline = None
+            self._program = None
+            self._timeline = None
+            self._actions = []
+            self._times = []
+        if stop_event is None:
+            return
+        stop_event.set()
+        self.scheduler.clear_lane(self.LANE)
+        LOGGER.info("Stopped DMX show")
+
+
+@dataclass
+class _HostHealth:
+    address: Tuple[str, int]
+    failures: int = 0
+    reason: Optional[str] = None
+    offline_since: Optional[float] = None
+
+
+class RelayHealth:
+    """Circuit breaker for relay hosts, shared by everything that calls them.
+
+    A host's breaker opens after ``threshold`` failures in a row.  While it
+    is open :meth:`check` returns the cached failure reason without touching
+    the network, and a probe thread opens a plain TCP connection to the host
+    every ``probe_interval`` seconds.  Probes never request the relay's
+    command URLs, so they cannot switch anything.  The first successful
+    probe or request closes the breaker again.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: int = RELAY_BREAKER_THRESHOLD,
+        probe_interval: float = RELAY_PROBE_INTERVAL,
+        probe_timeout: float = RELAY_PROBE_TIMEOUT,
+        connector: Optional[Callable[..., Any]] = None,
+    ) -> None:
+        self.threshold = max(1, int(threshold))
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._connector = connector or socket.create_connection
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostHealth] = {}
+        self._stop_event = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _split(url: str) -> Optional[Tuple[str, Tuple[str, int]]]:
+        parts = urllib.parse.urlsplit(url)
+        if not parts.hostname:
+            return None
+        try:
+            port = parts.port
+        except ValueError:
+            return None
+        if port is None:
+            port = 443 if parts.scheme == "https" else 80
+        return parts.netloc, (parts.hostname, port)
+
+    def check(self, url: str) -> Optional[str]:
+        """Return why ``url``'s host is offline, or None if it may be tried."""
+
+        split = self._split(url)
+        if split is None:
+            return None
+        with self._lock:
+            host = self._hosts.get(split[0])
+            if host is None or host.offline_since is None:
+                return None
+            return host.reason or "relay host is offline"
+
+    def record_success(self, url: str) -> None:
+        split = self._split(url)
+        if split is None:
+            return
+        with self._lock:
+            host = self._hosts.get(split[0])
+            if host is None:
+                self._hosts[split[0]] = _HostHealth(split[1])
+                return
+            was_offline = host.offline_since is not None
+            host.failures = 0
+            host.reason = None
+            host.offline_since = None
+        if was_offline:
+            LOGGER.info("Relay host %s is back online", split[0])
+
+    def record_failure(self, url: str, reason: str) -> None:
+        split = self._split(url)
+        if split is None:
+            return
+        with self._lock:
+            host = self._hosts.setdefault(split[0], _HostHealth(split[1]))
+            host.failures += 1
+            host.reason = reason
+            if host.offline_since is not None or host.failures < self.threshold:
+                return
+            host.offline_since = time.time()
+            start_probe = self._probe_thread is None and not self._stop_event.is_set()
+            if start_probe:
+                self._probe_thread = threading.Thread(
+                    target=self._probe_loop, name="relay-probe", daemon=True
+                )
+        LOGGER.warning("Relay host %s is offline (%s)", split[0], reason)
+        if start_probe:
+            assert self._probe_thread is not None
+            self._probe_thread.start()
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Breaker state of every relay host seen so far."""
+
+        with self._lock:
+            return {
+                netloc: {
+                    "online": host.offline_since is None,
+                    "failures": host.failures,
+                    "reason": host.reason,
+                    "offline_since": host.offline_since,
+                }
+                for netloc, host in self._hosts.items()
+            }
+
+    def close(self) -> None:
+        self._stop_event.set()
+
+    def _probe_loop(self) -> None:
+        while not self._stop_event.wait(self.probe_interval):
+            with self._lock:
+                offline = [
+                    (netloc, host.address)
+                    for netloc, host in self._hosts.items()
+                    if host.offline_since is not None
+                ]
+                if not offline:
+                    self._probe_thread = None
+                    return
+            for netloc, address in offline:
+                try:
+                    connection = self._connector(address, timeout=self.probe_timeout)
+                except OSError as exc:
+                    with self._lock:
+                        self._hosts[netloc].reason = _relay_failure_reason(exc)
+                    continue
+                connection.close()
+                with self._lock:
+                    host = self._hosts[netloc]
+                    host.failures = 0
+                    host.reason = None
+                    host.offline_since = None
+                LOGGER.info("Relay host %s answers probes again", netloc)
+
+
+def _relay_failure_reason(exc: BaseException) -> str:
+    text = str(exc)
+    return text if text else type(exc).__name__
+
+
+@dataclass
+class _RelayHost:
+    """Keep-alive connection, send queue and timings for one relay host."""
+
+    scheme: str
+    netloc: str
+    pending: "collections.deque[Tuple[RelayAction, Callable[[RelayAction, bool], None]]]"
+    connection: Optional[http.client.HTTPConnection] = None
+    draining: bool = False
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+    last_latency: Optional[float] = None
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    smoothed_latency: Optional[float] = None
+    jitter: float = 0.0
+
+    def observe(self, elapsed: float) -> None:
+        if self.smoothed_latency is None:
+            self.smoothed_latency = elapsed
+            self.jitter = elapsed / 2
+            return
+        error = elapsed - self.smoothed_latency
+        self.jitter += RELAY_JITTER_GAIN * (abs(error) - self.jitter)
+        self.smoothed_latency += RELAY_LATENCY_GAIN * error
+
+
+def _relay_host_key(url: str) -> Optional[Tuple[str, str]]:
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return parts.scheme, parts.netloc
+
+
+class RelayDispatcher:
+    """Sends relay requests concurrently over pooled keep-alive connections.
+
+    Requests to one host go out in order over a single persistent
+    connection, while different hosts are served in parallel by a small
+    worker pool, so an unresponsive board only delays its own cues.  The
+    round-trip time of every request is recorded per host, and successful
+    ones feed a smoothed latency estimate that :meth:`lead_time` offers for
+    sending cues early.  Requests to hosts whose :class:`RelayHealth` breaker
+    is open fail without being sent.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = RELAY_DISPATCH_WORKERS,
+        timeout: float = RELAY_REQUEST_TIMEOUT,
+        max_lead: float = RELAY_MAX_LEAD_SECONDS,
+        health: Optional[RelayHealth] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_lead = max_lead
+        self.health = health or RelayHealth()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="relay-dispatch"
+        )
+        self._lock = threading.Lock()
+        self._hosts: Dict[Tuple[str, str], _RelayHost] = {}
+
+    def submit(
+        self, action: RelayAction, on_done: Callable[[RelayAction, bool], None]
+    ) -> None:
+        """Queue ``action``; ``on_done`` gets whether the relay accepted it."""
+
+        key = _relay_host_key(action.url)
+        if key is None:
+            LOGGER.error("Unsupported relay URL %s", action.url)
+            on_done(action, False)
+            return
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                host = self._hosts[key] = _RelayHost(key[0], key[1], collections.deque())
+            host.pending.append((action, on_done))
+            if host.draining:
+                return
+            host.draining = True
+        self._executor.submit(self._drain, host)
+
+    def cancel_pending(self) -> None:
+        """Drop requests that have not been sent yet."""
+
+        with self._lock:
+            for host in self._hosts.values():
+                host.pending.clear()
+
+    def lead_time(self, url: str) -> float:
+        """Seconds a request to ``url`` should be sent ahead of its cue."""
+
+        key = _relay_host_key(url)
+        with self._lock:
+            host = self._hosts.get(key) if key is not None else None
+            if host is None or host.smoothed_latency is None:
+                return 0.0
+            return min(host.smoothed_latency, self.max_lead)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Request counts and round-trip times in milliseconds, per host."""
+
+        with self._lock:
+            stats: Dict[str, Dict[str, Any]] = {}
+            for host in self._hosts.values():
+                answered = host.sent + host.failed
+                stats[host.netloc] = {
+                    "sent": host.sent,
+                    "failed": host.failed,
+                    "skipped": host.skipped,
+                    "last_ms": None
+                    if host.last_latency is None
+                    else round(host.last_latency * 1000, 2),
+                    "avg_ms": round(host.total_latency / answered * 1000, 2)
+                    if answered
+                    else None,
+                    "max_ms": round(host.max_latency * 1000, 2),
+                    "latency_ms": None
+                    if host.smoothed_latency is None
+                    else round(host.smoothed_latency * 1000, 2),
+                    "jitter_ms": round(host.jitter * 1000, 2),
+                    "lead_ms": round(
+                        min(host.smoothed_latency or 0.0, self.max_lead) * 1000, 2
+                    ),
+                }
+            return stats
+
+    def close(self) -> None:
+        self.cancel_pending()
+        self._executor.shutdown(wait=False)
+        self.health.close()
+        with self._lock:
+            hosts = list(self._hosts.values())
+        for host in hosts:
+            if host.connection is not None:
+                host.connection.close()
+
+    def _drain(self, host: _RelayHost) -> None:
+        while True:
+            with self._lock:
+                if not host.pending:
+                    host.draining = False
+                    return
+                action, on_done = host.pending.popleft()
+            reason = self.health.check(action.url)
+            if reason is None:
+                ok = self._send(host, action)
+            else:
+                LOGGER.debug("Skipping relay URL %s: %s", action.url, reason)
+                with self._lock:
+                    host.skipped += 1
+                ok = False
+            try:
+                on_done(action, ok)
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("Relay completion callback raised an exception")
+
+    def _connect(self, host: _RelayHost) -> http.client.HTTPConnection:
+        if host.connection is None:
+            if host.scheme == "https":
+                host.connection = http.client.HTTPSConnection(host.netloc, timeout=self.timeout)
+            else:
+                host.connection = http.client.HTTPConnection(host.netloc, timeout=self.timeout)
+        return host.connection
+
+    def _send(self, host: _RelayHost, action: RelayAction) -> bool:
+        parts = urllib.parse.urlsplit(action.url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        started = time.perf_counter()
+        status: Optional[int] = None
+        error: Optional[BaseException] = None
+        # A reused connection may have been closed by the board while idle,
+        # so a failure on it is retried once on a fresh connection.
+        for attempt in range(2):
+            reused = host.connection is not None
+            connection = self._connect(host)
+            try:
+                connection.request("GET", path, headers={"Connection": "keep-alive"})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                if response.will_close:
+                    connection.close()
+                    host.connection = None
+                break
+            except (OSError, http.client.HTTPException) as exc:
+                error = exc
+                connection.close()
+                host.connection = None
+                if not reused or attempt:
+                    break
+        elapsed = time.perf_counter() - started
+
+        ok = status is not None and status < 400
+        with self._lock:
+            host.last_latency = elapsed
+            host.total_latency += elapsed
+            host.max_latency = max(host.max_latency, elapsed)
+            if ok:
+                host.sent += 1
+                # Timeouts and error answers say little about how long the
+                # board takes to act, so only accepted requests are counted.
+                host.observe(elapsed)
+            else:
+                host.failed += 1
+        if status is None:
+            self.health.record_failure(
+                action.url, _relay_failure_reason(error) if error else "no response"
+            )
+            LOGGER.error("Failed to trigger relay URL %s", action.url)
+            return False
+        # Any HTTP answer shows the board is reachable.
+        self.health.record_success(action.url)
+        if not ok:
+            LOGGER.error("Relay URL %s answered HTTP %s", action.url, status)
+        return ok
 
 
 class RelayCommandRunner:
-    def __init__(self, callback: Optional[Callable[[RelayAction], None]] = None) -> None:
+    """Fires relay actions from ``relay:<host>`` lanes of a :class:`CueScheduler`.
+
+    Each cue is handed to a :class:`RelayDispatcher` on schedule, so a slow
+    relay never delays the cues of other lanes or other relay boards.  Every
+    board gets its own lane and its cues are queued ahead of their show time
+    by the board's measured latency, so the relay switches on the beat
+    rather than one round trip after it.
+    """
+
+    LANE = "relay"
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[RelayAction], None]] = None,
+        scheduler: Optional[CueScheduler] = None,
+        dispatcher: Optional[RelayDispatcher] = None,
+    ) -> None:
+        self.scheduler = scheduler or CueScheduler("relay-cues")
+        self.dispatcher = dispatcher or RelayDispatcher()
         self._lock = threading.Lock()
-        self._thread: Optional[threading.Thread] = None
-        self._stop_event: Optional[threading.Event] = None
+        # Actions and their times for each lane, sorted by time.
+        self._lanes: Dict[str, Tuple[List[RelayAction], List[float]]] = {}
+        self._generation = 0
         self._callback: Optional[Callable[[RelayAction], None]] = callback
 
     def set_callback(self, callback: Optional[Callable[[RelayAction], None]]) -> None:
         with self._lock:
             self._callback = callback
 
-    def start(self, actions: Iterable[RelayAction]) -> None:
+    def start(
+        self, actions: Iterable[RelayAction], *, clock: Optional[ShowClock] = None
+    ) -> None:
+        if clock is None:
+            clock = ShowClock()
         ordered = sorted(actions, key=lambda action: action.time_seconds)
+        self.stop()
         if not ordered:
-            self.stop()
             return
 
-        self.stop()
-
-        stop_event = threading.Event()
-        thread = threading.Thread(
-            target=self._run,
-            args=(ordered, stop_event),
-            daemon=True,
-        )
+        lanes: Dict[str, Tuple[List[RelayAction], List[float]]] = {}
+        for action in ordered:
+            lane = f"{self.LANE}:{urllib.parse.urlsplit(action.url).netloc}"
+            lane_actions, lane_times = lanes.setdefault(lane, ([], []))
+            lane_actions.append(action)
+            lane_times.append(action.time_seconds)
+        with self._lock:
+            self._lanes = lanes
+        for lane in lanes:
+            self.scheduler.set_lane(
+                lane, functools.partial(self._cues_from, lane), clock=clock
+            )
 
+    def stop(self) -> None:
         with self._lock:
-            self._stop_event = stop_event
-            self._thread = thread
+            self._generation += 1
+            lanes = list(self._lanes)
+            self._lanes = {}
+        for lane in lanes:
+            self.scheduler.clear_lane(lane)
+        self.dispatcher.cancel_pending()
 
-        thread.start()
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.dispatcher.get_stats()
 
-    def stop(self) -> None:
+    def _cues_from(self, lane: str, position: float) -> Iterator[Cue]:
         with self._lock:
-            stop_event = self._stop_event
-            thread = self._thread
-            self._stop_event = None
-            self._thread = None
+            actions, times = self._lanes.get(lane, ([], []))
+            generation = self._generation
+        # Actions whose lead reaches back past ``position`` are due at once.
+        start = bisect.bisect_left(times, position - CUE_START_TOLERANCE)
+        return (
+            (
+                action.time_seconds - self.dispatcher.lead_time(action.url),
+                functools.partial(self._dispatch, generation, action),
+            )
+            for action in itertools.islice(actions, start, None)
+        )
+
+    def _dispatch(self, generation: int, action: RelayAction) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+        self.dispatcher.submit(action, self._sent)
 
-        if stop_event:
-            stop_event.set()
-        if thread and thread.is_alive():
-            thread.join(timeout=1.0)
+    def _sent(self, action: RelayAction, ok: bool) -> None:
+        if ok:
+            self._notify(action)
 
     def _notify(self, action: RelayAction) -> None:
         callback: Optional[Callable[[RelayAction], None]]
@@ -819,35 +3599,6 @@ class RelayCommandRunner:
         except Exception:  # pragma: no cover - defensive logging
             LOGGER.exception("Relay callback raised an exception")
 
-    def _run(self, actions: List[RelayAction], stop_event: threading.Event) -> None:
-        start_time = time.monotonic()
-        for action in actions:
-            if stop_event.is_set():
-                break
-            elapsed = time.monotonic() - start_time
-            wait_time = action.time_seconds - elapsed
-            if wait_time > 0 and stop_event.wait(wait_time):
-                return
-            if stop_event.is_set():
-                break
-            if self._trigger_action(action):
-                self._notify(action)
-
-    @staticmethod
-    def _trigger_action(action: RelayAction) -> bool:
-        request = urllib.request.Request(action.url)
-        try:
-            with urllib.request.urlopen(request, timeout=3.0) as response:
-                # Consume a small portion of the response to ensure the request is sent.
-                response.read(1)
-        except urllib.error.URLError:
-            LOGGER.error("Failed to trigger relay URL %s", action.url)
-            return False
-        except Exception:  # pragma: no cover - defensive logging for unexpected errors
-            LOGGER.exception("Error while triggering relay URL %s", action.url)
-            return False
-        return True
-
 
 class DMXShowManager:
     """Handles loading, saving, and running DMX shows for videos."""
@@ -861,14 +3612,26 @@ class DMXShowManager:
         self.templates_dir = templates_dir
         self.templates_dir.mkdir(parents=True, exist_ok=True)
         self.output = output
-        self.runner = DMXShowRunner(output)
+        # One scheduler times the DMX cues, relay requests and smoke resets.
+        self.scheduler = CueScheduler()
+        self.runner = DMXShowRunner(output, scheduler=self.scheduler)
         self._relay_action_callback: Optional[Callable[[RelayAction], None]] = None
-        self.relay_runner = RelayCommandRunner(callback=self._relay_runner_triggered)
+        # Relay hosts' breakers are shared with other relay clients such as
+        # the snow machine controller.
+        self.relay_health = RelayHealth()
+        self.relay_runner = RelayCommandRunner(
+            callback=self._relay_runner_triggered,
+            scheduler=self.scheduler,
+            dispatcher=RelayDispatcher(health=self.relay_health),
+        )
         self._lock = threading.Lock()
         self._has_active_show = False
         self._baseline_levels: List[int] = [0] * self.output.channel_count
         self._fade_lock = threading.Lock()
-        self._active_fade: Optional[threading.Event] = None
+        # When the running fade_all_to_value fade reaches its target.
+        self._fade_deadline = 0.0
+        # Grand master level to restore once a blackout has been faded in.
+        self._grand_master_before_fade: Optional[float] = None
         if smoke_channel and (smoke_channel < 1 or smoke_channel > self.output.channel_count):
             LOGGER.warning(
                 "Configured smoke channel %s is outside of available range. Smoke trigger disabled.",
@@ -878,8 +3641,38 @@ class DMXShowManager:
         else:
             self._smoke_channel = smoke_channel
         self._smoke_lock = threading.Lock()
-        self._smoke_reset_timer: Optional[threading.Timer] = None
+        self._smoke_reset_timer: Optional[int] = None
         self._smoke_active = False
+        # Compiled templates keyed by resolved path.  Each entry remembers the
+        # stat signature of the template and its journal so edits made outside
+        # this manager are picked up on the next load.
+        self._show_cache: Dict[Path, Tuple[Tuple[int, ...], CompiledShow]] = {}
+        self._show_cache_lock = threading.Lock()
+        self._timeline_cache: Dict[Path, Tuple[str, FrameTimeline]] = {}
+        # Every timeline opened from disk, for as long as anything (the cache
+        # or a playback) still holds it.  Their files are not pruned.
+        self._mapped_timelines: "weakref.WeakSet[FrameTimeline]" = weakref.WeakSet()
+        self._documents: Dict[Path, TemplateDocument] = {}
+        # Clock of the running show when it follows video playback.
+        self._playback_clock: Optional[ShowClock] = None
+        # Index of the builder preview, keyed by a digest of its payload.
+        self._preview_index: Optional[Tuple[str, ShowIndex]] = None
+        self._documents_lock = threading.RLock()
+        self._compaction_timers: Dict[Path, threading.Timer] = {}
+
+    def _channel_patch(self) -> Optional[ChannelPatch]:
+        return getattr(self.output, "patch", None)
+
+    def _output_layer(self, name: str) -> Any:
+        layer = getattr(self.output, "layer", None)
+        return layer(name) if layer else self.output
+
+    def _release_layers(self, *names: str) -> None:
+        release = getattr(self.output, "release", None)
+        if release is None:
+            return
+        for name in names:
+            release(name)
 
     def has_active_show(self) -> bool:
         """Return True if a DMX show with actions is currently running."""
@@ -894,6 +3687,8 @@ class DMXShowManager:
         if len(values) != self.output.channel_count:
             raise ValueError("Baseline levels must match DMX channel count")
         self._baseline_levels = [_clamp(value, 0, 255) for value in values]
+        with self._show_cache_lock:
+            self._timeline_cache.clear()
 
     def _relay_runner_triggered(self, action: RelayAction) -> None:
         callback = self._relay_action_callback
@@ -912,6 +3707,12 @@ class DMXShowManager:
             else:
                 self.relay_runner.set_callback(None)
 
+    def get_relay_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Request counts and latency estimates of the relay boards, per host."""
+
+        get_stats = getattr(self.relay_runner, "get_stats", None)
+        return get_stats() if get_stats else {}
+
     def is_smoke_available(self) -> bool:
         return self._smoke_channel is not None
 
@@ -925,32 +3726,40 @@ class DMXShowManager:
         clamped_level = _clamp(int(level), 0, 255)
         duration_value = max(0.0, float(duration))
         with self._smoke_lock:
-            if self._smoke_reset_timer:
-                self._smoke_reset_timer.cancel()
+            if self._smoke_reset_timer is not None:
+                self.scheduler.cancel(self._smoke_reset_timer)
                 self._smoke_reset_timer = None
-            self.output.set_channel(self._smoke_channel, clamped_level)
+            # Smoke has its own mixer layer, so a burst neither cancels nor
+            # is overwritten by the show's cues on the same channel.
+            smoke = self._output_layer(MIXER_SMOKE)
+            smoke.set_channel(self._smoke_channel, clamped_level)
             if clamped_level <= 0 or duration_value <= 0:
-                self.output.set_channel(self._smoke_channel, 0)
-                self._smoke_active = False
+                self._end_smoke_locked()
                 return 0.0
             self._smoke_active = True
 
-            timer: Optional[threading.Timer] = None
+            handle: Optional[int] = None
 
             def _reset() -> None:
                 with self._smoke_lock:
-                    if self._smoke_reset_timer is not timer:
+                    if self._smoke_reset_timer != handle:
                         return
-                    self.output.set_channel(self._smoke_channel, 0)
-                    self._smoke_active = False
+                    self._end_smoke_locked()
                     self._smoke_reset_timer = None
 
-            timer = threading.Timer(duration_value, _reset)
-            timer.daemon = True
-            self._smoke_reset_timer = timer
-            timer.start()
+            handle = self.scheduler.call_later(duration_value, _reset)
+            self._smoke_reset_timer = handle
         return duration_value
 
+    def _end_smoke_locked(self) -> None:
+        smoke = self._output_layer(MIXER_SMOKE)
+        if hasattr(smoke, "release"):
+            # The show's level for the channel takes over again.
+            smoke.release([self._smoke_channel])
+        else:
+            smoke.set_channel(self._smoke_channel, 0)
+        self._smoke_active = False
+
     def template_path_for_video(self, video_entry: Dict[str, object]) -> Path:
         template_value = video_entry.get("dmx_template")
         if template_value:
@@ -966,17 +3775,21 @@ class DMXShowManager:
     def _expand_actions_with_loops(
         self, raw_actions: Iterable[Dict[str, object]]
     ) -> List[DMXAction]:
-        parsed_entries: List[Dict[str, Any]] = []
-        instances: Dict[str, Dict[str, Any]] = {}
-        channel_times: Dict[int, List[Dict[str, Any]]] = {}
+        return self._compile_loops(raw_actions).materialize()
+
+    def _compile_loops(self, raw_actions: Iterable[Dict[str, object]]) -> ShowProgram:
+        patch = self._channel_patch()
+        parsed_entries: List[_ParsedAction] = []
+        instance_entries: Dict[str, List[_ParsedAction]] = {}
+        instance_loops: Dict[str, TemplateLoopSettings] = {}
+        channel_entries: Dict[int, List[_ParsedAction]] = {}
 
         for raw in raw_actions:
             if not isinstance(raw, dict):
                 raise ValueError("DMX actions must be objects with time, channel, and value")
-            action = DMXAction.from_dict(raw)
+            action = DMXAction.from_dict(raw, patch=patch)
             instance_raw = raw.get("templateInstanceId")
             instance_id = instance_raw if isinstance(instance_raw, str) and instance_raw else None
-            loop_settings = _normalize_template_loop_settings(raw.get("templateLoop"))
             channel_master_raw = raw.get("channelMasterId")
             if isinstance(channel_master_raw, str):
                 channel_master_id = channel_master_raw.strip() or None
@@ -989,49 +3802,40 @@ class DMXShowManager:
             else:
                 template_row_id = None
 
-            entry = {
-                "action": action,
-                "instance_id": instance_id,
-                "loop": loop_settings,
-                "channel_master_id": channel_master_id,
-                "template_row_id": template_row_id,
-            }
+            entry = _ParsedAction(action, channel_master_id, template_row_id)
             parsed_entries.append(entry)
-            channel_times.setdefault(action.channel, []).append(
-                {
-                    "time": action.time_seconds,
-                    "instance_id": instance_id,
-                    "entry": entry,
-                }
-            )
+            channel_entries.setdefault(action.channel, []).append(entry)
             if instance_id:
-                info = instances.setdefault(instance_id, {"entries": [], "loop": None})
-                info["entries"].append(entry)
+                instance_entries.setdefault(instance_id, []).append(entry)
+                loop_settings = _normalize_template_loop_settings(raw.get("templateLoop"))
                 if loop_settings and loop_settings.is_active():
-                    info["loop"] = loop_settings
+                    instance_loops[instance_id] = loop_settings
 
-        for times in channel_times.values():
-            times.sort(key=lambda item: item["time"])
+        # Per-channel actions in time order with a parallel list of times, so
+        # the next action after a loop starts is found by bisection.
+        channel_times: Dict[int, List[float]] = {}
+        for channel, entries in channel_entries.items():
+            entries.sort(key=lambda item: item.action.time_seconds)
+            channel_times[channel] = [item.action.time_seconds for item in entries]
 
-        expanded: List[DMXAction] = [entry["action"] for entry in parsed_entries]
+        segments: List[LoopSegment] = []
         epsilon = 1e-6
 
-        for instance_id, info in instances.items():
-            loop_settings = info.get("loop")
-            entries = info.get("entries", [])
-            if not loop_settings or not loop_settings.is_active() or not entries:
+        for instance_id, loop_settings in instance_loops.items():
+            entries = instance_entries.get(instance_id, [])
+            if not entries:
                 continue
 
             duration = loop_settings.duration
             if duration <= 0:
                 continue
 
-            ordered_entries = sorted(entries, key=lambda item: item["action"].time_seconds)
-            base_start = ordered_entries[0]["action"].time_seconds
+            ordered_entries = sorted(entries, key=lambda item: item.action.time_seconds)
+            base_start = ordered_entries[0].action.time_seconds
 
             channels = list(loop_settings.channels)
             if not channels:
-                channels = sorted({item["action"].channel for item in ordered_entries})
+                channels = sorted({item.action.channel for item in ordered_entries})
             if not channels:
                 continue
 
@@ -1040,23 +3844,21 @@ class DMXShowManager:
             allowed_row_ids: Set[str] = set()
 
             for item in ordered_entries:
-                if item["action"].channel in channel_set:
-                    master_id = item.get("channel_master_id")
-                    if master_id:
-                        allowed_master_ids.add(master_id)
-                    row_id = item.get("template_row_id")
-                    if row_id:
-                        allowed_row_ids.add(row_id)
+                if item.action.channel in channel_set:
+                    if item.channel_master_id:
+                        allowed_master_ids.add(item.channel_master_id)
+                    if item.template_row_id:
+                        allowed_row_ids.add(item.template_row_id)
 
             if allowed_master_ids or allowed_row_ids:
                 for item in ordered_entries:
-                    master_id = item.get("channel_master_id")
-                    row_id = item.get("template_row_id")
+                    master_id = item.channel_master_id
+                    row_id = item.template_row_id
                     if (
                         (master_id and master_id in allowed_master_ids)
                         or (row_id and row_id in allowed_row_ids)
                     ):
-                        channel_set.add(item["action"].channel)
+                        channel_set.add(item.action.channel)
 
             channels = sorted(channel_set)
             if not channels:
@@ -1065,11 +3867,11 @@ class DMXShowManager:
             channel_set = set(channels)
 
             relative_offsets: List[tuple[float, DMXAction]] = []
-            loop_entry_ids: set[int] = set()
+            loop_entries: Set[int] = set()
             loop_window = max(duration - epsilon, 0.0)
 
             for entry in ordered_entries:
-                action = entry["action"]
+                action = entry.action
                 if action.channel not in channel_set:
                     continue
                 offset = action.time_seconds - base_start
@@ -1078,7 +3880,7 @@ class DMXShowManager:
                 if offset > loop_window + epsilon:
                     continue
                 relative_offsets.append((offset, action))
-                loop_entry_ids.add(id(entry))
+                loop_entries.add(id(entry))
 
             if not relative_offsets:
                 continue
@@ -1096,17 +3898,22 @@ class DMXShowManager:
             else:
                 reverse_offsets = None
 
+            # The loop is cut by the first action after its start on any of
+            # its channels that is not one of the repeated actions.
             conflict_time: Optional[float] = None
             for channel in channels:
-                for entry_info in channel_times.get(channel, []):
-                    time_value = entry_info["time"]
-                    if time_value <= base_start + epsilon:
-                        continue
-                    if id(entry_info["entry"]) in loop_entry_ids:
-                        continue
-                    if conflict_time is None or time_value < conflict_time:
-                        conflict_time = time_value
-                    break
+                times = channel_times.get(channel)
+                if not times:
+                    continue
+                candidates = channel_entries[channel]
+                position = bisect.bisect_right(times, base_start + epsilon)
+                while position < len(times):
+                    if conflict_time is not None and times[position] >= conflict_time:
+                        break
+                    if id(candidates[position]) not in loop_entries:
+                        conflict_time = times[position]
+                        break
+                    position += 1
 
             available_iterations: Optional[int]
             if conflict_time is not None:
@@ -1117,22 +3924,21 @@ class DMXShowManager:
             else:
                 available_iterations = None
 
+            # Iteration counts include the instance as written, so a loop
+            # repeats one time fewer than its count.
+            fallback_iterations = 0
             if loop_settings.infinite:
                 if available_iterations is None:
                     fallback_iterations = max(loop_settings.count, 2)
-                    if (
-                        TEMPLATE_LOOP_INFINITE_DURATION_SECONDS > 0
-                        and duration > 0
-                    ):
+                    if TEMPLATE_LOOP_INFINITE_DURATION_SECONDS > 0:
                         target_iterations = int(
-                            math.ceil(
-                                TEMPLATE_LOOP_INFINITE_DURATION_SECONDS / duration
-                            )
+                            math.ceil(TEMPLATE_LOOP_INFINITE_DURATION_SECONDS / duration)
                         )
                         fallback_iterations = max(fallback_iterations, target_iterations)
-                    total_iterations = min(
+                    fallback_iterations = min(
                         fallback_iterations, TEMPLATE_LOOP_MAX_ITERATIONS
                     )
+                    total_iterations: Optional[int] = None
                 else:
                     total_iterations = available_iterations
             else:
@@ -1142,38 +3948,25 @@ class DMXShowManager:
                 else:
                     total_iterations = min(requested, available_iterations)
 
-            if total_iterations <= 1:
+            if total_iterations is not None and total_iterations <= 1:
                 continue
 
-            for iteration in range(1, total_iterations):
-                iteration_start = base_start + duration * iteration
-                if conflict_time is not None and iteration_start >= conflict_time - epsilon:
-                    break
-                stop_iteration = False
-                if loop_settings.mode == "pingpong" and iteration % 2 == 1:
-                    offsets_iterable = reverse_offsets or forward_offsets
-                else:
-                    offsets_iterable = forward_offsets
-
-                for offset, base_action in offsets_iterable:
-                    new_time = iteration_start + offset
-                    if conflict_time is not None and new_time >= conflict_time - epsilon:
-                        stop_iteration = True
-                        break
-                    duplicate = DMXAction(
-                        time_seconds=new_time,
-                        channel=base_action.channel,
-                        value=base_action.value,
-                        fade=base_action.fade,
-                    )
-                    expanded.append(duplicate)
-                if stop_iteration:
-                    break
+            segments.append(
+                LoopSegment(
+                    base_start=base_start,
+                    period=duration,
+                    offsets=forward_offsets,
+                    reverse_offsets=reverse_offsets,
+                    iterations=None if total_iterations is None else total_iterations - 1,
+                    cutoff=conflict_time,
+                    fallback_iterations=max(1, fallback_iterations - 1),
+                )
+            )
 
-        expanded.sort(key=lambda action: action.time_seconds)
-        return expanded
+        return ShowProgram([entry.action for entry in parsed_entries], segments)
 
-    def _load_template_payload(self, template_path: Path) -> Dict[str, Any]:
+    @staticmethod
+    def _read_template_file(template_path: Path) -> Dict[str, Any]:
         if not template_path.exists():
             raise FileNotFoundError(str(template_path))
         with template_path.open("r", encoding="utf-8") as fh:
@@ -1184,6 +3977,73 @@ class DMXShowManager:
             return {"actions": payload}
         raise ValueError("Template file must contain a JSON object or list of actions")
 
+    @staticmethod
+    def journal_path_for_template(template_path: Path) -> Path:
+        return template_path.with_name(template_path.name + TEMPLATE_JOURNAL_SUFFIX)
+
+    def _read_template_document(self, template_path: Path) -> TemplateDocument:
+        document = TemplateDocument.from_payload(self._read_template_file(template_path))
+        journal_path = self.journal_path_for_template(template_path)
+        try:
+            with journal_path.open("r", encoding="utf-8") as fh:
+                lines = fh.readlines()
+        except FileNotFoundError:
+            return document
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+                revision = int(record["revision"])
+            except (ValueError, KeyError, TypeError):
+                # A torn final line from an interrupted append; everything
+                # before it is intact.
+                LOGGER.warning("Ignoring unreadable entry in DMX journal %s", journal_path)
+                break
+            if revision <= document.revision:
+                continue
+            if revision != document.revision + 1:
+                LOGGER.warning(
+                    "DMX journal %s skips from revision %s to %s; ignoring the rest",
+                    journal_path,
+                    document.revision,
+                    revision,
+                )
+                break
+            document.apply(record.get("ops", []))
+            if "relay_actions" in record:
+                document.relay_actions = record["relay_actions"]
+            document.revision = revision
+            document.journal_entries += 1
+        return document
+
+    def _template_document(self, template_path: Path) -> TemplateDocument:
+        """Return the cached document for a template, re-reading it if changed.
+
+        Must be called with ``_documents_lock`` held.
+        """
+
+        key = template_path.resolve()
+        signature = self._template_signature(key)
+        document = self._documents.get(key)
+        if document is not None and document.signature == signature:
+            return document
+        document = self._read_template_document(key)
+        document.signature = signature
+        self._documents[key] = document
+        return document
+
+    def load_template_document(self, template_path: Path) -> Dict[str, Any]:
+        """Return the current template contents, including action ids and revision.
+
+        Raises ``FileNotFoundError`` when the template does not exist.
+        """
+
+        with self._documents_lock:
+            return self._template_document(template_path).payload()
+
+    def _load_template_payload(self, template_path: Path) -> Dict[str, Any]:
+        return self.load_template_document(template_path)
+
     def _parse_relay_actions(self, raw_actions: Iterable[Dict[str, object]]) -> List[RelayAction]:
         actions: List[RelayAction] = []
         for raw in raw_actions:
@@ -1194,67 +4054,200 @@ class DMXShowManager:
         actions.sort(key=lambda item: item.time_seconds)
         return actions
 
-    def load_actions(self, template_path: Path) -> List[DMXAction]:
+    @classmethod
+    def _template_signature(cls, template_path: Path) -> Tuple[int, ...]:
+        stat = template_path.stat()
         try:
-            payload = self._load_template_payload(template_path)
+            journal = cls.journal_path_for_template(template_path).stat()
         except FileNotFoundError:
-            return []
+            return stat.st_mtime_ns, stat.st_size
+        return stat.st_mtime_ns, stat.st_size, journal.st_mtime_ns, journal.st_size
+
+    def _compile_template(self, template_path: Path) -> CompiledShow:
+        payload = self._load_template_payload(template_path)
         actions_data = payload.get("actions", [])
         if not isinstance(actions_data, list):
             raise ValueError("Template actions must be provided as a list")
-        return self._expand_actions_with_loops(actions_data)
+        relay_raw = payload.get("relay_actions", [])
+        if relay_raw in (None, ""):
+            relay_raw = []
+        if relay_raw and not isinstance(relay_raw, list):
+            raise ValueError("Relay actions must be provided as a list")
+        program = self._compile_loops(actions_data)
+        relay_actions = []
+        if relay_raw:
+            try:
+                relay_actions = self._parse_relay_actions(relay_raw)
+            except ValueError as exc:
+                raise RuntimeError(f"Invalid relay action: {exc}") from exc
+        return CompiledShow(program=program, relay_actions=relay_actions)
 
-    def load_relay_actions(self, template_path: Path) -> List[RelayAction]:
+    def get_compiled_show(self, template_path: Path) -> CompiledShow:
+        """Return the compiled show for a template, reusing a cached build.
+
+        Raises ``FileNotFoundError`` when the template does not exist and
+        ``ValueError`` (or ``json.JSONDecodeError``) when it cannot be parsed.
+        """
+
+        key = template_path.resolve()
+        try:
+            signature = self._template_signature(key)
+        except FileNotFoundError:
+            self.invalidate_compiled_show(key)
+            raise
+        with self._show_cache_lock:
+            cached = self._show_cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        compiled = self._compile_template(key)
+        with self._show_cache_lock:
+            self._show_cache[key] = (signature, compiled)
+        return compiled
+
+    def invalidate_compiled_show(self, template_path: Path) -> None:
+        key_path = template_path.resolve()
+        with self._show_cache_lock:
+            self._show_cache.pop(key_path, None)
+            self._timeline_cache.pop(key_path, None)
+
+    def warm_show_cache(self, video_entries: Iterable[Dict[str, object]]) -> None:
+        """Compile the templates for the given videos ahead of playback."""
+
+        for entry in video_entries:
+            path = self.template_path_for_video(entry)
+            try:
+                self.get_compiled_show(path)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                LOGGER.exception("Unable to precompile DMX template %s", path)
+                continue
+            self.get_show_timeline(path)
+
+    def _timeline_key(self, template_path: Path) -> str:
+        signature = self._template_signature(template_path)
+        digest = hashlib.sha1()
+        for part in signature:
+            digest.update(f"{part}:".encode("ascii"))
+        digest.update(f"{DMX_FPS}:".encode("ascii"))
+        digest.update(bytes(self._baseline_levels))
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    def timeline_path_for_template(template_path: Path, key: str) -> Path:
+        return template_path.with_name(f"{template_path.stem}.{key}{TIMELINE_SUFFIX}")
+
+    def get_show_timeline(self, template_path: Path) -> Optional[FrameTimeline]:
+        """Return the pre-rendered frame timeline for a template.
+
+        Timelines are written next to the template and memory-mapped.  The file
+        name embeds a key derived from the template signature, frame rate and
+        baseline levels so stale renders are never reused.  ``None`` is returned
+        when the template is missing or cannot be compiled.
+        """
+
+        key_path = template_path.resolve()
+        try:
+            compiled = self.get_compiled_show(key_path)
+            key = self._timeline_key(key_path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            LOGGER.exception("Unable to compile DMX template %s", key_path)
+            return None
+        if not compiled.program.actions or compiled.program.infinite:
+            # Endless loops cannot be rendered; they are streamed instead.
+            return None
+
+        with self._show_cache_lock:
+            cached = self._timeline_cache.get(key_path)
+            if cached and cached[0] == key:
+                return cached[1]
+            # A stale render is only kept alive (and on disk) by playbacks.
+            self._timeline_cache.pop(key_path, None)
+        cached = None
+
+        timeline_path = self.timeline_path_for_template(key_path, key)
+        timeline: Optional[FrameTimeline] = None
+        if timeline_path.exists():
+            try:
+                timeline = open_frame_timeline(timeline_path)
+                self._mapped_timelines.add(timeline)
+            except (OSError, ValueError):
+                LOGGER.warning("Discarding unreadable DMX timeline %s", timeline_path)
+        if timeline is None or timeline.channel_count != self.output.channel_count:
+            baked = bake_frame_timeline(compiled.materialize(), self._baseline_levels)
+            try:
+                write_frame_timeline(baked, timeline_path)
+                timeline = open_frame_timeline(timeline_path)
+                self._mapped_timelines.add(timeline)
+            except (OSError, ValueError):
+                LOGGER.warning(
+                    "Unable to store DMX timeline %s; keeping it in memory", timeline_path
+                )
+                timeline = baked
+            self._prune_timelines(key_path, keep=timeline_path)
+
+        # The timeline this replaces may still be playing, so it is not
+        # closed here; its mapping is released with the last reference.
+        with self._show_cache_lock:
+            self._timeline_cache[key_path] = (key, timeline)
+        return timeline
+
+    def _prune_timelines(self, template_path: Path, *, keep: Path) -> None:
+        pattern = f"{template_path.stem}.*{TIMELINE_SUFFIX}"
+        # Files still mapped by a live timeline are left for a later prune.
+        in_use = {timeline.path for timeline in list(self._mapped_timelines)}
+        for candidate in template_path.parent.glob(pattern):
+            if candidate == keep or candidate in in_use:
+                continue
+            try:
+                candidate.unlink()
+            except OSError:
+                LOGGER.debug("Unable to remove stale DMX timeline %s", candidate)
+
+    def _timeline_for_video(self, video_entry: Dict[str, object]) -> Optional[FrameTimeline]:
+        return self.get_show_timeline(self.template_path_for_video(video_entry))
+
+    def load_actions(self, template_path: Path) -> List[DMXAction]:
         try:
-            payload = self._load_template_payload(template_path)
+            compiled = self.get_compiled_show(template_path)
         except FileNotFoundError:
             return []
-        raw_actions = payload.get("relay_actions", [])
-        if raw_actions in (None, ""):
+        return compiled.materialize()
+
+    def load_relay_actions(self, template_path: Path) -> List[RelayAction]:
+        try:
+            compiled = self.get_compiled_show(template_path)
+        except FileNotFoundError:
             return []
-        if not isinstance(raw_actions, list):
-            raise ValueError("Relay actions must be provided as a list")
-        return self._parse_relay_actions(raw_actions)
+        return list(compiled.relay_actions)
 
     def load_show_for_video(self, video_entry: Dict[str, object]) -> List[DMXAction]:
-        actions, _ = self._load_show_components(video_entry)
-        return actions
+        compiled = self._compiled_show_for_video(video_entry)
+        return compiled.materialize() if compiled is not None else []
 
     def load_relay_actions_for_video(self, video_entry: Dict[str, object]) -> List[RelayAction]:
-        _, relay_actions = self._load_show_components(video_entry)
-        return relay_actions
+        compiled = self._compiled_show_for_video(video_entry)
+        return list(compiled.relay_actions) if compiled is not None else []
 
-    def _load_show_components(
+    def _compiled_show_for_video(
         self, video_entry: Dict[str, object]
-    ) -> Tuple[List[DMXAction], List[RelayAction]]:
+    ) -> Optional[CompiledShow]:
         path = self.template_path_for_video(video_entry)
         try:
-            payload = self._load_template_payload(path)
+            return self.get_compiled_show(path)
         except FileNotFoundError:
-            return [], []
+            return None
+        except RuntimeError:
+            # Already describes the template error, e.g. an invalid relay action.
+            LOGGER.exception("Unable to load DMX template %s", path)
+            raise
         except Exception as exc:
             LOGGER.exception("Unable to load DMX template %s", path)
             raise RuntimeError(f"Invalid DMX template: {exc}") from exc
 
-        actions_data = payload.get("actions", [])
-        if not isinstance(actions_data, list):
-            raise RuntimeError("Invalid DMX template: 'actions' must be a list")
-
-        relay_raw = payload.get("relay_actions", [])
-        if relay_raw in (None, ""):
-            relay_raw = []
-        if relay_raw and not isinstance(relay_raw, list):
-            raise RuntimeError("Invalid DMX template: 'relay_actions' must be a list")
-
-        actions = self._expand_actions_with_loops(actions_data)
-        relay_actions = []
-        if relay_raw:
-            try:
-                relay_actions = self._parse_relay_actions(relay_raw)
-            except ValueError as exc:
-                raise RuntimeError(f"Invalid relay action: {exc}") from exc
-        return actions, relay_actions
-
     @staticmethod
     def _normalize_identifier(raw: object) -> str:
         if not isinstance(raw, str):
@@ -1275,20 +4268,59 @@ class DMXShowManager:
 
     def _wait_for_active_fade(self) -> None:
         with self._fade_lock:
-            fade_event = self._active_fade
-        if fade_event:
-            fade_event.wait()
+            remaining = self._fade_deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _restore_grand_master(self) -> None:
+        with self._fade_lock:
+            level = self._grand_master_before_fade
+            self._grand_master_before_fade = None
+        if level is not None:
+            self.output.set_master(level)
+
+    def set_master_groups(self, groups: Dict[str, Iterable[int]]) -> None:
+        """Define the fixture groups whose submasters :meth:`set_master` controls."""
+
+        set_groups = getattr(self.output, "set_master_groups", None)
+        if set_groups is not None:
+            set_groups(groups)
+
+    def set_master(
+        self, level: float, duration: float = 0.0, *, group: Optional[str] = None
+    ) -> None:
+        """Set the grand master, or a group submaster, to ``level`` (0-1)."""
+
+        with self._fade_lock:
+            if group is None:
+                # An explicit level replaces the one a blackout would restore.
+                self._grand_master_before_fade = None
+        self.output.set_master(level, duration, group=group)
+
+    def get_masters(self) -> Dict[str, Any]:
+        get_masters = getattr(self.output, "get_masters", None)
+        return get_masters() if get_masters is not None else {"grand": 1.0, "groups": {}}
 
     def fade_all_to_value(self, value: int, duration: float) -> None:
-        """Fade all DMX channels to the given value over the specified duration."""
+        """Fade all DMX channels to the given value over the specified duration.
+
+        Fading to zero pulls down the grand master and leaves the running
+        show alone; the master returns to its level when the next show or
+        preview starts.  Other values are faded in the output's master
+        layer, which overrides every other layer until then.
+        """
 
         clamped_value = _clamp(int(value), 0, 255)
         duration_value = max(0.0, float(duration))
 
-        with self._fade_lock:
-            active = self._active_fade
-        if active:
-            active.wait()
+        set_master = getattr(self.output, "set_master", None)
+        if clamped_value == 0 and set_master is not None:
+            with self._fade_lock:
+                if self._grand_master_before_fade is None:
+                    self._grand_master_before_fade = self.output.get_masters()["grand"]
+                self._fade_deadline = time.monotonic() + duration_value
+            set_master(0.0, duration_value)
+            return
 
         self.runner.stop()
         with self._lock:
@@ -1298,46 +4330,50 @@ class DMXShowManager:
         if all(level == clamped_value for level in current_levels):
             return
 
+        master = self._output_layer(MIXER_MASTER)
+        target_levels = [clamped_value] * self.output.channel_count
         if duration_value <= 0:
-            self.output.set_levels([clamped_value] * self.output.channel_count)
+            master.set_levels(target_levels)
             return
 
-        fade_event = threading.Event()
-
-        def _worker() -> None:
-            try:
-                steps = max(int(duration_value * DMX_FPS), 1)
-                step_duration = duration_value / steps
-                for step in range(1, steps + 1):
-                    ratio = step / steps
-                    levels = [
-                        round(start + (clamped_value - start) * ratio)
-                        for start in current_levels
-                    ]
-                    self.output.set_levels(levels)
-                    if step < steps:
-                        time.sleep(step_duration)
-            finally:
-                fade_event.set()
-                with self._fade_lock:
-                    if self._active_fade is fade_event:
-                        self._active_fade = None
-
+        # The output's sender thread interpolates the fade, so this only
+        # records when it will be done.
+        master.transition_levels(target_levels, duration_value)
         with self._fade_lock:
-            self._active_fade = fade_event
+            self._fade_deadline = time.monotonic() + duration_value
 
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
+    def start_show_for_video(
+        self, video_entry: Dict[str, object], *, follow_playback: bool = False
+    ) -> None:
+        """Start the show for a video.
+
+        With ``follow_playback`` the show clock is steered by
+        :meth:`sync_show_clock` so cues track the video's own timeline.
+        """
 
-    def start_show_for_video(self, video_entry: Dict[str, object]) -> None:
+        # Endless shows are streamed from their program, so they are never
+        # expanded into a list of actions.
+        program = self._endless_program(self.template_path_for_video(video_entry))
         try:
-            actions = self.load_show_for_video(video_entry)
+            if program is None:
+                actions = self.load_show_for_video(video_entry)
             relay_actions = self.load_relay_actions_for_video(video_entry)
         except RuntimeError:
             LOGGER.error("Skipping DMX show due to template error")
             return
 
         custom_actions = self._custom_show_actions(video_entry)
+        if program is not None:
+            self._run_actions(
+                program.actions + custom_actions,
+                context=video_entry.get("name"),
+                relay_actions=relay_actions,
+                program=program.with_actions(custom_actions),
+                follow_playback=follow_playback,
+            )
+            return
+
+        timeline: Optional[FrameTimeline] = None
         if custom_actions:
             LOGGER.info(
                 "Applying %s custom DMX actions for video '%s'",
@@ -1345,17 +4381,55 @@ class DMXShowManager:
                 video_entry.get("name", video_entry.get("id")),
             )
             actions = actions + custom_actions
-        self._run_actions(actions, context=video_entry.get("name"), relay_actions=relay_actions)
+        elif actions:
+            timeline = self._timeline_for_video(video_entry)
+        self._run_actions(
+            actions,
+            context=video_entry.get("name"),
+            relay_actions=relay_actions,
+            timeline=timeline,
+            follow_playback=follow_playback,
+        )
+
+    def _endless_program(self, template_path: Path) -> Optional[ShowProgram]:
+        """Return the template's program when it loops forever, else ``None``."""
+
+        try:
+            program = self.get_compiled_show(template_path).program
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # load_show_for_video logs the template error when it is retried.
+            return None
+        return program if program.infinite else None
+
+    def sync_show_clock(self, position: Optional[float], *, paused: bool = False) -> None:
+        """Report the video's playback position to a show following playback."""
+
+        with self._lock:
+            clock = self._playback_clock
+        if clock is None:
+            return
+        clock.set_paused(paused)
+        if position is not None and clock.sync(position):
+            # The video jumped back: rebuild the show state there and replay
+            # the cues (relays included) from that point again.
+            if not self.runner.seek(position):
+                self.scheduler.seek(position, clock=clock)
 
     def _run_actions(
         self,
         actions: List[DMXAction],
         context: Optional[object] = None,
         relay_actions: Optional[List[RelayAction]] = None,
+        timeline: Optional[FrameTimeline] = None,
+        follow_playback: bool = False,
+        program: Optional[ShowProgram] = None,
     ) -> None:
         self._wait_for_active_fade()
         self.runner.stop()
         self.relay_runner.stop()
+        clock = ShowClock()
 
         initial_levels = list(self._baseline_levels)
         epsilon = 0.001
@@ -1365,53 +4439,40 @@ class DMXShowManager:
                 if 0 <= index < len(initial_levels):
                     initial_levels[index] = _clamp(action.value, 0, 255)
 
+        self._release_layers(MIXER_PREVIEW, MIXER_MASTER)
         self.output.set_levels(initial_levels)
+        self._restore_grand_master()
 
         with self._lock:
             self._has_active_show = bool(actions)
-
-        if actions:
-            self.runner.start(actions)
+            self._playback_clock = clock if follow_playback else None
+            self._preview_index = None
+
+        if actions and program is not None:
+            self.runner.start(actions, clock=clock, program=program)
+        elif actions and timeline is not None:
+            self.runner.start(actions, timeline=timeline, clock=clock)
+        elif actions:
+            self.runner.start(actions, clock=clock)
         else:
             name = context if isinstance(context, str) and context else "show"
             LOGGER.info("No DMX template for %s. Running blackout.", name)
 
         relay_list = relay_actions or []
         if relay_list:
-            self.relay_runner.start(relay_list)
+            self.relay_runner.start(relay_list, clock=clock)
 
     def start_default_show(self, template_path: Optional[Path] = None) -> None:
         if template_path is None:
             template_path = self.templates_dir / "default_loop_dmx.json"
         try:
-            payload = self._load_template_payload(template_path)
+            compiled = self.get_compiled_show(template_path)
         except FileNotFoundError:
             self._wait_for_active_fade()
             LOGGER.info("Default DMX template not found at %s", template_path)
             self.output.blackout()
             self.relay_runner.stop()
             return
-        except Exception:
-            self._wait_for_active_fade()
-            LOGGER.exception("Unable to load default DMX template %s", template_path)
-            self.output.blackout()
-            self.relay_runner.stop()
-            return
-
-        actions_data = payload.get("actions", [])
-        relay_raw = payload.get("relay_actions", [])
-
-        try:
-            if not isinstance(actions_data, list):
-                raise ValueError("Template actions must be provided as a list")
-            actions = self._expand_actions_with_loops(actions_data)
-            relay_actions: List[RelayAction] = []
-            if relay_raw in (None, ""):
-                relay_raw = []
-            if relay_raw:
-                if not isinstance(relay_raw, list):
-                    raise ValueError("Relay actions must be provided as a list")
-                relay_actions = self._parse_relay_actions(relay_raw)
         except Exception:
             self._wait_for_active_fade()
             LOGGER.exception("Unable to process default DMX template %s", template_path)
@@ -1419,7 +4480,16 @@ class DMXShowManager:
             self.relay_runner.stop()
             return
 
-        self._run_actions(actions, context="default loop", relay_actions=relay_actions)
+        program = compiled.program
+        timeline = None if program.infinite else self.get_show_timeline(template_path)
+        # Without a rendered timeline the loops are streamed from the program.
+        self._run_actions(
+            list(program.actions),
+            context="default loop",
+            relay_actions=list(compiled.relay_actions),
+            timeline=timeline,
+            program=program if timeline is None else None,
+        )
 
     def start_preview(
         self,
@@ -1434,62 +4504,76 @@ class DMXShowManager:
         except (TypeError, ValueError) as exc:  # pragma: no cover - defensive
             raise ValueError("start_time must be a number") from exc
         offset = max(0.0, offset)
-        actions = self._expand_actions_with_loops(raw_actions)
-        ordered = sorted(actions, key=lambda action: action.time_seconds)
 
         if template_preview:
             baseline_levels = [0] * self.output.channel_count
         else:
             baseline_levels = list(self._baseline_levels)
-        levels = baseline_levels[:]
-        adjusted: List[DMXAction] = []
-        channel_levels: Dict[int, int] = {
-            channel: level for channel, level in enumerate(baseline_levels, start=1)
-        }
+        # The builder resends the whole show on every edit, so reuse the
+        # index while the actions and baseline are unchanged.
+        raw_list = list(raw_actions)
+        key = hashlib.sha1(
+            json.dumps([raw_list, baseline_levels], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            cached = self._preview_index
+        if cached is not None and cached[0] == key:
+            self._show_preview(cached[1], offset, paused)
+            return
+        index = ShowIndex(self._expand_actions_with_loops(raw_list), baseline_levels)
+        with self._lock:
+            self._preview_index = (key, index)
+        self._show_preview(index, offset, paused, restart=True)
 
-        # Allow a millisecond tolerance when comparing timestamps so that
-        # floating point rounding does not prevent actions at the starting
-        # timestamp from being treated as already active.
-        epsilon = 0.001
+    def seek_preview(self, start_time: float, paused: bool = False) -> bool:
+        """Move the loaded preview to ``start_time`` without resending actions.
 
-        for action in ordered:
-            channel_index = action.channel - 1
-            previous_level = channel_levels.get(action.channel, 0)
-            starts_now = math.isclose(action.time_seconds, offset, abs_tol=epsilon)
-            if action.time_seconds < offset or (starts_now and action.fade <= 0):
-                if action.fade > 0 and action.time_seconds + action.fade > offset:
-                    progress = (offset - action.time_seconds) / action.fade
-                    progress = max(0.0, min(1.0, progress))
-                    level = round(previous_level + (action.value - previous_level) * progress)
-                else:
-                    level = action.value
-                channel_levels[action.channel] = level
-                levels[channel_index] = level
-                continue
+        Returns False when no preview has been loaded.
+        """
 
-            adjusted.append(
-                DMXAction(
-                    time_seconds=action.time_seconds - offset,
-                    channel=action.channel,
-                    value=action.value,
-                    fade=action.fade,
-                )
-            )
-            channel_levels[action.channel] = action.value
+        try:
+            offset = max(0.0, float(start_time))
+        except (TypeError, ValueError) as exc:
+            raise ValueError("start_time must be a number") from exc
+        with self._lock:
+            cached = self._preview_index
+        if cached is None:
+            return False
+        self._show_preview(cached[1], offset, paused)
+        return True
 
-        self.runner.stop()
-        self.output.set_levels(levels)
-        should_run = bool(adjusted) and not paused
+    def _show_preview(
+        self, index: ShowIndex, offset: float, paused: bool, *, restart: bool = False
+    ) -> None:
         with self._lock:
-            self._has_active_show = bool(actions) and not paused
-        if should_run:
-            self.runner.start(adjusted)
+            self._has_active_show = bool(index.actions) and not paused
+        if not restart and getattr(self.runner, "index", None) is index:
+            # The preview is still running: move it in place.
+            if paused:
+                self.runner.pause()
+            if self.runner.seek(offset):
+                if not paused:
+                    self.runner.resume()
+                return
+
+        self.runner.stop()
+        state = index.state_at(offset)
+        self._release_layers(MIXER_MASTER)
+        self._output_layer(MIXER_PREVIEW).set_levels(state.levels)
+        self._restore_grand_master()
+        if paused or (state.cursor >= len(index) and not state.fades):
+            return
+        self.runner.start(
+            index.actions, clock=ShowClock(offset), index=index, layer=MIXER_PREVIEW
+        )
 
     def stop_show(self) -> None:
         self.runner.stop()
         self.relay_runner.stop()
         should_blackout = False
         with self._lock:
+            self._playback_clock = None
+            self._preview_index = None
             if self._has_active_show:
                 self._has_active_show = False
                 should_blackout = True
@@ -1507,6 +4591,8 @@ class DMXShowManager:
                     "fade": round(action.fade, 3),
                 }
             )
+            if action.curve != FADE_CURVE_LINEAR:
+                serialized[-1]["curve"] = action.curve
         return serialized
 
     def serialize_relay_actions(self, actions: Iterable[RelayAction]) -> List[Dict[str, object]]:
@@ -1562,67 +4648,281 @@ class DMXShowManager:
         entries.sort(key=lambda item: parse_timecode(str(item["time"])))
         return entries
 
+    def _normalize_action_for_save(
+        self, raw: object, patch: Optional[ChannelPatch]
+    ) -> Dict[str, object]:
+        if not isinstance(raw, dict):
+            raise ValueError("Actions must be objects")
+        action = DMXAction.from_dict(raw, patch=patch)
+        raw_channel = raw.get("channel")
+        channel: object = action.channel
+        if isinstance(raw_channel, str) and ":" in raw_channel:
+            # Keep universe-qualified addresses as written so the template
+            # still points at the same slot if the patch changes.
+            universe_raw, _, slot_raw = raw_channel.partition(":")
+            channel = f"{int(universe_raw)}:{int(slot_raw)}"
+        entry: Dict[str, object] = {
+            "time": self.format_timecode(action.time_seconds),
+            "channel": channel,
+            "value": action.value,
+            "fade": round(action.fade, 3),
+        }
+        if action.curve != FADE_CURVE_LINEAR:
+            entry["curve"] = action.curve
+
+        for key in (
+            "channelPresetId",
+            "valuePresetId",
+            "templateId",
+            "templateInstanceId",
+            "templateRowId",
+            "channelMasterId",
+            "stepTitle",
+        ):
+            value = raw.get(key)
+            if isinstance(value, str) and value:
+                entry[key] = value
+
+        loop_settings = _normalize_template_loop_settings(raw.get("templateLoop"))
+        if loop_settings and loop_settings.is_active():
+            entry["templateLoop"] = _serialize_template_loop_settings(loop_settings)
+        return entry
+
+    @staticmethod
+    def _generate_action_id() -> str:
+        return f"action_{uuid.uuid4().hex[:12]}"
+
+    def _write_template_snapshot(self, template_path: Path, document: TemplateDocument) -> None:
+        template_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = template_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            json.dump(document.payload(), fh, indent=2)
+            fh.write("\n")
+        tmp_path.replace(template_path)
+        # The snapshot carries the revision, so a journal left behind by a
+        # crash at this point is skipped on the next load.
+        try:
+            self.journal_path_for_template(template_path).unlink()
+        except FileNotFoundError:
+            pass
+        document.journal_entries = 0
+        document.signature = self._template_signature(template_path)
+
+    def _current_revision(self, template_path: Path) -> int:
+        try:
+            return self._template_document(template_path).revision
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError):
+            LOGGER.warning("Replacing unreadable DMX template %s", template_path)
+            return 0
+
     def save_template(
         self,
         template_path: Path,
         *,
         actions: Iterable[Dict[str, object]],
         relay_actions: Optional[Iterable[Dict[str, object]]] = None,
-    ) -> None:
-        normalized: List[Dict[str, object]] = []
-        for raw in actions:
-            action = DMXAction.from_dict(raw)
-            entry: Dict[str, object] = {
-                "time": self.format_timecode(action.time_seconds),
-                "channel": action.channel,
-                "value": action.value,
-                "fade": round(action.fade, 3),
-            }
-
-            if isinstance(raw, dict):
-                for key in (
-                    "channelPresetId",
-                    "valuePresetId",
-                    "templateId",
-                    "templateInstanceId",
-                    "templateRowId",
-                    "channelMasterId",
-                    "stepTitle",
-                ):
-                    value = raw.get(key)
-                    if isinstance(value, str) and value:
-                        entry[key] = value
-
-                loop_settings = _normalize_template_loop_settings(raw.get("templateLoop"))
-                if loop_settings and loop_settings.is_active():
-                    entry["templateLoop"] = _serialize_template_loop_settings(loop_settings)
-
-            normalized.append(entry)
+        base_revision: Optional[int] = None,
+    ) -> int:
+        """Replace a template's contents and return its new revision.
 
-        payload: Dict[str, Any] = {
-            "actions": sorted(normalized, key=lambda item: parse_timecode(str(item["time"]))),
-        }
+        Actions keep the ``id`` they were given when it is unique; the rest are
+        assigned fresh ids.  When ``base_revision`` is given and the template
+        has moved on, :class:`TemplateConflictError` is raised instead.
+        """
 
+        patch = self._channel_patch()
+        normalized: List[Dict[str, object]] = []
+        seen_ids: Set[str] = set()
+        for raw in actions:
+            entry = self._normalize_action_for_save(raw, patch)
+            action_id = raw.get("id") if isinstance(raw, dict) else None
+            if not isinstance(action_id, str) or not action_id or action_id in seen_ids:
+                action_id = self._generate_action_id()
+            seen_ids.add(action_id)
+            normalized.append({"id": action_id, **entry})
+
+        relay_payload: Optional[List[Dict[str, object]]] = None
         if relay_actions is not None:
             relay_payload = self._normalize_relay_actions_for_save(relay_actions)
-            if relay_payload:
-                payload["relay_actions"] = relay_payload
-            else:
-                payload["relay_actions"] = []
 
-        template_path.parent.mkdir(parents=True, exist_ok=True)
-        tmp_path = template_path.with_suffix(".tmp")
-        with tmp_path.open("w", encoding="utf-8") as fh:
-            json.dump(payload, fh, indent=2)
-            fh.write("\n")
-        tmp_path.replace(template_path)
+        key = template_path.resolve()
+        with self._documents_lock:
+            revision = self._current_revision(key)
+            if base_revision is not None and base_revision != revision:
+                raise TemplateConflictError(revision)
+            document = TemplateDocument.from_payload(
+                {"revision": revision + 1, "actions": normalized, "relay_actions": relay_payload}
+            )
+            self._cancel_compaction(key)
+            self._write_template_snapshot(template_path, document)
+            self._documents[key] = document
+        self.invalidate_compiled_show(template_path)
+        return document.revision
 
     def save_actions(self, template_path: Path, actions: Iterable[Dict[str, object]]) -> None:
         self.save_template(template_path, actions=actions, relay_actions=None)
 
+    def patch_template(
+        self,
+        template_path: Path,
+        *,
+        base_revision: int,
+        operations: Iterable[Dict[str, Any]],
+        relay_actions: Optional[Iterable[Dict[str, object]]] = None,
+    ) -> Tuple[int, List[str]]:
+        """Apply insert/update/delete operations to a template by action id.
+
+        The edit is applied to the cached document and appended to the
+        template's journal rather than rewriting the file; the journal is
+        folded back into the template in the background.  This saves the
+        request body and the file rewrite only: the compiled show and its
+        timeline are dropped and rebuilt in full the next time the template
+        is played.  Returns the new revision and the ids of inserted
+        actions.  Raises
+        :class:`TemplateConflictError` when ``base_revision`` is stale and
+        ``ValueError`` for malformed operations, leaving the template as it was.
+        """
+
+        patch = self._channel_patch()
+        relay_payload: Optional[List[Dict[str, object]]] = None
+        if relay_actions is not None:
+            relay_payload = self._normalize_relay_actions_for_save(relay_actions)
 
-def create_manager(templates_dir: Path, universe: int = 0) -> DMXShowManager:
-    output = DMXOutput(universe=universe)
+        key = template_path.resolve()
+        with self._documents_lock:
+            try:
+                current = self._template_document(key)
+            except FileNotFoundError:
+                current = TemplateDocument(revision=0, actions=[], times=[])
+            if base_revision != current.revision:
+                raise TemplateConflictError(current.revision)
+
+            document = current.copy()
+            records: List[Dict[str, Any]] = []
+            inserted: List[str] = []
+            for operation in operations:
+                if not isinstance(operation, dict):
+                    raise ValueError("Template operations must be objects")
+                kind = operation.get("op")
+                if kind == "delete":
+                    action_id = str(operation.get("id") or "")
+                    document.remove(action_id)
+                    records.append({"op": "delete", "id": action_id})
+                    continue
+                raw = operation.get("action")
+                if not isinstance(raw, dict):
+                    raise ValueError(f"Template operation '{kind}' must include an action")
+                if kind == "insert":
+                    action_id = raw.get("id") or operation.get("id")
+                    if not isinstance(action_id, str) or not action_id:
+                        action_id = self._generate_action_id()
+                    elif document.contains(action_id):
+                        raise ValueError(f"Action id '{action_id}' already exists")
+                    entry = {"id": action_id, **self._normalize_action_for_save(raw, patch)}
+                    document.insert(entry)
+                    inserted.append(action_id)
+                elif kind == "update":
+                    action_id = str(operation.get("id") or raw.get("id") or "")
+                    existing = document.remove(action_id)
+                    merged = {**existing, **raw}
+                    entry = {"id": action_id, **self._normalize_action_for_save(merged, patch)}
+                    document.insert(entry)
+                else:
+                    raise ValueError(f"Unknown template operation '{kind}'")
+                records.append({"op": kind, "action": entry})
+            if relay_payload is not None:
+                document.relay_actions = relay_payload
+            document.revision += 1
+
+            if not key.exists():
+                self._write_template_snapshot(key, document)
+            else:
+                record: Dict[str, Any] = {"revision": document.revision, "ops": records}
+                if relay_payload is not None:
+                    record["relay_actions"] = relay_payload
+                journal_path = self.journal_path_for_template(key)
+                with journal_path.open("a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                document.journal_entries += 1
+                document.signature = self._template_signature(key)
+                self._schedule_compaction(key, document.journal_entries)
+            self._documents[key] = document
+        self.invalidate_compiled_show(template_path)
+        return document.revision, inserted
+
+    def _schedule_compaction(self, key: Path, journal_entries: int) -> None:
+        self._cancel_compaction(key)
+        delay = 0.0 if journal_entries >= TEMPLATE_JOURNAL_MAX_ENTRIES else TEMPLATE_COMPACT_DELAY
+        timer = threading.Timer(delay, self.compact_template, args=(key,))
+        timer.daemon = True
+        self._compaction_timers[key] = timer
+        timer.start()
+
+    def _cancel_compaction(self, key: Path) -> None:
+        timer = self._compaction_timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+    def compact_template(self, template_path: Path) -> None:
+        """Fold a template's journal back into the template file."""
+
+        key = template_path.resolve()
+        with self._documents_lock:
+            self._compaction_timers.pop(key, None)
+            try:
+                document = self._template_document(key)
+            except FileNotFoundError:
+                return
+            except (OSError, ValueError):
+                LOGGER.exception("Unable to compact DMX template %s", key)
+                return
+            if not document.journal_entries:
+                return
+            previous_signature = document.signature
+            try:
+                self._write_template_snapshot(key, document)
+            except OSError:
+                LOGGER.exception("Unable to compact DMX template %s", key)
+                return
+        # The contents are unchanged, so keep the compiled show.
+        with self._show_cache_lock:
+            cached = self._show_cache.get(key)
+            if cached and cached[0] == previous_signature:
+                self._show_cache[key] = (document.signature, cached[1])
+
+
+def create_manager(
+    templates_dir: Path,
+    universe: int = 0,
+    *,
+    universes: Optional[Sequence[int]] = None,
+    patch_file: Optional[Path] = None,
+) -> DMXShowManager:
+    if not universes:
+        universes = _parse_universes(os.environ.get("DMX_UNIVERSES", "")) or [universe]
+    try:
+        patch = load_channel_patch(universes, patch_file)
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        LOGGER.error(
+            "Unable to load DMX patch from %s (%s). Using universes %s.",
+            patch_file,
+            exc,
+            list(universes),
+        )
+        patch = ChannelPatch(universes)
+    if len(patch.universes) > 1 or patch.routes:
+        LOGGER.info(
+            "DMX output spans universes %s with %s patched channels",
+            patch.universes,
+            len(patch.routes),
+        )
+        output = DMXOutput(universe=patch.universes[0], patch=patch)
+    else:
+        output = DMXOutput(universe=patch.universes[0])
     smoke_channel = _resolve_smoke_channel()
     manager = DMXShowManager(templates_dir, output, smoke_channel=smoke_channel)
 
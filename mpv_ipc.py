@@ -0,0 +1,210 @@
+"""Persistent JSON IPC client for mpv's ``--input-ipc-server`` socket."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import socket
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+LOGGER = logging.getLogger("kpop_stage.mpv")
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+
+class MpvIpcClient:
+    """Keeps one connection to mpv open and multiplexes commands over it.
+
+    Every command is tagged with a ``request_id`` and a reader thread matches
+    replies back to their callers, so several commands may be in flight at
+    once.  Messages without a ``request_id`` are asynchronous mpv events and
+    are handed to the subscribed callbacks on the reader thread.
+
+    The connection is opened lazily and re-opened on the next command after
+    it drops.  Connection failures and timeouts raise :class:`OSError` so
+    callers can treat them like the one-shot socket they replace.
+    """
+
+    def __init__(self, path: str, *, timeout: float = 2.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader: Optional[threading.Thread] = None
+        self._pending: Dict[int, Future] = {}
+        self._request_ids = itertools.count(1)
+        self._subscribers: List[EventCallback] = []
+        self._connect_listeners: List[Callable[[], None]] = []
+
+    def subscribe(self, callback: EventCallback) -> Callable[[], None]:
+        """Register ``callback`` for mpv events and return an unsubscribe hook."""
+
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return _unsubscribe
+
+    def add_connect_listener(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` from a worker thread after every (re)connect."""
+
+        with self._lock:
+            self._connect_listeners.append(callback)
+
+    @property
+    def connected(self) -> bool:
+        with self._lock:
+            return self._sock is not None
+
+    def _ensure_connected(self) -> socket.socket:
+        with self._lock:
+            if self._sock is not None:
+                return self._sock
+            sock = socket.socket(socket.AF_UNIX)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+            reader = threading.Thread(
+                target=self._read_loop, args=(sock,), name="mpv-ipc", daemon=True
+            )
+            self._reader = reader
+            listeners = list(self._connect_listeners)
+        reader.start()
+        if listeners:
+            # Listeners usually issue commands themselves, which must not run
+            # on the caller's stack while it is still waiting to send.
+            threading.Thread(
+                target=self._notify_connected, args=(listeners,), daemon=True
+            ).start()
+        return sock
+
+    @staticmethod
+    def _notify_connected(listeners: List[Callable[[], None]]) -> None:
+        for listener in listeners:
+            try:
+                listener()
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("mpv IPC connect listener failed")
+
+    def request(self, *command: Any) -> "Future[Dict[str, Any]]":
+        """Send ``command`` and return a future resolved with mpv's reply."""
+
+        sock = self._ensure_connected()
+        request_id = next(self._request_ids)
+        future: "Future[Dict[str, Any]]" = Future()
+        payload = (
+            json.dumps({"command": list(command), "request_id": request_id}).encode("utf-8")
+            + b"\n"
+        )
+        with self._lock:
+            if self._sock is not sock:
+                raise ConnectionError("mpv IPC connection closed")
+            self._pending[request_id] = future
+        try:
+            with self._write_lock:
+                sock.sendall(payload)
+        except OSError:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            self._drop_connection(sock)
+            raise
+        return future
+
+    def command(self, *command: Any, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send ``command`` and wait for its reply."""
+
+        return self.wait(self.request(*command), timeout=timeout)
+
+    def wait(
+        self, future: "Future[Dict[str, Any]]", timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            with self._lock:
+                for request_id, pending in list(self._pending.items()):
+                    if pending is future:
+                        del self._pending[request_id]
+            raise TimeoutError("Timed out waiting for mpv IPC reply") from exc
+
+    def _read_loop(self, sock: socket.socket) -> None:
+        buffer = b""
+        try:
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    if line.strip():
+                        self._dispatch(line)
+        except OSError:
+            pass
+        finally:
+            self._drop_connection(sock)
+
+    def _dispatch(self, line: bytes) -> None:
+        try:
+            message = json.loads(line.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            LOGGER.debug("Ignoring malformed mpv IPC message: %r", line)
+            return
+        if not isinstance(message, dict):
+            return
+
+        request_id = message.get("request_id")
+        if "event" not in message and isinstance(request_id, int):
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_result(message)
+            return
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(message)
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("mpv event subscriber failed")
+
+    def _drop_connection(self, sock: socket.socket) -> None:
+        with self._lock:
+            if self._sock is not sock:
+                return
+            self._sock = None
+            self._reader = None
+            pending = list(self._pending.values())
+            self._pending.clear()
+        try:
+            sock.close()
+        except OSError:  # pragma: no cover - defensive
+            pass
+        for future in pending:
+            if not future.done():
+                future.set_exception(ConnectionError("mpv IPC connection closed"))
+
+    def close(self) -> None:
+        with self._lock:
+            sock = self._sock
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._drop_connection(sock)
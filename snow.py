@@ -9,7 +9,7 @@ import urllib.request
 from dataclasses import dataclass
 from typing import Callable, Dict, Iterable, Optional
 
-from dmx import RelayAction
+from dmx import RelayAction, RelayHealth
 
 LOGGER = logging.getLogger("kpop_stage.snow")
 
@@ -61,7 +61,11 @@ class SnowCommand:
 
 
 class SnowMachineController:
-    """Loads snow machine relay presets and exposes simple on/off controls."""
+    """Loads snow machine relay presets and exposes simple on/off controls.
+
+    With a :class:`RelayHealth` the controller fails fast while the relay
+    host is known to be offline instead of waiting out the request timeout.
+    """
 
     def __init__(
         self,
@@ -69,10 +73,12 @@ class SnowMachineController:
         *,
         preset_id: str,
         request_timeout: float = 3.0,
+        health: Optional[RelayHealth] = None,
     ) -> None:
         self._preset_loader = preset_loader
         self._preset_id = preset_id
         self._request_timeout = max(0.5, float(request_timeout))
+        self._health = health
         self._lock = threading.Lock()
         self._active = False
         self._available = False
@@ -165,17 +171,32 @@ class SnowMachineController:
         if command is None:
             raise RuntimeError("Snow machine command is not configured")
 
+        state = "on" if desired else "off"
+        reason = self._health.check(command.url) if self._health else None
+        if reason is not None:
+            raise RuntimeError(f"Unable to turn snow machine {state}: relay is offline ({reason})")
+
         request = urllib.request.Request(command.url)
         try:
             with urllib.request.urlopen(request, timeout=self._request_timeout) as response:
                 response.read(1)
+        except urllib.error.HTTPError as exc:
+            # The board answered, so it is reachable even if it refused.
+            if self._health:
+                self._health.record_success(command.url)
+            raise RuntimeError(f"Unable to turn snow machine {state}") from exc
         except urllib.error.URLError as exc:
-            state = "on" if desired else "off"
+            if self._health:
+                self._health.record_failure(command.url, str(exc.reason) or "unreachable")
             raise RuntimeError(f"Unable to turn snow machine {state}") from exc
         except Exception as exc:  # pragma: no cover - defensive logging
-            state = "on" if desired else "off"
+            if self._health:
+                self._health.record_failure(command.url, str(exc) or type(exc).__name__)
             raise RuntimeError(f"Unable to turn snow machine {state}") from exc
 
+        if self._health:
+            self._health.record_success(command.url)
+
         with self._lock:
             self._active = desired
 
@@ -80,6 +80,9 @@ let isTogglingSnowMachine = false;
 let isSendingReboot = false;
 let isReloadingStageCode = false;
 let queuePollTimer = null;
+let eventSource = null;
+let eventStreamKey = null;
+let eventStreamEntryId = null;
 let queueCountdownTimer = null;
 let queueReadyExpiresAt = null;
 let lastQueueState = null;
@@ -1296,6 +1299,7 @@ async function fetchQueueStatus(showErrors = false) {
     }
     const payload = await response.json();
     updateQueueUI(payload);
+    syncEventStream();
   } catch (err) {
     console.error(err);
     if (showErrors) {
@@ -1383,6 +1387,7 @@ async function joinQueue(code) {
     codeDraftValue = "";
     clearStoredCodeDraft();
     updateQueueUI(payload);
+    syncEventStream();
   } catch (err) {
     console.error(err);
     if (!codeErrorEl || codeErrorEl.hidden) {
@@ -1866,6 +1871,91 @@ function scheduleStatusPolling() {
   statusPollTimer = setInterval(fetchStatus, 1000);
 }
 
+function stopStatusPolling() {
+  if (statusPollTimer) {
+    clearInterval(statusPollTimer);
+    statusPollTimer = null;
+  }
+}
+
+function resumePolling() {
+  if (!statusPollTimer) {
+    scheduleStatusPolling();
+  }
+  if (!isAdmin && !queuePollTimer) {
+    startQueuePolling();
+  }
+}
+
+function parseEventData(event) {
+  try {
+    return JSON.parse(event.data);
+  } catch (err) {
+    console.error(err);
+    return null;
+  }
+}
+
+// Status, queue and stage-code updates are pushed over /api/events. Polling
+// only runs while the stream is unavailable.
+function startEventStream() {
+  if (!window.EventSource || eventSource) {
+    return;
+  }
+  const params = new URLSearchParams();
+  if (userKey) {
+    params.set("key", userKey);
+  }
+  const query = params.toString();
+  const source = new EventSource(query ? `/api/events?${query}` : "/api/events");
+  eventSource = source;
+  eventStreamKey = userKey;
+  eventStreamEntryId = latestQueueEntry ? latestQueueEntry.id : null;
+
+  source.addEventListener("open", () => {
+    stopStatusPolling();
+    stopQueuePolling();
+  });
+  source.addEventListener("error", () => {
+    // EventSource reconnects on its own; poll until it does.
+    resumePolling();
+  });
+  source.addEventListener("status", (event) => {
+    const payload = parseEventData(event);
+    if (payload) {
+      updatePlayerUI(payload);
+    }
+  });
+  source.addEventListener("queue", (event) => {
+    const payload = parseEventData(event);
+    if (payload) {
+      updateQueueUI(payload);
+      syncEventStream();
+    }
+  });
+  source.addEventListener("stage_code", (event) => {
+    const payload = parseEventData(event);
+    if (payload) {
+      setAdminStageCodeValue(payload.code);
+    }
+  });
+}
+
+function syncEventStream() {
+  // The stream is bound to the user key and queue entry it was opened with,
+  // so reopen it when either changes.
+  if (!eventSource) {
+    return;
+  }
+  const entryId = latestQueueEntry ? latestQueueEntry.id : null;
+  if (eventStreamKey === userKey && eventStreamEntryId === entryId) {
+    return;
+  }
+  eventSource.close();
+  eventSource = null;
+  startEventStream();
+}
+
 function scheduleVolumeUpdate(value) {
   if (!isAdmin || !userKey) {
     return;
@@ -2125,6 +2215,7 @@ async function initializeApp() {
     await fetchQueueStatus(true);
     startQueuePolling();
   }
+  startEventStream();
 }
 
 initializeApp().catch((err) => {
@@ -75,3 +75,23 @@ def test_put_color_presets_sanitizes_and_saves(color_presets_tempfile):
     stored = json.loads(color_presets_tempfile.read_text(encoding="utf-8"))
     assert "presets" in stored
     assert len(stored["presets"]) == 2
+
+
+def test_put_color_presets_round_trips_through_get(color_presets_tempfile):
+    client = app_module.app.test_client()
+
+    payload = {
+        "presets": [
+            {"id": "color_hot", "name": "Hot", "red": 999, "green": -5, "blue": 20},
+        ]
+    }
+
+    saved = client.put("/api/color-presets", json=payload).get_json()["presets"]
+    assert saved[0]["iconColor"] == "#ff0014"
+
+    fetched = client.get("/api/color-presets").get_json()["presets"]
+    assert fetched == saved
+
+    # Editing a loaded list must not leak into the cached presets.
+    app_module.load_color_presets_from_disk()[0]["name"] = "Changed"
+    assert client.get("/api/color-presets").get_json()["presets"] == saved
@@ -0,0 +1,94 @@
+import socket
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dmx
+from dmx import ArtNetSender, SACNSender
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1.0)
+    yield sock
+    sock.close()
+
+
+def test_artnet_packets_carry_sequence_and_universe(listener) -> None:
+    port = listener.getsockname()[1]
+    sender = ArtNetSender(0x123, "127.0.0.1", port=port, channel_count=3)
+    try:
+        sender.send(bytearray([10, 20, 30]))
+        sender.send(bytearray([40, 50, 60]))
+        first, _ = listener.recvfrom(1024)
+        second, _ = listener.recvfrom(1024)
+    finally:
+        sender.close()
+
+    assert first[:8] == b"Art-Net\x00"
+    assert first[8:10] == b"\x00\x50"
+    assert first[14] == 0x23 and first[15] == 0x01
+    # Odd channel counts are padded to an even ArtDmx length.
+    assert int.from_bytes(first[16:18], "big") == 4
+    assert first[18:] == bytes([10, 20, 30, 0])
+    assert second[18:] == bytes([40, 50, 60, 0])
+    assert (first[12], second[12]) == (1, 2)
+
+
+def test_sacn_packets_carry_priority_and_sequence(listener) -> None:
+    port = listener.getsockname()[1]
+    sender = SACNSender(7, "127.0.0.1", port=port, priority=150, channel_count=512)
+    try:
+        levels = bytearray(512)
+        levels[0] = 255
+        sender.send(levels)
+        levels[511] = 9
+        sender.send(levels)
+        first, _ = listener.recvfrom(1024)
+        second, _ = listener.recvfrom(1024)
+    finally:
+        sender.close()
+
+    assert len(first) == 638
+    assert first[4:16] == b"ASC-E1.17\x00\x00\x00"
+    assert first[108] == 150
+    assert int.from_bytes(first[113:115], "big") == 7
+    assert int.from_bytes(first[123:125], "big") == 513
+    assert first[125] == 0 and first[126] == 255
+    assert second[-1] == 9
+    assert second[111] == (first[111] + 1) & 0xFF
+
+
+def test_sacn_defaults_to_universe_multicast_group() -> None:
+    sender = SACNSender(258)
+    try:
+        assert sender.address == ("239.255.1.2", dmx.SACN_PORT)
+    finally:
+        sender.close()
+
+
+def test_output_uses_network_protocol_from_environment(monkeypatch, listener) -> None:
+    port = listener.getsockname()[1]
+    monkeypatch.setenv("DMX_PROTOCOL", "artnet")
+    monkeypatch.setenv("DMX_TARGET", "127.0.0.1")
+    monkeypatch.setenv("DMX_NETWORK_PORT", str(port))
+    output = dmx.DMXOutput(universe=2, channel_count=8)
+    try:
+        output.set_channel(1, 77)
+        deadline = time.monotonic() + 1.0
+        packet = b""
+        while time.monotonic() < deadline:
+            packet, _ = listener.recvfrom(1024)
+            if packet[18] == 77:
+                break
+    finally:
+        output.shutdown()
+
+    assert packet[14] == 2
+    assert packet[18] == 77
@@ -1,9 +1,13 @@
 import sys
+import threading
 import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+import pytest
+
+import dmx
 from dmx import DMXOutput
 
 
@@ -37,3 +41,289 @@ def test_set_channel_cancels_active_transition() -> None:
         assert output.get_channel(1) <= 12
     finally:
         output.shutdown()
+
+
+def test_fades_run_on_sender_thread_without_worker_threads() -> None:
+    output = DMXOutput()
+    try:
+        thread_count = threading.active_count()
+        for channel in range(1, 65):
+            output.transition_channel(channel, 200, 0.1)
+        assert threading.active_count() == thread_count
+        _wait_for_transitions(0.3)
+        assert output.get_levels()[:64] == [200] * 64
+        assert not output.has_active_transitions()
+    finally:
+        output.shutdown()
+
+
+def test_fade_stops_when_show_stop_event_is_set() -> None:
+    output = DMXOutput()
+    try:
+        stop_event = threading.Event()
+        output.transition_channel(1, 255, 0.5, stop_event=stop_event)
+        _wait_for_transitions(0.1)
+        stop_event.set()
+        _wait_for_transitions(0.1)
+        halted_value = output.get_channel(1)
+        _wait_for_transitions(0.5)
+        assert output.get_channel(1) == halted_value
+        assert halted_value < 255
+    finally:
+        output.shutdown()
+
+
+def test_timeline_playback_preserves_manual_levels_until_next_change() -> None:
+    output = DMXOutput(channel_count=4)
+    try:
+        frames = bytearray()
+        for value in (10, 10, 10, 10, 10, 10, 50):
+            frames.extend([value, 0, 0, 0])
+        timeline = dmx.FrameTimeline(frames, frame_count=7, channel_count=4, fps=20.0)
+
+        output.play_timeline(timeline, threading.Event())
+        _wait_for_transitions(0.1)
+        assert output.get_channel(1) == 10
+        output.set_channel(1, 200)
+        _wait_for_transitions(0.05)
+        assert output.get_channel(1) == 200
+        _wait_for_transitions(0.4)
+        assert output.get_channel(1) == 50
+    finally:
+        output.shutdown()
+
+
+def test_sender_paces_frames_on_fixed_deadlines(monkeypatch) -> None:
+    sent = []
+
+    def fake_build_sender(self, universe):
+        def _send(payload):
+            sent.append(time.monotonic())
+            time.sleep(0.005)
+
+        return _send, None, 0.0
+
+    monkeypatch.setattr(DMXOutput, "_build_sender", fake_build_sender)
+    output = DMXOutput(channel_count=4, fps=40.0)
+    try:
+        time.sleep(0.5)
+    finally:
+        output.shutdown()
+
+    stats = output.get_stats()
+    assert stats["target_fps"] == 40.0
+    assert stats["frames_sent"] == len(sent)
+    # Every period between the first and last send is either sent or counted
+    # as skipped, however loaded the machine is.  Sleeping a full period
+    # after each 5 ms send would leave a fifth of them unaccounted for.
+    periods = (sent[-1] - sent[0]) * 40.0
+    assert abs(len(sent) - 1 + stats["skipped_frames"] - periods) <= 2
+
+
+def test_fps_is_clamped_to_dmx_maximum() -> None:
+    output = DMXOutput(channel_count=4, fps=120.0)
+    try:
+        assert output.fps == dmx.DMX_MAX_FPS
+    finally:
+        output.shutdown()
+
+
+def test_patch_routes_logical_channels_to_universes(monkeypatch) -> None:
+    sent = {}
+
+    def fake_build_sender(self, universe):
+        def _send(payload):
+            sent.setdefault(universe, []).append(bytes(payload))
+
+        return _send, None, 0.0
+
+    monkeypatch.setattr(DMXOutput, "_build_sender", fake_build_sender)
+    patch = dmx.ChannelPatch.from_config(
+        [0],
+        {"universes": [3, 4], "patch": [{"channel": 2, "universe": 4, "address": 10, "count": 2}]},
+    )
+    assert patch.resolve("4:10") == 2
+    assert patch.resolve("4:1") == 513
+    assert patch.resolve(7) == 7
+
+    output = DMXOutput(patch=patch)
+    try:
+        assert output.channel_count == 1024
+        output.set_channel(2, 50)
+        output.set_channel(3, 60)
+        output.set_channel(513, 70)
+        _wait_for_transitions(0.1)
+    finally:
+        output.shutdown()
+
+    first, second = sent[3][-1], sent[4][-1]
+    # Channels 2 and 3 were moved, leaving their home slots dark.
+    assert first[1] == 0 and first[2] == 0
+    assert second[9] == 50 and second[10] == 60 and second[0] == 70
+
+
+def test_clean_universes_are_only_refreshed_at_keepalive(monkeypatch) -> None:
+    sent = {}
+
+    def fake_build_sender(self, universe):
+        def _send(payload):
+            sent.setdefault(universe, []).append(bytes(payload))
+
+        return _send, None, 10.0
+
+    monkeypatch.setattr(DMXOutput, "_build_sender", fake_build_sender)
+    output = DMXOutput(patch=dmx.ChannelPatch([0, 1]))
+    try:
+        _wait_for_transitions(0.1)
+        baseline = {universe: len(frames) for universe, frames in sent.items()}
+        output.set_channel(600, 9)
+        _wait_for_transitions(0.1)
+    finally:
+        output.shutdown()
+
+    assert baseline == {0: 1, 1: 1}
+    assert len(sent[0]) == 1
+    assert len(sent[1]) == 2 and sent[1][-1][87] == 9
+
+
+def test_each_universe_keeps_its_own_refresh_interval(monkeypatch) -> None:
+    sent = {}
+
+    def fake_build_sender(self, universe):
+        def _send(payload):
+            sent.setdefault(universe, []).append(bytes(payload))
+
+        # Universe 0 stands in for a serial line, universe 1 for OLA.
+        return _send, None, (0.0 if universe == 0 else 10.0)
+
+    monkeypatch.setattr(DMXOutput, "_build_sender", fake_build_sender)
+    output = DMXOutput(patch=dmx.ChannelPatch([0, 1]), fps=40.0)
+    try:
+        _wait_for_transitions(0.2)
+    finally:
+        output.shutdown()
+
+    assert len(sent[0]) > 2
+    assert len(sent[1]) == 1
+
+
+def test_mixer_layers_merge_by_priority_and_merge_rule() -> None:
+    output = DMXOutput(channel_count=4)
+    try:
+        output.set_merge_rule([1], dmx.MERGE_HTP)
+        output.set_levels([100, 100, 100, 100])
+        smoke = output.layer(dmx.MIXER_SMOKE)
+        smoke.set_channel(1, 60)
+        smoke.set_channel(2, 60)
+        # HTP keeps the brighter show level, LTP gives the higher layer.
+        assert output.get_levels() == [100, 60, 100, 100]
+
+        output.layer(dmx.MIXER_MASTER).set_levels([0, 0, 0, 0])
+        assert output.get_levels() == [0, 0, 0, 0]
+        output.release(dmx.MIXER_MASTER)
+        smoke.release([2])
+        assert output.get_levels() == [100, 100, 100, 100]
+        assert output.get_layer_levels(dmx.MIXER_SMOKE) == [60, None, None, None]
+    finally:
+        output.shutdown()
+
+
+def test_htp_merge_takes_the_highest_level_per_channel() -> None:
+    samples = [0, 1, 127, 128, 129, 200, 255]
+    first = bytes(value for value in samples for _ in samples)
+    second = bytes(samples) * len(samples)
+    output = DMXOutput(channel_count=len(first))
+    try:
+        output.set_merge_rule(range(1, len(first) + 1), dmx.MERGE_HTP)
+        output.set_levels(first)
+        smoke = output.layer(dmx.MIXER_SMOKE)
+        smoke.set_levels(second)
+        assert output.get_levels() == list(map(max, first, second))
+        smoke.release()
+        assert output.get_levels() == list(first)
+    finally:
+        output.shutdown()
+
+
+def test_layer_writes_do_not_cancel_fades_of_other_layers() -> None:
+    output = DMXOutput(channel_count=4)
+    try:
+        output.transition_channel(3, 200, 0.2)
+        output.layer(dmx.MIXER_PREVIEW).set_levels([5, 5, 5, 5])
+        output.release(dmx.MIXER_PREVIEW)
+        _wait_for_transitions(0.4)
+        assert output.get_channel(3) == 200
+    finally:
+        output.shutdown()
+
+
+def test_masters_scale_the_rendered_frame_only() -> None:
+    output = DMXOutput(channel_count=4)
+    try:
+        output.set_master_groups({"Left": [1, 2]})
+        output.set_levels([200, 100, 200, 100])
+        output.transition_channel(4, 200, 0.2)
+        output.set_master(0.5, group="Left")
+        output.set_master(0.5)
+        assert output.get_output_levels()[:3] == [50, 25, 100]
+        assert output.get_levels()[:3] == [200, 100, 200]
+        assert output.has_active_transitions()
+
+        output.set_master(1.0, 0.1)
+        _wait_for_transitions(0.3)
+        assert output.get_masters() == {"grand": 1.0, "groups": {"Left": 0.5}}
+        assert output.get_output_levels() == [100, 50, 200, 200]
+    finally:
+        output.shutdown()
+
+
+def test_overlapping_groups_multiply_their_submasters() -> None:
+    output = DMXOutput(channel_count=4)
+    try:
+        output.set_master_groups({"Left": [1, 2], "Wash": [2, 3]})
+        output.set_levels([200, 200, 200, 200])
+        output.set_master(0.5, group="Left")
+        output.set_master(0.5, group="Wash")
+        assert output.get_output_levels() == [100, 50, 100, 200]
+        output.set_master(0.5)
+        assert output.get_output_levels() == [50, 25, 50, 100]
+    finally:
+        output.shutdown()
+
+
+def test_curved_fades_resume_along_their_curve() -> None:
+    output = DMXOutput(channel_count=4)
+    try:
+        # Both fades are resumed half way through a 20 second fade.
+        output.transition_channel(1, 200, 10.0, curve="ease-in", origin=(0, 10.0))
+        output.transition_channel(2, 0, 10.0, curve="log", origin=(255, 10.0))
+        _wait_for_transitions(0.05)
+        first, second = output.get_levels()[:2]
+        assert 48 <= first <= 53
+        assert 20 <= second <= 26
+        with pytest.raises(ValueError):
+            output.transition_channel(3, 255, 1.0, curve="bounce")
+    finally:
+        output.shutdown()
+
+
+def test_sender_survives_a_timeline_that_cannot_be_read(tmp_path) -> None:
+    output = DMXOutput(channel_count=4)
+    try:
+        baked = dmx.bake_frame_timeline(
+            [dmx.DMXAction(time_seconds=5.0, channel=1, value=255, fade=0.0)], [0] * 4
+        )
+        path = tmp_path / "show.npy"
+        dmx.write_frame_timeline(baked, path)
+        timeline = dmx.open_frame_timeline(path)
+        output.play_timeline(timeline, threading.Event())
+        _wait_for_transitions(0.05)
+        timeline.close()
+        _wait_for_transitions(0.1)
+        sent = output.get_stats()["frames_sent"]
+        output.set_channel(2, 90)
+        _wait_for_transitions(0.1)
+        assert output.get_stats()["frames_sent"] > sent
+        assert output.get_output_levels()[1] == 90
+    finally:
+        output.shutdown()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import gc
+import itertools
 import json
 import sys
 import time
@@ -31,10 +33,18 @@ class DummyOutput:
 class DummyRunner:
     def __init__(self) -> None:
         self.started_actions: List[DMXAction] = []
+        self.started_timeline = None
+        self.started_clock = None
+        self.started_index = None
+        self.started_program = None
         self.stop_calls = 0
 
-    def start(self, actions: Iterable[DMXAction]) -> None:  # pragma: no cover - simple stub
+    def start(self, actions: Iterable[DMXAction], timeline=None, clock=None, index=None, program=None, layer=None) -> None:  # pragma: no cover - simple stub
         self.started_actions = list(actions)
+        self.started_timeline = timeline
+        self.started_clock = clock
+        self.started_index = index
+        self.started_program = program
 
     def stop(self) -> None:  # pragma: no cover - simple stub
         self.stop_calls += 1
@@ -45,7 +55,7 @@ class DummyRelayRunner:
         self.started_actions: List[RelayAction] = []
         self.stop_calls = 0
 
-    def start(self, actions: Iterable[RelayAction]) -> None:  # pragma: no cover - simple stub
+    def start(self, actions: Iterable[RelayAction], clock=None) -> None:  # pragma: no cover - simple stub
         self.started_actions = list(actions)
 
     def stop(self) -> None:  # pragma: no cover - simple stub
@@ -79,25 +89,21 @@ def create_manager(tmp_path: Path, output: DummyOutput) -> DMXShowManager:
     return manager
 
 
-def test_relay_runner_triggers_urls_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_relay_runner_triggers_urls_in_order() -> None:
     triggered: List[str] = []
 
-    class DummyResponse:
-        def __enter__(self) -> "DummyResponse":  # pragma: no cover - simple stub
-            return self
+    class RecordingDispatcher:
+        def submit(self, action: RelayAction, on_done) -> None:  # pragma: no cover - simple stub
+            triggered.append(action.url)
+            on_done(action, True)
 
-        def __exit__(self, exc_type, exc, exc_tb) -> None:  # pragma: no cover - simple stub
-            return None
-
-        def read(self, _size: int = 1) -> bytes:  # pragma: no cover - simple stub
-            return b""
+        def cancel_pending(self) -> None:  # pragma: no cover - simple stub
+            pass
 
-    def fake_urlopen(request: object, timeout: float = 0.0) -> DummyResponse:
-        triggered.append(getattr(request, "full_url", ""))
-        return DummyResponse()
+        def lead_time(self, url: str) -> float:  # pragma: no cover - simple stub
+            return 0.0
 
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
-    runner = dmx.RelayCommandRunner()
+    runner = dmx.RelayCommandRunner(dispatcher=RecordingDispatcher())  # type: ignore[arg-type]
     actions = [
         RelayAction(time_seconds=0.0, url="http://example.invalid/on"),
         RelayAction(time_seconds=0.1, url="http://example.invalid/off"),
@@ -405,6 +411,32 @@ def test_preview_paused_stops_runner(tmp_path: Path) -> None:
     assert runner.started_actions == []
 
 
+def test_preview_seek_reuses_indexed_show(tmp_path: Path) -> None:
+    output = DummyOutput(channel_count=3)
+    manager = create_manager(tmp_path, output)
+    manager.update_baseline_levels([10, 20, 30])
+    assert manager.seek_preview(1.0) is False
+
+    raw_actions = [
+        {"time": "00:00:00", "channel": 1, "value": 200, "fade": 2},
+        {"time": "00:00:02", "channel": 2, "value": 100, "fade": 0},
+        {"time": "00:00:04", "channel": 3, "value": 0, "fade": 0},
+    ]
+    manager.start_preview(raw_actions, start_time=0.5)
+    runner: DummyRunner = manager.runner  # type: ignore[assignment]
+    index = runner.started_index
+    assert index is not None
+    assert runner.started_clock.position() >= 0.5
+
+    assert manager.seek_preview(2.5) is True
+    assert output.level_history[-1] == [200, 100, 30]
+    assert runner.started_index is index
+
+    manager.start_preview(raw_actions, start_time=1.0)
+    assert output.level_history[-1] == [105, 20, 30]
+    assert runner.started_index is index
+
+
 def test_expand_actions_with_template_loop_count(tmp_path: Path) -> None:
     output = DummyOutput(channel_count=4)
     manager = create_manager(tmp_path, output)
@@ -508,6 +540,90 @@ def test_expand_actions_with_template_loop_infinite_without_conflict(
     assert times == pytest.approx([0.0, 0.5, 1.0, 1.5, 2.0, 2.5])
 
 
+def test_loops_on_shared_channels_stop_at_the_next_instance(tmp_path: Path) -> None:
+    output = DummyOutput(channel_count=4)
+    manager = create_manager(tmp_path, output)
+
+    raw_actions = []
+    for instance, start in enumerate((0.0, 3.5, 6.0)):
+        raw_actions.append(
+            {
+                "time": manager.format_timecode(start),
+                "channel": 1,
+                "value": 100 + instance,
+                "fade": 0,
+                "templateInstanceId": f"loop-{instance}",
+                "templateLoop": {"enabled": True, "count": 10, "duration": 1.0},
+            }
+        )
+    # A repeat of the first instance on another channel must not cut it.
+    raw_actions.append(
+        {"time": "00:00:00.500", "channel": 2, "value": 9, "fade": 0, "templateInstanceId": "loop-0"}
+    )
+
+    expanded = manager._expand_actions_with_loops(raw_actions)
+    channel_one = [(round(a.time_seconds, 6), a.value) for a in expanded if a.channel == 1]
+    assert channel_one[:5] == [(0.0, 100), (1.0, 100), (2.0, 100), (3.0, 100), (3.5, 101)]
+    assert [t for t, value in channel_one if value == 101] == [3.5, 4.5, 5.5]
+    assert [t for t, value in channel_one if value == 102][:2] == [6.0, 7.0]
+
+
+def test_endless_loop_is_streamed_without_expansion(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    output = DummyOutput(channel_count=4)
+    manager = create_manager(tmp_path, output)
+
+    def fail_materialize(self: dmx.ShowProgram) -> List[DMXAction]:
+        raise AssertionError("endless loops must not be expanded for playback")
+
+    monkeypatch.setattr(dmx.ShowProgram, "materialize", fail_materialize)
+    template_path = tmp_path / "default_loop_dmx.json"
+    template_path.write_text(
+        json.dumps(
+            {
+                "actions": [
+                    {
+                        "time": "00:00:00",
+                        "channel": 1,
+                        "value": 255,
+                        "fade": 0,
+                        "templateInstanceId": "loop-1",
+                        "templateLoop": {"infinite": True, "mode": "pingpong", "duration": 1.0},
+                    },
+                    {
+                        "time": "00:00:00.250",
+                        "channel": 1,
+                        "value": 0,
+                        "fade": 0,
+                        "templateInstanceId": "loop-1",
+                    },
+                ]
+            }
+        )
+    )
+
+    manager.start_default_show(template_path)
+
+    runner: DummyRunner = manager.runner  # type: ignore[assignment]
+    program = runner.started_program
+    assert runner.started_timeline is None
+    assert program is not None and program.infinite
+    assert len(program.actions) == 2
+    late = list(itertools.islice(program.iter_actions(36000.0), 4))
+    assert [(round(a.time_seconds, 6), a.value) for a in late] == [
+        (36000.0, 255),
+        (36000.25, 0),
+        (36001.75, 0),
+        (36002.0, 255),
+    ]
+    assert manager.get_show_timeline(template_path) is None
+
+    video = {"id": "endless", "dmx_template": template_path.name}
+    manager.start_show_for_video(video)
+    assert runner.started_program is not None and runner.started_program.infinite
+
+
 def test_expand_actions_with_template_loop_pingpong(tmp_path: Path) -> None:
     output = DummyOutput(channel_count=4)
     manager = create_manager(tmp_path, output)
@@ -714,7 +830,7 @@ def test_dmx_output_continuous_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
         def fake_sender(payload: bytearray) -> None:
             frames.append(bytes(payload))
 
-        return fake_sender, None
+        return fake_sender, None, 0.0
 
     monkeypatch.setattr(dmx, "DMX_FPS", 80.0)
     monkeypatch.setattr(DMXOutput, "_build_sender", fake_build_sender, raising=False)
@@ -832,6 +948,17 @@ def test_create_manager_honours_startup_levels_env(monkeypatch: pytest.MonkeyPat
     assert output.applied == [(4, 10), (5, 99)]
 
 
+def test_startup_levels_reach_every_patched_universe() -> None:
+    output = DummyOutput(channel_count=1024)
+    output.patch = dmx.ChannelPatch([0, 1])  # type: ignore[attr-defined]
+    applied: List[tuple[int, int]] = []
+    output.set_channel = lambda channel, value: applied.append((channel, value))  # type: ignore[method-assign]
+
+    dmx._apply_startup_levels(output, "600=10,1:5=20,1025=30")  # type: ignore[arg-type]
+
+    assert applied == [(600, 10), (517, 20)]
+
+
 def test_create_manager_allows_disabling_startup_levels(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     class StartupOutput:
         def __init__(self, universe: int = 0, channel_count: int = dmx.DEFAULT_CHANNELS) -> None:
@@ -880,6 +1007,43 @@ def test_trigger_smoke_sets_channel_and_resets(tmp_path: Path) -> None:
     assert not manager.is_smoke_active()
 
 
+def test_smoke_burst_hands_the_channel_back_to_the_show(tmp_path: Path) -> None:
+    output = DMXOutput(channel_count=16)
+    manager = DMXShowManager(tmp_path, output, smoke_channel=10)
+    try:
+        output.set_levels([40] * 16)
+        manager.trigger_smoke(level=255, duration=0.05)
+        output.set_channel(10, 90)
+        assert output.get_channel(10) == 255
+        time.sleep(0.15)
+        assert not manager.is_smoke_active()
+        assert output.get_channel(10) == 90
+    finally:
+        output.shutdown()
+
+
+def test_fade_to_black_uses_the_grand_master_until_the_next_show(tmp_path: Path) -> None:
+    output = DMXOutput(channel_count=4)
+    manager = create_manager(tmp_path, output)
+    try:
+        output.set_levels([100, 100, 100, 100])
+        manager.fade_all_to_value(0, 0.05)
+        runner: DummyRunner = manager.runner  # type: ignore[assignment]
+        assert runner.stop_calls == 0
+        time.sleep(0.15)
+        assert output.get_output_levels() == [0, 0, 0, 0]
+        assert output.get_levels() == [100, 100, 100, 100]
+
+        manager.load_show_for_video = lambda _: [  # type: ignore[assignment]
+            DMXAction(time_seconds=0.0, channel=1, value=255, fade=0.0)
+        ]
+        manager.start_show_for_video({"id": "video"})
+        assert output.get_masters()["grand"] == 1.0
+        assert output.get_output_levels() == [255, 0, 0, 0]
+    finally:
+        output.shutdown()
+
+
 def test_trigger_smoke_requires_configured_channel(tmp_path: Path) -> None:
     output = SmokeOutput(channel_count=32)
     manager = DMXShowManager(tmp_path, output, smoke_channel=None)
@@ -888,3 +1052,352 @@ def test_trigger_smoke_requires_configured_channel(tmp_path: Path) -> None:
     with pytest.raises(RuntimeError):
         manager.trigger_smoke()
 
+
+def test_invalid_relay_rows_are_reported_as_relay_errors(tmp_path: Path) -> None:
+    manager = create_manager(tmp_path, DummyOutput(channel_count=4))
+    video = {"id": "broken_relay"}
+    manager.template_path_for_video(video).write_text(
+        json.dumps(
+            {
+                "actions": [{"time": "00:00:01", "channel": 1, "value": 200}],
+                "relay_actions": [{"time": "00:00:02"}],
+            }
+        )
+    )
+
+    with pytest.raises(RuntimeError, match="^Invalid relay action: .*'url'"):
+        manager.load_relay_actions_for_video(video)
+
+
+def test_compiled_show_is_cached_until_template_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    output = DummyOutput(channel_count=4)
+    manager = create_manager(tmp_path, output)
+    video = {"id": "cached_song"}
+    template_path = manager.template_path_for_video(video)
+    template_path.write_text(
+        json.dumps(
+            {
+                "actions": [{"time": "00:00:01", "channel": 1, "value": 200, "fade": 0}],
+                "relay_actions": [{"time": "00:00:02", "url": "http://example.invalid/on"}],
+            }
+        )
+    )
+
+    expand_calls: List[int] = []
+    original_compile = manager._compile_loops
+
+    def counting_compile(raw_actions):
+        expand_calls.append(1)
+        return original_compile(raw_actions)
+
+    monkeypatch.setattr(manager, "_compile_loops", counting_compile)
+
+    manager.warm_show_cache([video])
+    actions = manager.load_show_for_video(video)
+    relay_actions = manager.load_relay_actions_for_video(video)
+
+    assert len(expand_calls) == 1
+    assert [action.value for action in actions] == [200]
+    assert [action.url for action in relay_actions] == ["http://example.invalid/on"]
+
+    manager.save_template(
+        template_path,
+        actions=[{"time": "00:00:01", "channel": 1, "value": 50, "fade": 0}],
+        relay_actions=[],
+    )
+    actions = manager.load_show_for_video(video)
+
+    assert len(expand_calls) == 2
+    assert [action.value for action in actions] == [50]
+    assert manager.load_relay_actions_for_video(video) == []
+
+
+def test_bake_frame_timeline_matches_live_fade_semantics() -> None:
+    actions = [
+        DMXAction(time_seconds=0.0, channel=1, value=100, fade=0.0),
+        DMXAction(time_seconds=0.0, channel=2, value=200, fade=1.0),
+        DMXAction(time_seconds=0.5, channel=2, value=0, fade=0.5),
+    ]
+
+    timeline = dmx.bake_frame_timeline(actions, [0, 10, 20], fps=10.0)
+
+    assert timeline.frame_count == 11
+    assert timeline.row(0) == bytes([100, 10, 20])
+    # Halfway through the first fade the second action takes over from 105.
+    assert timeline.row(5)[1] == 105
+    assert timeline.row_at(0.8)[1] == 42
+    assert timeline.row(10) == bytes([100, 0, 20])
+
+
+def test_show_timeline_is_stored_next_to_template(tmp_path: Path) -> None:
+    output = DummyOutput(channel_count=4)
+    manager = create_manager(tmp_path, output)
+    video = {"id": "timeline_song", "dmx_template": "timeline_song.json"}
+    template_path = manager.template_path_for_video(video)
+    template_path.write_text(
+        json.dumps({"actions": [{"time": "00:00:01", "channel": 2, "value": 255, "fade": 1}]})
+    )
+
+    manager.start_show_for_video(video)
+
+    runner: DummyRunner = manager.runner  # type: ignore[assignment]
+    timeline = runner.started_timeline
+    assert timeline is not None
+    assert timeline.path is not None
+    assert timeline.path.parent == tmp_path
+    assert timeline.path.name.startswith("timeline_song.")
+    assert timeline.path.name.endswith(dmx.TIMELINE_SUFFIX)
+    assert timeline.row_at(1.5)[1] == 128
+    assert timeline.row(timeline.frame_count - 1) == bytes([0, 255, 0, 0])
+
+    reopened = dmx.open_frame_timeline(timeline.path)
+    assert reopened.frame_count == timeline.frame_count
+    assert reopened.row(45) == timeline.row(45)
+    reopened.close()
+
+    manager.save_template(
+        template_path,
+        actions=[{"time": "00:00:01", "channel": 3, "value": 90, "fade": 0}],
+    )
+    updated = manager.get_show_timeline(template_path)
+    assert updated is not None
+    assert updated.row(updated.frame_count - 1) == bytes([0, 0, 90, 0])
+    # The old timeline may still be playing: it stays mapped and on disk.
+    assert timeline.row(timeline.frame_count - 1) == bytes([0, 255, 0, 0])
+    assert timeline.path.exists()
+
+    stale_path = timeline.path
+    del timeline, updated
+    runner.started_timeline = None
+    gc.collect()
+    manager.save_template(
+        template_path,
+        actions=[{"time": "00:00:02", "channel": 4, "value": 60, "fade": 0}],
+    )
+    latest = manager.get_show_timeline(template_path)
+    assert latest is not None
+    assert not stale_path.exists()
+    assert list(tmp_path.glob(f"*{dmx.TIMELINE_SUFFIX}")) == [latest.path]
+
+
+def test_templates_accept_universe_qualified_channels(tmp_path: Path) -> None:
+    output = DummyOutput(channel_count=1024)
+    output.patch = dmx.ChannelPatch([0, 1])  # type: ignore[attr-defined]
+    manager = create_manager(tmp_path, output)
+    template_path = tmp_path / "multi.json"
+
+    manager.save_template(
+        template_path,
+        actions=[
+            {"time": "00:00:00", "channel": "1:5", "value": 200},
+            {"time": "00:00:01", "channel": 700, "value": 10},
+        ],
+    )
+
+    saved = json.loads(template_path.read_text(encoding="utf-8"))
+    assert [entry["channel"] for entry in saved["actions"]] == ["1:5", 700]
+    show = manager.get_compiled_show(template_path)
+    assert [action.channel for action in show.materialize()] == [517, 700]
+
+    with pytest.raises(ValueError):
+        manager.save_template(
+            template_path,
+            actions=[{"time": "00:00:00", "channel": "2:1", "value": 1}],
+        )
+
+
+def test_patch_template_journals_edits_by_action_id(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(dmx, "TEMPLATE_COMPACT_DELAY", 60.0)
+    output = DummyOutput(channel_count=4)
+    manager = create_manager(tmp_path, output)
+    template_path = tmp_path / "delta.json"
+    revision = manager.save_template(
+        template_path,
+        actions=[
+            {"id": "a", "time": "00:00:01", "channel": 1, "value": 10},
+            {"id": "b", "time": "00:00:02", "channel": 2, "value": 20},
+        ],
+    )
+    snapshot = template_path.read_text(encoding="utf-8")
+
+    revision, inserted = manager.patch_template(
+        template_path,
+        base_revision=revision,
+        operations=[
+            {"op": "insert", "action": {"id": "c", "time": "00:00:00.500", "channel": 3, "value": 30}},
+            {"op": "update", "id": "a", "action": {"value": 99}},
+            {"op": "delete", "id": "b"},
+        ],
+    )
+
+    assert inserted == ["c"]
+    assert template_path.read_text(encoding="utf-8") == snapshot
+    assert manager.journal_path_for_template(template_path).exists()
+    document = manager.load_template_document(template_path)
+    assert document["revision"] == revision
+    assert [(entry["id"], entry["value"]) for entry in document["actions"]] == [("c", 30), ("a", 99)]
+    show = manager.get_compiled_show(template_path)
+    assert [(action.channel, action.value) for action in show.materialize()] == [(3, 30), (1, 99)]
+
+    with pytest.raises(dmx.TemplateConflictError):
+        manager.patch_template(template_path, base_revision=revision - 1, operations=[])
+    with pytest.raises(ValueError):
+        manager.patch_template(
+            template_path, base_revision=revision, operations=[{"op": "delete", "id": "b"}]
+        )
+    assert manager.load_template_document(template_path)["revision"] == revision
+
+
+def test_template_document_finds_ids_among_equal_times() -> None:
+    document = dmx.TemplateDocument.from_payload(
+        {
+            "actions": [
+                {"id": name, "time": "00:00:01", "channel": index + 1, "value": index}
+                for index, name in enumerate("abcd")
+            ]
+        }
+    )
+    document.insert({"id": "e", "time": "00:00:00.500", "channel": 5, "value": 5})
+
+    assert document.remove("c")["channel"] == 3
+    assert document.contains("e") and not document.contains("c")
+    assert document.get("d")["value"] == 3
+    copied = document.copy()
+    copied.remove("a")
+    assert [entry["id"] for entry in document.actions] == ["e", "a", "b", "d"]
+    assert [entry["id"] for entry in copied.actions] == ["e", "b", "d"]
+    with pytest.raises(ValueError):
+        document.remove("c")
+
+
+def test_template_journal_is_replayed_and_compacted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(dmx, "TEMPLATE_COMPACT_DELAY", 60.0)
+    template_path = tmp_path / "journal.json"
+    template_path.write_text(
+        json.dumps({"actions": [{"time": "00:00:01", "channel": 1, "value": 5}]})
+    )
+    manager = create_manager(tmp_path, DummyOutput(channel_count=4))
+    legacy_id = manager.load_template_document(template_path)["actions"][0]["id"]
+    manager.patch_template(
+        template_path,
+        base_revision=0,
+        operations=[{"op": "update", "id": legacy_id, "action": {"value": 6}}],
+    )
+
+    restarted = create_manager(tmp_path, DummyOutput(channel_count=4))
+    document = restarted.load_template_document(template_path)
+    assert document["revision"] == 1
+    assert document["actions"][0]["value"] == 6
+
+    restarted.compact_template(template_path)
+    assert not restarted.journal_path_for_template(template_path).exists()
+    saved = json.loads(template_path.read_text(encoding="utf-8"))
+    assert saved["revision"] == 1
+    assert saved["actions"] == [
+        {"id": legacy_id, "time": "00:00:01", "channel": 1, "value": 6, "fade": 0.0}
+    ]
+
+
+def test_seeking_the_video_back_replays_cues_and_relays(tmp_path: Path) -> None:
+    class LevelOutput(DummyOutput):
+        def __init__(self) -> None:
+            super().__init__(channel_count=2)
+            self.levels = [0, 0]
+
+        def set_levels(self, levels: Iterable[int]) -> None:
+            self.levels = list(levels)
+            self.level_history.append(list(levels))
+
+        def get_levels(self) -> List[int]:
+            return list(self.levels)
+
+        def transition_channel(self, channel, value, duration, stop_event=None) -> None:
+            self.levels[channel - 1] = value
+
+    relays: List[float] = []
+
+    class RecordingDispatcher:
+        def submit(self, action: RelayAction, on_done) -> None:
+            relays.append(action.time_seconds)
+            on_done(action, True)
+
+        def cancel_pending(self) -> None:
+            pass
+
+        def lead_time(self, url: str) -> float:
+            return 0.0
+
+    output = LevelOutput()
+    manager = DMXShowManager(tmp_path, output, smoke_channel=None)  # type: ignore[arg-type]
+    manager.relay_runner = dmx.RelayCommandRunner(
+        scheduler=manager.scheduler, dispatcher=RecordingDispatcher()  # type: ignore[arg-type]
+    )
+    video = {"id": "seek_song", "dmx_template": "seek_song.json"}
+    manager.template_path_for_video(video).write_text(
+        json.dumps(
+            {
+                "actions": [
+                    {"time": "00:00:00", "channel": 1, "value": 100},
+                    {"time": "00:00:00.200", "channel": 1, "value": 200},
+                ],
+                "relay_actions": [{"time": "00:00:00.100", "url": "http://relay.invalid/on"}],
+            }
+        )
+    )
+
+    manager.start_show_for_video(video, follow_playback=True)
+    try:
+        manager.sync_show_clock(0.0)
+        deadline = time.monotonic() + 1.0
+        while (output.levels[0] != 200 or not relays) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert output.levels[0] == 200 and relays == [0.1]
+
+        manager.sync_show_clock(0.05)
+        assert output.levels[0] == 100
+        while len(relays) < 2 and time.monotonic() < deadline + 1.0:
+            time.sleep(0.01)
+        assert relays == [0.1, 0.1]
+    finally:
+        manager.stop_show()
+
+
+def test_seeking_the_video_back_after_a_timeline_show_ended(tmp_path: Path) -> None:
+    output = DMXOutput(channel_count=2)
+    manager = DMXShowManager(tmp_path, output, smoke_channel=None)
+    video = {"id": "ended_song", "dmx_template": "ended_song.json"}
+    manager.template_path_for_video(video).write_text(
+        json.dumps(
+            {
+                "actions": [
+                    {"time": "00:00:00", "channel": 1, "value": 100},
+                    {"time": "00:00:00.100", "channel": 1, "value": 200},
+                ]
+            }
+        )
+    )
+
+    manager.start_show_for_video(video, follow_playback=True)
+    try:
+        manager.sync_show_clock(0.0)
+        # The song runs on after the show's last cue.
+        time.sleep(0.4)
+        assert output._timeline is None
+        assert output.get_levels() == [200, 0]
+
+        manager.sync_show_clock(0.0)
+        time.sleep(0.05)
+        assert output.get_levels() == [100, 0]
+        deadline = time.monotonic() + 1.0
+        while output.get_levels()[0] != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert output.get_levels() == [200, 0]
+    finally:
+        manager.stop_show()
+        output.shutdown()
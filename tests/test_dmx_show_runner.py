@@ -1,6 +1,10 @@
 import threading
+import time
 
-from dmx import DMXAction, DMXShowRunner
+import pytest
+
+import dmx
+from dmx import CueScheduler, DMXAction, DMXShowRunner, ShowClock, ShowIndex
 
 
 class ImmediateOutput:
@@ -26,3 +30,215 @@ def test_start_replaces_running_show_without_deadlock() -> None:
     assert not thread.is_alive(), "runner.start() should not deadlock when restarting a show"
 
     runner.stop()
+
+
+def test_show_clock_locks_on_and_slews_small_drift(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(dmx.time, "monotonic", lambda: now[0])
+    clock = ShowClock()
+
+    now[0] = 100.5
+    assert clock.position() == 0.5
+    # The first report locks onto the video even if that moves it back.
+    clock.sync(0.3)
+    assert clock.locked
+    assert clock.position() == 0.3
+    now[0] = 100.8
+    assert abs(clock.position() - 0.6) < 1e-9
+
+    # Small drift is corrected gradually and never runs the clock backwards.
+    clock.sync(0.7)
+    assert abs(clock.position() - 0.61) < 1e-9
+    clock.sync(0.5)
+    assert abs(clock.position() - 0.61) < 1e-9
+    # Large jumps (seeks) are adopted at once; only backward ones need a replay.
+    assert not clock.sync(5.0)
+    assert clock.position() == 5.0
+    assert clock.sync(2.0)
+    assert clock.position() == 2.0
+    clock.sync(5.0)
+
+    clock.set_paused(True)
+    now[0] = 102.0
+    assert clock.position() == 5.0
+
+
+def test_runner_follows_clock_corrections() -> None:
+    output = ImmediateOutput()
+    runner = DMXShowRunner(output)
+    clock = ShowClock()
+
+    runner.start([DMXAction(time_seconds=30.0, channel=1, value=255, fade=0.0)], clock=clock)
+    time.sleep(0.05)
+    assert output.calls == []
+
+    clock.sync(30.0)
+    deadline = time.monotonic() + 1.0
+    while not output.calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    runner.stop()
+
+    assert output.calls == [(1, 255, 0.0)]
+
+
+class LevelOutput(ImmediateOutput):
+    def __init__(self, channel_count: int = 4) -> None:
+        super().__init__()
+        self.channel_count = channel_count
+        self.levels = [0] * channel_count
+
+    def set_levels(self, levels) -> None:
+        self.levels = list(levels)
+
+    def get_levels(self):
+        return list(self.levels)
+
+
+def test_show_index_matches_a_linear_replay() -> None:
+    actions = [
+        DMXAction(time_seconds=i * 0.25, channel=i % 3 + 1, value=(i * 37) % 256, fade=(i % 4) * 0.3)
+        for i in range(200)
+    ]
+    index = ShowIndex(actions, [5, 6, 7], interval=16)
+    timeline = dmx.bake_frame_timeline(actions, [5, 6, 7], fps=4)
+    for frame in (0, 1, 13, 68, 100, 199, 240):
+        seconds = frame / 4
+        state = index.state_at(seconds)
+        assert bytes(state.levels) == timeline.row(frame)
+        assert state.cursor == min(frame + 1, len(actions))
+
+    state = index.state_at(0.3)
+    # The fade started at 0.25 on channel 2 still has 0.25s to run.
+    assert [(channel, target) for channel, target, _ in state.fades] == [(2, 37)]
+    assert abs(state.fades[0][2] - 0.25) < 1e-9
+
+
+
+def test_curved_fades_match_between_index_and_timeline() -> None:
+    curves = list(dmx.FADE_CURVES)
+    actions = [
+        DMXAction(
+            time_seconds=i * 0.5,
+            channel=i % 2 + 1,
+            value=(i * 97) % 256,
+            fade=(i % 3) * 0.75,
+            curve=curves[i % len(curves)],
+        )
+        for i in range(60)
+    ]
+    index = ShowIndex(actions, [0, 255], interval=8)
+    timeline = dmx.bake_frame_timeline(actions, [0, 255], fps=8)
+    for frame in range(timeline.frame_count):
+        assert bytes(index.state_at(frame / 8).levels) == timeline.row(frame)
+
+    ease_in = DMXAction.from_dict(
+        {"time": "00:00:00", "channel": 1, "value": 200, "fade": 2, "curve": "Ease-In"}
+    )
+    assert ease_in.curve == "ease-in"
+    state = ShowIndex([ease_in], [0]).state_at(1.0)
+    assert state.levels == [50]
+    assert state.fade_origins == [(0, 1.0, "ease-in")]
+    with pytest.raises(ValueError):
+        DMXAction.from_dict({"time": "00:00:00", "channel": 1, "value": 1, "curve": "bounce"})
+
+
+def test_runner_seek_pause_and_resume() -> None:
+    output = LevelOutput(channel_count=2)
+    runner = DMXShowRunner(output)
+    actions = [
+        DMXAction(time_seconds=0.0, channel=1, value=100, fade=0.0),
+        DMXAction(time_seconds=10.0, channel=1, value=200, fade=4.0),
+        DMXAction(time_seconds=30.0, channel=2, value=50, fade=0.0),
+    ]
+    index = ShowIndex(actions, [0, 0])
+    runner.start(actions, index=index)
+    try:
+        assert runner.seek(12.0)
+        assert output.levels == [150, 0]
+        assert output.calls[-1] == (1, 200, 2.0)
+
+        runner.pause()
+        calls = len(output.calls)
+        assert runner.seek(20.0)
+        assert output.levels == [200, 0]
+        assert len(output.calls) == calls
+
+        assert runner.seek(29.98)
+        runner.resume()
+        deadline = time.monotonic() + 1.0
+        while (2, 50, 0.0) not in output.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert (2, 50, 0.0) in output.calls
+        assert 29.9 < runner.position() < 31.0
+    finally:
+        runner.stop()
+    assert not runner.seek(1.0)
+
+
+def test_seeking_back_replays_a_timeline_that_has_ended() -> None:
+    output = dmx.DMXOutput(channel_count=2)
+    runner = DMXShowRunner(output)
+    actions = [
+        DMXAction(time_seconds=0.0, channel=1, value=100, fade=0.0),
+        DMXAction(time_seconds=0.1, channel=1, value=200, fade=0.0),
+    ]
+    timeline = dmx.bake_frame_timeline(actions, [0, 0], fps=40)
+    runner.start(actions, timeline)
+    try:
+        deadline = time.monotonic() + 1.0
+        while output._timeline is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert output._timeline is None
+        assert output.get_levels() == [200, 0]
+
+        assert runner.seek(0.0)
+        time.sleep(0.05)
+        assert output.get_levels() == [100, 0]
+        deadline = time.monotonic() + 1.0
+        while output.get_levels()[0] != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert output.get_levels() == [200, 0]
+    finally:
+        runner.stop()
+        output.shutdown()
+
+
+def test_cue_scheduler_merges_lanes_and_seeks_them_together() -> None:
+    scheduler = CueScheduler()
+    fired = []
+
+    def lane(name, times):
+        def source(position):
+            return (
+                (t, lambda t=t: fired.append((name, t)))
+                for t in times
+                if t >= position - dmx.CUE_START_TOLERANCE
+            )
+
+        return source
+
+    clock = ShowClock(0.0)
+    clock.set_paused(True)
+    scheduler.set_lane("dmx", lane("dmx", [0.0, 0.02, 5.0]), clock=clock)
+    scheduler.set_lane("relay", lane("relay", [0.01, 5.01]))
+    cancelled = scheduler.call_later(0.01, lambda: fired.append(("timer", "cancelled")))
+    scheduler.call_later(0.02, lambda: fired.append(("timer", "smoke")))
+    scheduler.cancel(cancelled)
+    clock.set_paused(False)
+
+    deadline = time.monotonic() + 1.0
+    while len(fired) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(fired[:3], key=str) == [("dmx", 0.0), ("dmx", 0.02), ("relay", 0.01)]
+    assert ("timer", "smoke") in fired
+    assert ("timer", "cancelled") not in fired
+
+    fired.clear()
+    scheduler.seek(4.99)
+    while len(fired) < 2 and time.monotonic() < deadline + 1.0:
+        time.sleep(0.01)
+    assert fired == [("dmx", 5.0), ("relay", 5.01)]
+
+    scheduler.clear_lane("dmx")
+    scheduler.clear_lane("relay")
+    assert not scheduler.has_lane("dmx")
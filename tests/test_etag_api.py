@@ -0,0 +1,141 @@
+import sys
+from pathlib import Path
+from types import MethodType, ModuleType, SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:  # pragma: no branch - import fallback is deterministic
+    import flask  # type: ignore  # noqa: F401
+except ModuleNotFoundError:  # pragma: no cover - environment dependent
+    flask_stub = ModuleType("flask")
+
+    class _DummyFlask:
+        def __init__(self, *args, **kwargs) -> None:  # pragma: no cover - trivial
+            pass
+
+        def route(self, *args, **kwargs):  # pragma: no cover - trivial
+            def decorator(func):
+                return func
+
+            return decorator
+
+    def _unsupported(*args, **kwargs):  # pragma: no cover - trivial
+        raise RuntimeError("Flask is not available in the test environment")
+
+    flask_stub.Flask = _DummyFlask
+    flask_stub.abort = _unsupported
+    flask_stub.jsonify = _unsupported
+    flask_stub.redirect = _unsupported
+    flask_stub.render_template = _unsupported
+    flask_stub.request = SimpleNamespace()
+    flask_stub.send_from_directory = _unsupported
+    sys.modules.setdefault("flask", flask_stub)
+
+import app
+import json
+
+
+class _ControllerStub:
+    def __init__(self) -> None:
+        self.state = {"is_default": True, "current": None, "position": None}
+
+    def query_state(self):
+        return dict(self.state)
+
+
+def test_preset_revalidation_skips_loading_until_file_changes(monkeypatch, tmp_path):
+    presets_file = tmp_path / "channel_presets.json"
+    presets_file.write_text(json.dumps({"presets": []}), encoding="utf-8")
+    monkeypatch.setattr(app, "CHANNEL_PRESETS_FILE", presets_file)
+    client = app.app.test_client()
+
+    first = client.get("/api/channel-presets")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    def _fail() -> None:
+        raise AssertionError("presets should not be reloaded")
+
+    monkeypatch.setattr(app, "load_channel_presets_from_disk", _fail)
+    cached = client.get("/api/channel-presets", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.data == b""
+
+    monkeypatch.undo()
+    monkeypatch.setattr(app, "CHANNEL_PRESETS_FILE", presets_file)
+    presets_file.write_text(
+        json.dumps({"presets": [{"name": "Front Wash", "channel": 4}]}), encoding="utf-8"
+    )
+    changed = client.get("/api/channel-presets", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["presets"][0]["name"] == "Front Wash"
+
+
+def test_status_etag_follows_payload(monkeypatch):
+    controller = _ControllerStub()
+    monkeypatch.setattr(app, "controller", controller)
+    monkeypatch.setattr(app, "user_registry", app.UserRegistry())
+    monkeypatch.setattr(app, "queue_manager", app.QueueManager(app.user_registry))
+    client = app.app.test_client()
+
+    first = client.get("/api/status")
+    etag = first.headers["ETag"]
+    assert client.get("/api/status", headers={"If-None-Match": etag}).status_code == 304
+
+    controller.state = {"is_default": False, "current": "/media/song.mp4", "position": 2.0}
+    changed = client.get("/api/status", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["mode"] == "video"
+
+
+def test_status_etag_ignores_sub_second_position(monkeypatch):
+    controller = _ControllerStub()
+    monkeypatch.setattr(app, "controller", controller)
+    monkeypatch.setattr(app, "user_registry", app.UserRegistry())
+    monkeypatch.setattr(app, "queue_manager", app.QueueManager(app.user_registry))
+    client = app.app.test_client()
+
+    controller.state = {"is_default": False, "current": "/media/song.mp4", "position": 12.1}
+    first = client.get("/api/status")
+    assert first.get_json()["position"] == 12.1
+    etag = first.headers["ETag"]
+
+    controller.state["position"] = 12.9
+    assert client.get("/api/status", headers={"If-None-Match": etag}).status_code == 304
+    controller.state["position"] = 13.05
+    changed = client.get("/api/status", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["position"] == 13.05
+
+
+def test_preset_etag_follows_store_replace_with_unchanged_stat(monkeypatch, tmp_path):
+    presets_file = tmp_path / "color_presets.json"
+    monkeypatch.setattr(app, "COLOR_PRESETS_FILE", presets_file)
+    # Simulate a rewrite that lands within the file system's timestamp
+    # granularity: the stat signature never changes.
+    monkeypatch.setattr(app, "_file_version", lambda path: (str(path), 1, 1, 1))
+    client = app.app.test_client()
+
+    etag = client.get("/api/color-presets").headers["ETag"]
+    app.color_preset_store.replace(
+        [{"id": "c1", "name": "Only", "iconColor": "#000000", "red": 0, "green": 0, "blue": 0}]
+    )
+    changed = client.get("/api/color-presets", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert [preset["id"] for preset in changed.get_json()["presets"]] == ["c1"]
+
+
+def test_queue_status_revalidates(monkeypatch):
+    monkeypatch.setattr(app, "controller", _ControllerStub())
+    monkeypatch.setattr(app, "user_registry", app.UserRegistry())
+    monkeypatch.setattr(app, "queue_manager", app.QueueManager(app.user_registry))
+    client = app.app.test_client()
+
+    etag = client.get("/api/queue/status").headers["ETag"]
+    response = client.get("/api/queue/status", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+from types import MethodType, ModuleType, SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:  # pragma: no branch - import fallback is deterministic
+    import flask  # type: ignore  # noqa: F401
+except ModuleNotFoundError:  # pragma: no cover - environment dependent
+    flask_stub = ModuleType("flask")
+
+    class _DummyFlask:
+        def __init__(self, *args, **kwargs) -> None:  # pragma: no cover - trivial
+            pass
+
+        def route(self, *args, **kwargs):  # pragma: no cover - trivial
+            def decorator(func):
+                return func
+
+            return decorator
+
+    def _unsupported(*args, **kwargs):  # pragma: no cover - trivial
+        raise RuntimeError("Flask is not available in the test environment")
+
+    flask_stub.Flask = _DummyFlask
+    flask_stub.abort = _unsupported
+    flask_stub.jsonify = _unsupported
+    flask_stub.redirect = _unsupported
+    flask_stub.render_template = _unsupported
+    flask_stub.request = SimpleNamespace()
+    flask_stub.send_from_directory = _unsupported
+    sys.modules.setdefault("flask", flask_stub)
+
+import app
+import json
+
+
+class _ControllerStub:
+    def __init__(self) -> None:
+        self.state = {"is_default": True, "current": None, "position": None}
+        self.queries = 0
+
+    def query_state(self):
+        self.queries += 1
+        return dict(self.state)
+
+
+def _next_event(stream):
+    while True:
+        chunk = next(stream)
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8")
+        if chunk.startswith("event:"):
+            header, data = chunk.strip().split("\n", 1)
+            return header[len("event: "):], json.loads(data[len("data: "):])
+
+
+def _setup(monkeypatch):
+    registry = app.UserRegistry()
+    manager = app.QueueManager(registry)
+    manager._access_code = "4321"
+    controller = _ControllerStub()
+    broadcaster = app.StatusBroadcaster(app._sample_stage_state, interval=0.02)
+    monkeypatch.setattr(app, "user_registry", registry)
+    monkeypatch.setattr(app, "queue_manager", manager)
+    monkeypatch.setattr(app, "controller", controller)
+    monkeypatch.setattr(app, "status_broadcaster", broadcaster)
+    return registry, manager, controller
+
+
+def test_event_stream_pushes_status_and_queue_changes(monkeypatch):
+    _, manager, controller = _setup(monkeypatch)
+
+    response = app.app.test_client().get("/api/events")
+    assert response.mimetype == "text/event-stream"
+    stream = iter(response.response)
+    try:
+        name, payload = _next_event(stream)
+        assert name == "status" and payload["mode"] == "default_loop"
+        name, payload = _next_event(stream)
+        assert name == "queue" and payload["queue_size"] == 0
+
+        manager.join("4321", existing_id=None, is_playing=False)
+        name, payload = _next_event(stream)
+        assert name == "queue" and payload["queue_size"] == 1
+
+        controller.state = {"is_default": False, "current": "/media/song.mp4", "position": 3.4}
+        name, payload = _next_event(stream)
+        assert name == "status"
+        assert payload["mode"] == "video" and payload["position"] == 3.0
+    finally:
+        response.close()
+
+
+def test_event_stream_shares_one_producer_between_clients(monkeypatch):
+    registry, _, controller = _setup(monkeypatch)
+    admin = registry.register(is_admin=True)
+    client = app.app.test_client()
+
+    first = client.get("/api/events", query_string={"key": admin["key"]})
+    second = client.get("/api/events", query_string={"key": admin["key"]})
+    streams = [iter(first.response), iter(second.response)]
+    try:
+        for stream in streams:
+            assert _next_event(stream)[0] == "status"
+            name, payload = _next_event(stream)
+            assert name == "stage_code" and payload == {"code": "4321"}
+
+        queries_before = controller.queries
+        app.time.sleep(0.2)
+        # Roughly one sample per interval regardless of the client count.
+        assert controller.queries - queries_before <= 15
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,159 @@
+import json
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mpv_ipc import MpvIpcClient
+
+
+class FakeMpvServer:
+    """Minimal mpv IPC server that replies to requests in reverse order."""
+
+    def __init__(self, path: str, batch: int = 1) -> None:
+        self.path = path
+        self.batch = batch
+        self.connections = 0
+        self.requests: List[Dict[str, Any]] = []
+        self.properties: Dict[str, Any] = {"pause": False, "volume": 70.0}
+        self._server = socket.socket(socket.AF_UNIX)
+        self._server.bind(path)
+        self._server.listen()
+        self._clients: List[socket.socket] = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._clients.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        buffer = b""
+        waiting: List[Dict[str, Any]] = []
+        with conn:
+            while True:
+                try:
+                    chunk = conn.recv(4096)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+                buffer += chunk
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    message = json.loads(line)
+                    self.requests.append(message)
+                    waiting.append(message)
+                    if len(waiting) < self.batch:
+                        continue
+                    for pending in reversed(waiting):
+                        conn.sendall(json.dumps(self._reply(pending)).encode() + b"\n")
+                    waiting.clear()
+
+    def _reply(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        command = message["command"]
+        reply: Dict[str, Any] = {"request_id": message["request_id"], "error": "success"}
+        if command[0] == "get_property":
+            if command[1] in self.properties:
+                reply["data"] = self.properties[command[1]]
+            else:
+                reply["error"] = "property unavailable"
+        return reply
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        for conn in list(self._clients):
+            try:
+                conn.sendall(json.dumps(event).encode() + b"\n")
+            except OSError:
+                pass
+
+    def drop_clients(self) -> None:
+        for conn in self._clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._clients.clear()
+
+    def close(self) -> None:
+        self.drop_clients()
+        self._server.close()
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are length limited, so avoid pytest's deep tmp_path.
+    with tempfile.TemporaryDirectory() as directory:
+        yield str(Path(directory) / "mpv.sock")
+
+
+def test_replies_are_matched_by_request_id(socket_path: str) -> None:
+    server = FakeMpvServer(socket_path, batch=2)
+    client = MpvIpcClient(socket_path)
+    try:
+        first = client.request("get_property", "pause")
+        second = client.request("get_property", "volume")
+        assert client.wait(second)["data"] == 70.0
+        assert client.wait(first)["data"] is False
+        assert server.connections == 1
+        server.batch = 1
+        assert client.command("set_property", "pause", "no")["error"] == "success"
+        assert server.connections == 1
+    finally:
+        client.close()
+        server.close()
+
+
+def test_events_are_delivered_to_subscribers(socket_path: str) -> None:
+    server = FakeMpvServer(socket_path)
+    client = MpvIpcClient(socket_path)
+    received: List[Dict[str, Any]] = []
+    client.subscribe(received.append)
+    try:
+        client.command("get_property", "pause")
+        server.emit({"event": "end-file", "reason": "eof"})
+        deadline = time.monotonic() + 1.0
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert received == [{"event": "end-file", "reason": "eof"}]
+    finally:
+        client.close()
+        server.close()
+
+
+def test_reconnects_after_connection_drop(socket_path: str) -> None:
+    server = FakeMpvServer(socket_path)
+    client = MpvIpcClient(socket_path)
+    connects: List[int] = []
+    client.add_connect_listener(lambda: connects.append(1))
+    try:
+        client.command("get_property", "pause")
+        server.drop_clients()
+        deadline = time.monotonic() + 1.0
+        while client.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.command("get_property", "volume")["data"] == 70.0
+        assert server.connections == 2
+        time.sleep(0.05)
+        assert len(connects) == 2
+    finally:
+        client.close()
+        server.close()
+
+
+def test_missing_socket_raises_oserror(socket_path: str) -> None:
+    client = MpvIpcClient(socket_path)
+    with pytest.raises(OSError):
+        client.command("get_property", "pause")
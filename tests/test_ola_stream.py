@@ -0,0 +1,172 @@
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dmx
+from dmx import OLAStreamClient
+
+
+class FakeOlaServer:
+    """Stand-in for olad that records frames and acknowledges them late."""
+
+    def __init__(self, ack_delay: float = 0.0) -> None:
+        self.ack_delay = ack_delay
+        self.frames: List[bytes] = []
+        self.max_outstanding = 0
+        self.connections = 0
+        self.fail_connections = 0
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self.wrappers: List["FakeClientWrapper"] = []
+
+    def connect(self) -> "FakeClientWrapper":
+        with self._lock:
+            if self.fail_connections:
+                self.fail_connections -= 1
+                raise OSError("olad not running")
+            self.connections += 1
+        wrapper = FakeClientWrapper(self)
+        self.wrappers.append(wrapper)
+        return wrapper
+
+    def receive(self, wrapper: "FakeClientWrapper", data: Any, callback: Callable) -> None:
+        with self._lock:
+            self.frames.append(bytes(data))
+            self._outstanding += 1
+            self.max_outstanding = max(self.max_outstanding, self._outstanding)
+
+        def _ack() -> None:
+            with self._lock:
+                self._outstanding -= 1
+            wrapper.Execute(lambda: callback(FakeRequestStatus(True)))
+
+        timer = threading.Timer(self.ack_delay, _ack)
+        timer.daemon = True
+        timer.start()
+
+
+class FakeRequestStatus:
+    def __init__(self, ok: bool) -> None:
+        self._ok = ok
+
+    def Succeeded(self) -> bool:
+        return self._ok
+
+
+class FakeOlaClient:
+    def __init__(self, server: FakeOlaServer, wrapper: "FakeClientWrapper") -> None:
+        self._server = server
+        self._wrapper = wrapper
+
+    def SendDmx(self, universe: int, data: Any, callback: Callable) -> bool:
+        assert hasattr(data, "tobytes")
+        self._server.receive(self._wrapper, data, callback)
+        return True
+
+
+class FakeClientWrapper:
+    """Mimics ``ola.ClientWrapper.ClientWrapper`` with a queue-driven loop."""
+
+    def __init__(self, server: FakeOlaServer) -> None:
+        self._client = FakeOlaClient(server, self)
+        self._events: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self._running = False
+
+    def Client(self) -> FakeOlaClient:
+        return self._client
+
+    def Execute(self, func: Callable[[], None]) -> None:
+        self._events.put(func)
+
+    def Run(self) -> None:
+        self._running = True
+        while self._running:
+            func = self._events.get()
+            if func is None:
+                break
+            func()
+
+    def Stop(self) -> None:
+        self._running = False
+        self._events.put(None)
+
+
+def _wait_until(predicate: Callable[[], bool], timeout: float = 1.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_submit_does_not_wait_for_acknowledgement() -> None:
+    server = FakeOlaServer(ack_delay=0.5)
+    client = OLAStreamClient(1, wrapper_factory=server.connect)
+    try:
+        assert client.wait_connected(1.0)
+        start = time.monotonic()
+        for value in range(1, 6):
+            client.submit(bytearray([value] * 4))
+            time.sleep(0.02)
+        assert time.monotonic() - start < 0.3
+        assert len(server.frames) == 2
+        assert server.max_outstanding == 2
+        assert _wait_until(lambda: server.frames[-1] == bytes([5] * 4))
+    finally:
+        client.close()
+
+
+def test_backpressure_keeps_only_newest_frame() -> None:
+    server = FakeOlaServer(ack_delay=0.2)
+    client = OLAStreamClient(1, wrapper_factory=server.connect, max_in_flight=1)
+    try:
+        assert client.wait_connected(1.0)
+        for value in range(1, 6):
+            client.submit(bytearray([value] * 4))
+            time.sleep(0.02)
+        assert _wait_until(lambda: len(server.frames) == 2)
+        assert server.frames[0] == bytes([1] * 4)
+        assert server.frames[-1] == bytes([5] * 4)
+        assert _wait_until(lambda: client.get_stats()["frames_acked"] == 2)
+        stats = client.get_stats()
+        assert stats["frames_dropped"] == 3
+        assert stats["in_flight"] == 0
+    finally:
+        client.close()
+
+
+def test_reconnects_and_resends_pending_frame() -> None:
+    server = FakeOlaServer()
+    server.fail_connections = 1
+    client = OLAStreamClient(1, wrapper_factory=server.connect, reconnect_delay=0.01)
+    try:
+        client.submit(bytearray([9, 9]))
+        assert client.wait_connected(1.0)
+        assert _wait_until(lambda: server.frames == [bytes([9, 9])])
+
+        server.wrappers[-1].Stop()
+        assert _wait_until(lambda: server.connections == 2)
+        client.submit(bytearray([7, 7]))
+        assert _wait_until(lambda: server.frames[-1] == bytes([7, 7]))
+    finally:
+        client.close()
+
+
+def test_output_streams_through_ola_client(monkeypatch) -> None:
+    server = FakeOlaServer(ack_delay=0.01)
+    monkeypatch.delenv("DMX_SERIAL_PORT", raising=False)
+    monkeypatch.delenv("DMX_SERIAL_NUMBER", raising=False)
+    monkeypatch.setattr(dmx, "ClientWrapper", server.connect)
+    output = dmx.DMXOutput(channel_count=4)
+    try:
+        output.set_channel(2, 128)
+        assert _wait_until(lambda: any(frame[1] == 128 for frame in server.frames))
+    finally:
+        output.shutdown()
+    assert not any(wrapper._running for wrapper in server.wrappers)
@@ -0,0 +1,221 @@
+import sys
+from pathlib import Path
+from types import MethodType, ModuleType, SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:  # pragma: no branch - import fallback is deterministic
+    import flask  # type: ignore  # noqa: F401
+except ModuleNotFoundError:  # pragma: no cover - environment dependent
+    flask_stub = ModuleType("flask")
+
+    class _DummyFlask:
+        def __init__(self, *args, **kwargs) -> None:  # pragma: no cover - trivial
+            pass
+
+        def route(self, *args, **kwargs):  # pragma: no cover - trivial
+            def decorator(func):
+                return func
+
+            return decorator
+
+    def _unsupported(*args, **kwargs):  # pragma: no cover - trivial
+        raise RuntimeError("Flask is not available in the test environment")
+
+    flask_stub.Flask = _DummyFlask
+    flask_stub.abort = _unsupported
+    flask_stub.jsonify = _unsupported
+    flask_stub.redirect = _unsupported
+    flask_stub.render_template = _unsupported
+    flask_stub.request = SimpleNamespace()
+    flask_stub.send_from_directory = _unsupported
+    sys.modules.setdefault("flask", flask_stub)
+
+import app
+import threading
+import time
+
+
+class _DummyProcess:
+    def poll(self) -> None:
+        return None
+
+
+def _make_controller(monkeypatch, tmp_path, **kwargs):
+    monkeypatch.setattr(app.shutil, "which", lambda name: name)
+    media = tmp_path / "media"
+    media.mkdir()
+    default_video = media / "default.mp4"
+    default_video.write_bytes(b"data")
+    controller = app.PlaybackController(default_video=default_video, **kwargs)
+    controller._process = _DummyProcess()
+    commands = []
+
+    def fake_send_ipc_command(*command):
+        commands.append(command)
+        return {"error": "success"}
+
+    monkeypatch.setattr(controller, "_send_ipc_command", fake_send_ipc_command)
+    return controller, commands
+
+
+def _wait_for(predicate, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_video_start_fires_when_main_file_loads_after_pre_roll(monkeypatch, tmp_path):
+    started = []
+    fired = threading.Event()
+
+    def on_video_start(path):
+        started.append(path)
+        fired.set()
+
+    warning = tmp_path / "warning.mp4"
+    warning.write_bytes(b"data")
+    controller, _ = _make_controller(
+        monkeypatch, tmp_path, on_video_start=on_video_start, warning_video=warning
+    )
+    video = tmp_path / "song.mp4"
+    video.write_bytes(b"data")
+
+    controller.play(video)
+    controller._handle_mpv_event({"event": "property-change", "name": "playlist-pos", "data": 0})
+    controller._handle_mpv_event({"event": "file-loaded"})
+    assert not fired.wait(0.1)
+
+    controller._handle_mpv_event({"event": "property-change", "name": "playlist-pos", "data": 1})
+    controller._handle_mpv_event({"event": "file-loaded"})
+    assert fired.wait(1.0)
+    assert started == [video]
+
+
+def test_video_start_fires_when_playlist_pos_arrives_after_file_loaded(monkeypatch, tmp_path):
+    started = []
+    fired = threading.Event()
+
+    def on_video_start(path):
+        started.append(path)
+        fired.set()
+
+    warning = tmp_path / "warning.mp4"
+    warning.write_bytes(b"data")
+    controller, _ = _make_controller(
+        monkeypatch, tmp_path, on_video_start=on_video_start, warning_video=warning
+    )
+    video = tmp_path / "song.mp4"
+    video.write_bytes(b"data")
+
+    controller.play(video)
+    controller._handle_mpv_event({"event": "property-change", "name": "playlist-pos", "data": 0})
+    controller._handle_mpv_event({"event": "file-loaded"})
+    assert not fired.wait(0.1)
+
+    # The main file's file-loaded overtakes its playlist-pos change.
+    controller._handle_mpv_event({"event": "file-loaded"})
+    assert not fired.wait(0.1)
+    controller._handle_mpv_event({"event": "property-change", "name": "playlist-pos", "data": 1})
+    assert fired.wait(1.0)
+    assert started == [video]
+
+
+def test_eof_event_restores_default_loop_immediately(monkeypatch, tmp_path):
+    controller, commands = _make_controller(monkeypatch, tmp_path)
+    video = tmp_path / "song.mp4"
+    video.write_bytes(b"data")
+
+    controller.play(video)
+    # A stale EOF from the previous file must not end the new playback.
+    controller._handle_mpv_event({"event": "property-change", "name": "eof-reached", "data": True})
+    time.sleep(0.05)
+    assert controller._current == video
+
+    controller._handle_mpv_event({"event": "start-file"})
+    controller._handle_mpv_event({"event": "property-change", "name": "eof-reached", "data": True})
+    time.sleep(0.05)
+    assert controller._current == video
+
+    controller._handle_mpv_event({"event": "file-loaded"})
+    controller._handle_mpv_event({"event": "property-change", "name": "eof-reached", "data": True})
+    assert _wait_for(lambda: controller._current == controller.default_video)
+    assert ("loadfile", str(controller.default_video), "replace") in commands
+    assert controller._playback_watch is None
+
+
+def test_playback_that_never_starts_falls_back_after_grace(monkeypatch, tmp_path):
+    controller, _ = _make_controller(monkeypatch, tmp_path)
+    monkeypatch.setattr(controller, "_START_GRACE_SECONDS", 0.05)
+    video = tmp_path / "song.mp4"
+    video.write_bytes(b"data")
+
+    controller.play(video)
+
+    assert _wait_for(lambda: controller._current == controller.default_video)
+
+
+def test_query_state_reads_event_snapshot_without_ipc(monkeypatch, tmp_path):
+    controller, _ = _make_controller(monkeypatch, tmp_path)
+
+    def fail_send(*command):
+        raise AssertionError(f"unexpected IPC command {command}")
+
+    monkeypatch.setattr(controller, "_send_ipc_command", fail_send)
+    controller._current = tmp_path / "song.mp4"
+    for name, data in (
+        ("volume", 55),
+        ("time-pos", 12.5),
+        ("duration", 180.0),
+        ("pause", "no"),
+    ):
+        controller._handle_mpv_event({"event": "property-change", "name": name, "data": data})
+
+    # The controller lock being held (e.g. by play()) must not block readers.
+    acquired = controller._lock.acquire()
+    try:
+        result = {}
+        reader = threading.Thread(target=lambda: result.update(controller.query_state()))
+        reader.start()
+        reader.join(timeout=1.0)
+    finally:
+        if acquired:
+            controller._lock.release()
+
+    assert result == {
+        "current": str(tmp_path / "song.mp4"),
+        "is_default": False,
+        "is_running": True,
+        "volume": 55.0,
+        "position": 12.5,
+        "duration": 180.0,
+        "paused": False,
+    }
+
+
+def test_playback_time_is_reported_once_video_has_started(monkeypatch, tmp_path):
+    reports = []
+    fired = threading.Event()
+    controller, _ = _make_controller(
+        monkeypatch,
+        tmp_path,
+        on_video_start=lambda path: fired.set(),
+        on_playback_time=lambda position, paused: reports.append((position, paused)),
+    )
+    video = tmp_path / "song.mp4"
+    video.write_bytes(b"data")
+
+    controller.play(video)
+    controller._handle_mpv_event({"event": "property-change", "name": "time-pos", "data": 9.0})
+    assert reports == []
+
+    controller._handle_mpv_event({"event": "file-loaded"})
+    assert fired.wait(1.0)
+    controller._handle_mpv_event({"event": "property-change", "name": "time-pos", "data": 0.25})
+    controller._handle_mpv_event({"event": "property-change", "name": "pause", "data": True})
+    assert reports == [(0.25, False), (0.25, True)]
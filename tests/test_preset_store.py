@@ -0,0 +1,125 @@
+import sys
+from pathlib import Path
+from types import MethodType, ModuleType, SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:  # pragma: no branch - import fallback is deterministic
+    import flask  # type: ignore  # noqa: F401
+except ModuleNotFoundError:  # pragma: no cover - environment dependent
+    flask_stub = ModuleType("flask")
+
+    class _DummyFlask:
+        def __init__(self, *args, **kwargs) -> None:  # pragma: no cover - trivial
+            pass
+
+        def route(self, *args, **kwargs):  # pragma: no cover - trivial
+            def decorator(func):
+                return func
+
+            return decorator
+
+    def _unsupported(*args, **kwargs):  # pragma: no cover - trivial
+        raise RuntimeError("Flask is not available in the test environment")
+
+    flask_stub.Flask = _DummyFlask
+    flask_stub.abort = _unsupported
+    flask_stub.jsonify = _unsupported
+    flask_stub.redirect = _unsupported
+    flask_stub.render_template = _unsupported
+    flask_stub.request = SimpleNamespace()
+    flask_stub.send_from_directory = _unsupported
+    sys.modules.setdefault("flask", flask_stub)
+
+import app
+import json
+import os
+
+import snow
+
+
+def _store(path, sanitized):
+    def _sanitize(raw):
+        sanitized.append(raw)
+        return raw if isinstance(raw, dict) and raw.get("id") else None
+
+    return app.PresetStore(lambda: path, "presets", _sanitize, label="test presets")
+
+
+def test_store_reads_once_until_file_changes(tmp_path):
+    path = tmp_path / "presets.json"
+    path.write_text(json.dumps({"presets": [{"id": "a"}, {"name": "dropped"}]}), encoding="utf-8")
+    sanitized = []
+    store = _store(path, sanitized)
+
+    assert store.load() == [{"id": "a"}]
+    version = store.version
+    assert store.load() == [{"id": "a"}]
+    assert len(sanitized) == 2
+    assert store.version == version
+
+    path.write_text(json.dumps({"presets": [{"id": "b"}]}), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.load() == [{"id": "b"}]
+    assert store.version == version + 1
+
+
+def test_replace_writes_through_atomically(tmp_path):
+    path = tmp_path / "presets.json"
+    sanitized = []
+    store = _store(path, sanitized)
+    assert store.load() == []
+
+    store.replace([{"id": "c"}])
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"presets": [{"id": "c"}]}
+    assert store.load() == [{"id": "c"}]
+    assert sanitized == []
+    assert [entry.name for entry in tmp_path.iterdir()] == ["presets.json"]
+
+
+def test_encoded_body_is_reused_until_the_contents_change(tmp_path):
+    path = tmp_path / "presets.json"
+    path.write_text(json.dumps({"presets": [{"id": "a"}]}), encoding="utf-8")
+    store = _store(path, [])
+    encoded = []
+
+    def _encode(value):
+        encoded.append(value)
+        return json.dumps(value)
+
+    revision, body = store.encoded(_encode)
+    assert json.loads(body) == {"presets": [{"id": "a"}]}
+    assert store.encoded(_encode) == (revision, body)
+    assert len(encoded) == 1
+
+    store.replace([{"id": "b"}])
+    revision_after, body = store.encoded(_encode)
+    assert revision_after != revision
+    assert json.loads(body) == {"presets": [{"id": "b"}]}
+    assert len(encoded) == 2
+
+
+def test_snow_controller_reloads_from_relay_store(monkeypatch, tmp_path):
+    path = tmp_path / "relay_presets.json"
+    monkeypatch.setattr(app, "RELAY_PRESETS_FILE", path)
+    store = app.PresetStore(
+        lambda: app.RELAY_PRESETS_FILE, "presets", app.sanitize_relay_preset, label="relay presets"
+    )
+    controller = snow.SnowMachineController(store.load, preset_id="relay_snow")
+    assert not controller.is_available()
+
+    store.replace(
+        [
+            {
+                "id": "relay_snow",
+                "name": "Snow",
+                "commands": [{"id": "on", "label": "On", "url": "http://relay/on"}],
+            }
+        ]
+    )
+    controller.reload()
+    assert controller.is_available()
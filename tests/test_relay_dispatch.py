@@ -0,0 +1,236 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List, Set, Tuple
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dmx import (
+    CueScheduler,
+    DMXAction,
+    DMXShowRunner,
+    RelayAction,
+    RelayCommandRunner,
+    RelayDispatcher,
+    RelayHealth,
+    ShowClock,
+)
+
+
+class RelayBoard:
+    """Local stand-in for a relay board's HTTP API."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.requests: List[str] = []
+        self.arrivals: List[float] = []
+        self.clients: Set[Tuple[str, int]] = set()
+        board = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                board.clients.add(self.client_address)
+                board.arrivals.append(time.monotonic())
+                if board.delay:
+                    time.sleep(board.delay)
+                board.requests.append(self.path)
+                status = 404 if self.path.startswith("/missing") else 200
+                body = b"OK"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def boards():
+    created: List[RelayBoard] = []
+
+    def _make(delay: float = 0.0) -> RelayBoard:
+        board = RelayBoard(delay)
+        created.append(board)
+        return board
+
+    yield _make
+    for board in created:
+        board.close()
+
+
+def _wait_until(predicate: Callable[[], bool], timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_requests_to_one_board_reuse_a_connection_in_order(boards) -> None:
+    board = boards()
+    dispatcher = RelayDispatcher()
+    results: List[Tuple[str, bool]] = []
+    try:
+        for path in ("/relay/0?turn=on", "/relay/0?turn=off", "/missing", "/relay/1?turn=on"):
+            dispatcher.submit(
+                RelayAction(time_seconds=0.0, url=board.url + path),
+                lambda action, ok: results.append((action.url, ok)),
+            )
+        assert _wait_until(lambda: len(results) == 4)
+    finally:
+        dispatcher.close()
+
+    assert board.requests == ["/relay/0?turn=on", "/relay/0?turn=off", "/missing", "/relay/1?turn=on"]
+    assert [ok for _, ok in results] == [True, True, False, True]
+    assert len(board.clients) == 1
+    stats = dispatcher.get_stats()[board.url.split("//")[1]]
+    assert stats["sent"] == 3 and stats["failed"] == 1
+    assert stats["avg_ms"] is not None and stats["max_ms"] >= stats["avg_ms"]
+
+
+def test_slow_board_does_not_delay_other_boards(boards) -> None:
+    slow = boards(delay=0.5)
+    fast = boards()
+    dispatcher = RelayDispatcher()
+    done: List[Tuple[str, float]] = []
+    start = time.monotonic()
+    try:
+        for url in (slow.url + "/on", fast.url + "/on"):
+            dispatcher.submit(
+                RelayAction(time_seconds=0.0, url=url),
+                lambda action, ok: done.append((action.url, time.monotonic() - start)),
+            )
+        assert _wait_until(lambda: len(done) == 2)
+    finally:
+        dispatcher.close()
+
+    assert done[0][0] == fast.url + "/on"
+    assert done[0][1] < 0.3
+
+
+def test_unreachable_board_reports_failure() -> None:
+    dispatcher = RelayDispatcher(timeout=0.5)
+    results: List[bool] = []
+    try:
+        dispatcher.submit(
+            RelayAction(time_seconds=0.0, url="http://127.0.0.1:9/on"),
+            lambda action, ok: results.append(ok),
+        )
+        assert _wait_until(lambda: results == [False])
+    finally:
+        dispatcher.close()
+
+
+def test_runner_sends_cues_early_by_measured_latency(boards) -> None:
+    board = boards(delay=0.1)
+    dispatcher = RelayDispatcher()
+    results: List[bool] = []
+    for _ in range(3):
+        dispatcher.submit(
+            RelayAction(time_seconds=0.0, url=board.url + "/warmup"),
+            lambda action, ok: results.append(ok),
+        )
+    assert _wait_until(lambda: len(results) == 3)
+    lead = dispatcher.lead_time(board.url + "/on")
+    assert 0.1 <= lead < 0.3
+
+    runner = RelayCommandRunner(scheduler=CueScheduler("relay-test"), dispatcher=dispatcher)
+    clock = ShowClock()
+    try:
+        runner.start([RelayAction(time_seconds=0.5, url=board.url + "/on")], clock=clock)
+        started = time.monotonic() - clock.position()
+        assert _wait_until(lambda: len(board.arrivals) == 4)
+    finally:
+        runner.stop()
+        dispatcher.close()
+
+    sent_at = board.arrivals[-1] - started
+    assert 0.5 - lead - 0.05 < sent_at < 0.5 - lead + 0.05
+    stats = dispatcher.get_stats()[board.url.split("//")[1]]
+    assert stats["latency_ms"] >= 100 and stats["jitter_ms"] >= 0
+    assert stats["lead_ms"] == round(lead * 1000, 2)
+
+
+class _SilentOutput:
+    def transition_channel(self, channel, value, duration, stop_event=None) -> None:
+        pass
+
+
+def test_preview_clock_does_not_retarget_running_relay_lanes(boards) -> None:
+    board = boards()
+    scheduler = CueScheduler("shared-test")
+    dispatcher = RelayDispatcher()
+    relays = RelayCommandRunner(scheduler=scheduler, dispatcher=dispatcher)
+    preview = DMXShowRunner(_SilentOutput(), scheduler=scheduler)
+    try:
+        relays.start([RelayAction(time_seconds=5.0, url=board.url + "/on")], clock=ShowClock())
+        # A builder preview starts far past the relay cue on its own clock.
+        preview.start(
+            [DMXAction(time_seconds=60.0, channel=1, value=255, fade=0.0)],
+            clock=ShowClock(60.0),
+        )
+        time.sleep(0.3)
+        assert board.requests == []
+        # Seeking the preview moves only the lanes on the preview's clock.
+        assert preview.seek(70.0)
+        assert scheduler.has_lane("relay:" + board.url.split("//")[1])
+        time.sleep(0.1)
+        assert board.requests == []
+    finally:
+        preview.stop()
+        relays.stop()
+        dispatcher.close()
+
+
+def test_breaker_skips_requests_to_an_offline_board() -> None:
+    health = RelayHealth(threshold=2, probe_interval=60.0)
+    dispatcher = RelayDispatcher(timeout=0.5, health=health)
+    results: List[Tuple[bool, float]] = []
+    start = time.monotonic()
+    try:
+        for _ in range(4):
+            dispatcher.submit(
+                RelayAction(time_seconds=0.0, url="http://127.0.0.1:9/on"),
+                lambda action, ok: results.append((ok, time.monotonic() - start)),
+            )
+        assert _wait_until(lambda: len(results) == 4)
+    finally:
+        dispatcher.close()
+
+    assert not any(ok for ok, _ in results)
+    stats = dispatcher.get_stats()["127.0.0.1:9"]
+    assert stats["failed"] == 2 and stats["skipped"] == 2
+    assert results[3][1] - results[1][1] < 0.05
+    assert health.check("http://127.0.0.1:9/off")
+    assert health.get_status()["127.0.0.1:9"]["online"] is False
+
+
+def test_probe_closes_breaker_without_sending_commands(boards) -> None:
+    board = boards()
+    health = RelayHealth(threshold=1, probe_interval=0.02)
+    try:
+        health.record_failure(board.url + "/on", "timed out")
+        assert health.check(board.url + "/off") == "timed out"
+        assert _wait_until(lambda: health.check(board.url + "/off") is None)
+    finally:
+        health.close()
+
+    assert board.requests == []
+    assert health.get_status()[board.url.split("//")[1]]["online"] is True
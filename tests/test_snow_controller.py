@@ -1,8 +1,9 @@
+import urllib.error
 from typing import Iterable, List
 
 import pytest
 
-from dmx import RelayAction
+from dmx import RelayAction, RelayHealth
 from snow import SnowMachineController
 
 
@@ -99,3 +100,31 @@ def test_snow_controller_handles_missing_configuration() -> None:
     assert not controller.is_available()
     with pytest.raises(RuntimeError):
         controller.set_active(True)
+
+
+def test_snow_controller_fails_fast_while_relay_is_offline(monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts: List[str] = []
+
+    def failing_urlopen(request: object, timeout: float = 0.0) -> DummyResponse:
+        attempts.append(getattr(request, "full_url", ""))
+        raise urllib.error.URLError("timed out")
+
+    monkeypatch.setattr("urllib.request.urlopen", failing_urlopen)
+    health = RelayHealth(threshold=2, probe_interval=60.0)
+    controller = SnowMachineController(
+        lambda: build_loader([{"id": "on", "label": "On", "url": "http://relay/on"}]),
+        preset_id="relay_snow_machine",
+        request_timeout=1.0,
+        health=health,
+    )
+
+    try:
+        for _ in range(3):
+            with pytest.raises(RuntimeError) as excinfo:
+                controller.set_active(True)
+    finally:
+        health.close()
+
+    assert attempts == ["http://relay/on", "http://relay/on"]
+    assert "offline (timed out)" in str(excinfo.value)
+    assert health.get_status()["relay"]["online"] is False
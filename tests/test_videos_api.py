@@ -64,3 +64,12 @@ def test_videos_api_includes_admin_only_for_admins(client):
 
     ids = {video["id"] for video in payload["videos"]}
     assert ids == {"public", "intro"}
+
+
+def test_videos_api_answers_revalidation_with_not_modified(client):
+    first = client.get("/api/videos")
+    etag = first.headers["ETag"]
+
+    response = client.get("/api/videos", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""